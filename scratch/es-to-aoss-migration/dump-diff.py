@@ -1,6 +1,8 @@
 import logging
 import os
 
+from pds.registrysweepers.utils.externalsort import external_join, JoinSide
+
 logging.basicConfig(level=logging.INFO)
 
 base_dir = os.path.expanduser('~/Documents/opensearch-diff-dumps')
@@ -15,28 +17,19 @@ for index in indices:
 
         diff_count = 0
 
+        # dumps are not necessarily lexically-sorted (e.g. registry-refs is dumped in collection/batch order), so sort
+        # and diff them on-disk rather than assuming order or loading them into memory
         with open(basis_filepath) as basis_f, \
             open(diffed_filepath) as diffed_f, \
             open(output_filepath, 'w+') as out_f:
-            basis_line = basis_f.readline()
-            diffed_line = diffed_f.readline()
-
-            while basis_line != '' and diffed_line != '':
-                if basis_line < diffed_line:  # if diffed file is missing the lidvid from basis file
-                    out_f.writelines([basis_line])
-                    basis_line = basis_f.readline()
+            basis_ids = (line.rstrip('\n') for line in basis_f)
+            diffed_ids = (line.rstrip('\n') for line in diffed_f)
+            for side, lidvid in external_join(basis_ids, diffed_ids):
+                if side == JoinSide.LEFT_ONLY:  # if diffed file is missing the lidvid from basis file
+                    out_f.write(f'{lidvid}\n')
                     diff_count += 1
-                elif diffed_line < basis_line:  # if diffed file lidvid is missing from basis file
-                    logging.warning(f'LIDVID is present in aoss file but not in es file: {diffed_line.strip()}')
-                    diffed_line = diffed_f.readline()
-                else: # if lidvid is in both files
-                    basis_line = basis_f.readline()
-                    diffed_line = diffed_f.readline()
-
-            while basis_line != '':
-                out_f.writelines([basis_line])
-                basis_line = basis_f.readline()
-                diff_count += 1
+                elif side == JoinSide.RIGHT_ONLY:  # if diffed file lidvid is missing from basis file
+                    logging.warning(f'LIDVID is present in aoss file but not in es file: {lidvid}')
 
         logging.info(f'Identified {diff_count} missing lidvids in {index}')
 
@@ -12,6 +12,8 @@ from pds.registrysweepers.utils.db.update import Update
 
 from pds.registrysweepers.driver import run as run_sweepers
 from pds.registrysweepers.utils.misc import get_human_readable_elapsed_since
+from pds.registrysweepers.utils.externalsort import external_join, JoinSide
+from pds.registrysweepers.utils.productidentifiers.lidvidarray import LidVidArray
 
 # Baseline mappings which are required to facilitate successful execution before any data is copied
 necessary_mappings = {
@@ -109,17 +111,28 @@ def enumerate_outstanding_doc_ids(src_index_name: str, dest_index_name: str) ->
                                                              {"includes": [pseudoid_field]},
                                                              sort_fields=[pseudoid_field], request_timeout_seconds=20))
 
-        # yield any documents which are present in source but not in destination
-        src_ids = {doc["_id"] for doc in src_docs}
-        dest_ids = {doc["_id"] for doc in dest_docs}
+        # yield any documents which are present in source but not in destination.  Ids are sorted and diffed on-disk so
+        # that memory usage is bounded regardless of index size, and the few ids missing once bulk streaming has run are
+        # held in a compact LidVidArray
+        src_ids = (doc["_id"] for doc in src_docs)
+        dest_ids = (doc["_id"] for doc in dest_docs)
+
+        ids_missing_from_src = []
+
+        def iter_ids_missing_from_dest() -> Iterator[str]:
+            for side, doc_id in external_join(src_ids, dest_ids):
+                if side == JoinSide.LEFT_ONLY:
+                    yield doc_id
+                elif side == JoinSide.RIGHT_ONLY:
+                    ids_missing_from_src.append(doc_id)
+
+        ids_missing_from_dest = LidVidArray(iter_ids_missing_from_dest())
 
-        ids_missing_from_src = dest_ids.difference(src_ids)
         if len(ids_missing_from_src) > 0:
             logging.error(
-                f'{len(ids_missing_from_src)} ids are present in {dest_index_name} but not in {src_index_name} - this indicates a potential error: {sorted(ids_missing_from_src)}')
+                f'{len(ids_missing_from_src)} ids are present in {dest_index_name} but not in {src_index_name} - this indicates a potential error: {ids_missing_from_src}')
             exit(1)
 
-        ids_missing_from_dest = src_ids.difference(dest_ids)
         return iter(ids_missing_from_dest)
 
 
@@ -1,14 +1,14 @@
 import logging
 from collections import namedtuple
 from collections.abc import Iterator
+from datetime import datetime
 from itertools import chain
 from typing import Dict
 from typing import Generator
 from typing import Iterable
 from typing import Mapping
-from typing import Set
+from typing import Optional
 
-import psutil  # type: ignore
 from opensearchpy import OpenSearch
 from pds.registrysweepers.ancestry.productupdaterecord import ProductUpdateRecord
 from pds.registrysweepers.ancestry.queries import query_for_collection_nonaggregate_refs
@@ -19,6 +19,7 @@ from pds.registrysweepers.ancestry.versioning import SWEEPERS_ANCESTRY_VERSION_M
 from pds.registrysweepers.utils.misc import coerce_list_type
 from pds.registrysweepers.utils.misc import limit_log_length
 from pds.registrysweepers.utils.productidentifiers.factory import PdsProductIdentifierFactory
+from pds.registrysweepers.utils.productidentifiers.lidtrie import LidTrie
 from pds.registrysweepers.utils.productidentifiers.pdslid import PdsLid
 from pds.registrysweepers.utils.productidentifiers.pdslidvid import PdsLidVid
 
@@ -52,36 +53,35 @@ def get_ancestry_by_collection_lidvid(collections_docs: Iterable[Dict]) -> Mappi
 
 def get_ancestry_by_collection_lid(
     ancestry_by_collection_lidvid: Mapping[PdsLidVid, ProductUpdateRecord]
-) -> Mapping[PdsLid, Set[ProductUpdateRecord]]:
-    # Create a dict of pointer-sets to the newly-instantiated records, binned/keyed by LID for fast access when a bundle
-    #  only refers to a LID rather than a specific LIDVID
-    ancestry_by_collection_lid: Dict[PdsLid, Set[ProductUpdateRecord]] = {}
-    for record in ancestry_by_collection_lidvid.values():
-        if record.product.lid not in ancestry_by_collection_lid:
-            ancestry_by_collection_lid[record.product.lid] = set()
-        ancestry_by_collection_lid[record.product.lid].add(record)
+) -> LidTrie[ProductUpdateRecord]:
+    # Index pointers to the newly-instantiated records by LID for fast access when a bundle only refers to a LID rather
+    #  than a specific LIDVID
+    ancestry_by_collection_lid: LidTrie[ProductUpdateRecord] = LidTrie()
+    for collection_lidvid, record in ancestry_by_collection_lidvid.items():
+        ancestry_by_collection_lid.add(collection_lidvid, record)
 
     return ancestry_by_collection_lid
 
 
 def process_collection_bundle_ancestry(
-        client: OpenSearch) -> Iterable[ProductUpdateRecord]:
+        client: OpenSearch, harvested_since: Optional[datetime] = None) -> Iterable[ProductUpdateRecord]:
     """
     Because the number of bundles and collections is relatively small, we can process all bundle-ancestries at once to
     leverage the existing code.
     :param client: OpenSearch client
+    :param harvested_since: if provided, only process bundles/collections harvested at or after this time
     :return:
     """
 
     log.info(limit_log_length("Generating ProductUpdateRecords for collections' bundle-ancestries..."))
-    bundles_docs = list(query_for_pending_bundles(client))
-    collections_docs = list(query_for_pending_collections(client))
+    bundles_docs = list(query_for_pending_bundles(client, harvested_since=harvested_since))
+    collections_docs = list(query_for_pending_collections(client, harvested_since=harvested_since))
 
     # Prepare empty ancestry records for collections, with fast access by LID or LIDVID
     collection_update_records_by_collection_lidvid: Mapping[PdsLidVid, ProductUpdateRecord] = get_ancestry_by_collection_lidvid(
         collections_docs
     )
-    collection_update_records_by_collection_lid: Mapping[PdsLid, Set[ProductUpdateRecord]] = get_ancestry_by_collection_lid(
+    collection_update_records_by_collection_lid: LidTrie[ProductUpdateRecord] = get_ancestry_by_collection_lid(
         collection_update_records_by_collection_lidvid
     )
 
@@ -125,10 +125,10 @@ def process_collection_bundle_ancestry(
                         # TODO: need to defer this update per https://github.com/NASA-PDS/registry-sweepers/issues/188
                     )
             elif isinstance(identifier, PdsLid):
-                try:
-                    for collection_record in collection_update_records_by_collection_lid[identifier.lid]:
-                        collection_record.add_direct_ancestor_ref(bundle_lidvid)
-                except KeyError:
+                collection_records = collection_update_records_by_collection_lid.versions_of(identifier.lid).values()
+                for collection_record in collection_records:
+                    collection_record.add_direct_ancestor_ref(bundle_lidvid)
+                if not collection_records:
                     log.warning(
                         limit_log_length(
                             f"No versions of collection {identifier} referenced by bundle {bundle_lidvid} "
@@ -166,13 +166,15 @@ def bundle_update_records_from_docs(docs: Iterable[dict]) -> Iterable[ProductUpd
             )
 
 
-def process_collection_ancestries_for_nonaggregates(client) -> Iterator[ProductUpdateRecord]:
+def process_collection_ancestries_for_nonaggregates(
+        client, harvested_since: Optional[datetime] = None) -> Iterator[ProductUpdateRecord]:
     """
     Process each non-up-to-date collection, yielding updates for its descendant nonaggregate products, then an update for the collection itself to mark it as up-to-date.
+    If harvested_since is provided, only collections harvested at or after this time are processed.
     """
 
     # iterate over collections (and their member nonaggregate products) which require ancestry updates
-    pending_collections_docs = query_for_pending_collections(client)
+    pending_collections_docs = query_for_pending_collections(client, harvested_since=harvested_since)
     pending_collections = iter(PdsLidVid.from_string(record["_source"]["lidvid"]) for record in pending_collections_docs)
     # TODO: add orphan processing step. not sure if it belongs here or as a separate step after ancestry has completed - edunn 20251112
 
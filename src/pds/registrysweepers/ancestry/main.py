@@ -1,4 +1,6 @@
 import logging
+from datetime import datetime
+from datetime import timedelta
 from itertools import chain
 from typing import Callable
 from typing import Dict
@@ -14,6 +16,8 @@ from pds.registrysweepers.ancestry.constants import ANCESTRY_REFS_METADATA_KEY
 from pds.registrysweepers.ancestry.generation import process_collection_ancestries_for_nonaggregates
 from pds.registrysweepers.ancestry.generation import process_collection_bundle_ancestry
 from pds.registrysweepers.ancestry.productupdaterecord import ProductUpdateRecord
+from pds.registrysweepers.ancestry.queries import query_for_ancestry_watermark
+from pds.registrysweepers.ancestry.runtimeconstants import AncestryRuntimeConstants
 from pds.registrysweepers.ancestry.utils import update_from_record
 from pds.registrysweepers.ancestry.versioning import SWEEPERS_ANCESTRY_VERSION
 from pds.registrysweepers.ancestry.versioning import SWEEPERS_ANCESTRY_VERSION_METADATA_KEY
@@ -34,16 +38,22 @@ def run(
         log_level: int = logging.INFO,
         ancestry_records_accumulator: Optional[List[AncestryRecord]] = None,
         bulk_updates_sink: Optional[List[Tuple[str, Dict[str, List]]]] = None,
+        incremental: Optional[bool] = None,
 ):
     configure_logging(filepath=log_filepath, log_level=log_level)
 
     log.info(f"Starting ancestry v{SWEEPERS_ANCESTRY_VERSION} sweeper processing...")
 
+    incremental = AncestryRuntimeConstants.incremental if incremental is None else incremental
+    harvested_since = resolve_incremental_harvested_since(client) if incremental else None
+
     log.info("Updating bundle ancestries for collections...")
-    bundle_and_collection_update_records = process_collection_bundle_ancestry(client)
+    bundle_and_collection_update_records = process_collection_bundle_ancestry(client, harvested_since=harvested_since)
 
     logging.info("Updating collection ancestries for non-aggregate products...")
-    collection_nonaggregate_refs_updates = process_collection_ancestries_for_nonaggregates(client)
+    collection_nonaggregate_refs_updates = process_collection_ancestries_for_nonaggregates(
+        client, harvested_since=harvested_since
+    )
 
     product_update_records_to_write = filter(lambda r: not r._skip_write, chain(bundle_and_collection_update_records,
                                                                                 collection_nonaggregate_refs_updates))
@@ -112,6 +122,25 @@ def run(
     log.info("Ancestry sweeper processing complete!")
 
 
+def resolve_incremental_harvested_since(client: OpenSearch) -> Optional[datetime]:
+    """
+    Return the harvest timestamp from which an incremental run should process bundles/collections, i.e. the ancestry
+    high-water mark less the configured safety overlap, or None if a full run is necessary.
+    """
+    watermark = query_for_ancestry_watermark(client)
+    if watermark is None:
+        log.info("No ancestry high-water mark found - performing full run")
+        return None
+
+    overlap = timedelta(minutes=AncestryRuntimeConstants.incremental_overlap_minutes)
+    harvested_since = watermark - overlap
+    log.info(
+        f"Performing incremental run for products harvested since {harvested_since.isoformat()} "
+        f"(high-water mark {watermark.isoformat()}, overlap {overlap})"
+    )
+    return harvested_since
+
+
 def convert_records_to_updates(
         update_records: Iterable[ProductUpdateRecord],
         update_records_accumulator=None,
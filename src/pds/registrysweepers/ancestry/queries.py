@@ -1,8 +1,12 @@
+import functools
 import logging
+from datetime import datetime
+from datetime import timezone
 from enum import auto
 from enum import Enum
 from typing import Dict
 from typing import Iterable
+from typing import Optional
 
 from opensearchpy import OpenSearch
 from pds.registrysweepers.ancestry.runtimeconstants import AncestryRuntimeConstants
@@ -10,10 +14,16 @@ from pds.registrysweepers.ancestry.versioning import SWEEPERS_ANCESTRY_VERSION
 from pds.registrysweepers.ancestry.versioning import SWEEPERS_ANCESTRY_VERSION_METADATA_KEY
 from pds.registrysweepers.utils.db import get_query_hits_count
 from pds.registrysweepers.utils.db.multitenancy import resolve_multitenant_index_name
+from pds.registrysweepers.utils.memorygovernor import MemoryGovernor
+from pds.registrysweepers.utils.misc import coerce_list_type
+from pds.registrysweepers.utils.misc import get_ids_list_str
+from pds.registrysweepers.utils.misc import limit_log_length
 from pds.registrysweepers.utils.productidentifiers.pdslidvid import PdsLidVid
 
 log = logging.getLogger(__name__)
 
+HARVEST_TIMESTAMP_METADATA_KEY = "ops:Harvest_Info.ops:harvest_date_time"
+
 
 class ProductClass(Enum):
     BUNDLE = (auto(),)
@@ -33,25 +43,76 @@ def product_class_query_factory(cls: ProductClass) -> Dict:
     return {"query": queries[cls]}
 
 
-def query_for_pending_bundles(client: OpenSearch) -> Iterable[Dict]:
-    """Query the registry for all bundle LIDVIDs which require ancestry processing"""
+def harvested_since_filter(harvested_since: datetime) -> Dict:
+    return {"range": {HARVEST_TIMESTAMP_METADATA_KEY: {"gte": harvested_since.astimezone(timezone.utc).isoformat()}}}
+
+
+def query_for_ancestry_watermark(client: OpenSearch) -> Optional[datetime]:
+    """
+    Query the registry for the ancestry high-water mark, i.e. the latest harvest timestamp of any bundle/collection which
+    is already marked as processed by the current ancestry version.  Returns None if no such product exists.
+
+    The mark is not stored separately - it is persisted (per-tenant) by the version metadata which is written to each
+    aggregate product as it is processed, so it only advances once products are successfully updated.
+    """
+    query = {
+        "query": {
+            "bool": {
+                "filter": [
+                    {"terms": {"product_class": ["Product_Bundle", "Product_Collection"]}},
+                    {"range": {SWEEPERS_ANCESTRY_VERSION_METADATA_KEY: {"gte": SWEEPERS_ANCESTRY_VERSION}}},
+                ]
+            }
+        },
+        "aggs": {"watermark": {"max": {"field": HARVEST_TIMESTAMP_METADATA_KEY}}},
+    }
+
+    response = client.search(
+        index=resolve_multitenant_index_name(client, "registry"),
+        body=query,
+        size=0,
+        _source_includes=[],
+        request_timeout=20,
+    )
+
+    # max aggregation value is epoch milliseconds, or null if no documents matched
+    watermark_epoch_millis = response.get("aggregations", {}).get("watermark", {}).get("value")
+    if watermark_epoch_millis is None:
+        return None
+
+    return datetime.fromtimestamp(watermark_epoch_millis / 1000, tz=timezone.utc)
+
+
+def query_for_pending_bundles(client: OpenSearch, harvested_since: Optional[datetime] = None) -> Iterable[Dict]:
+    """
+    Query the registry for all bundle LIDVIDs which require ancestry processing.
+    If harvested_since is provided, only bundles harvested at or after that time are returned.
+    """
     from pds.registrysweepers.utils.db import query_registry_db_with_search_after
 
     query = product_class_query_factory(ProductClass.BUNDLE)
+    if harvested_since is not None:
+        query["query"]["bool"]["filter"].append(harvested_since_filter(harvested_since))
+
     _source = {"includes": ["lidvid", "ref_lid_collection", SWEEPERS_ANCESTRY_VERSION_METADATA_KEY]}
     docs = query_registry_db_with_search_after(client, resolve_multitenant_index_name(client, "registry"), query, _source)
 
     return docs
 
 
-def query_for_pending_collections(client: OpenSearch) -> Iterable[Dict]:
-    """Query the registry for all collection LIDVIDs which require ancestry processing"""
+def query_for_pending_collections(client: OpenSearch, harvested_since: Optional[datetime] = None) -> Iterable[Dict]:
+    """
+    Query the registry for all collection LIDVIDs which require ancestry processing.
+    If harvested_since is provided, only collections harvested at or after that time are returned.
+    """
     from pds.registrysweepers.utils.db import query_registry_db_with_search_after
 
     query = product_class_query_factory(ProductClass.COLLECTION)
     query["query"]["bool"].update(
         {"must_not": [{"range": {SWEEPERS_ANCESTRY_VERSION_METADATA_KEY: {"gte": SWEEPERS_ANCESTRY_VERSION}}}]}
     )
+    if harvested_since is not None:
+        query["query"]["bool"]["filter"].append(harvested_since_filter(harvested_since))
 
     _source = {"includes": ["lidvid", SWEEPERS_ANCESTRY_VERSION_METADATA_KEY]}
     docs = query_registry_db_with_search_after(client, resolve_multitenant_index_name(client, "registry"), query, _source)
@@ -59,6 +120,11 @@ def query_for_pending_collections(client: OpenSearch) -> Iterable[Dict]:
     return docs
 
 
+@functools.cache
+def get_memory_governor() -> MemoryGovernor:
+    return MemoryGovernor(AncestryRuntimeConstants.max_acceptable_memory_usage)
+
+
 def query_for_collection_nonaggregate_refs(
     client: OpenSearch, collection_lidvid: PdsLidVid
 ) -> Iterable[PdsLidVid]:
@@ -76,20 +142,30 @@ def query_for_collection_nonaggregate_refs(
     }
     _source = {"includes": ["collection_lidvid", "batch_id", "product_lidvid"]}
 
-    # each document will have many product lidvids, so a smaller page size is warranted here
+    # each document will have many product lidvids, so a smaller page size is warranted here, and is shrunk further
+    # while memory usage exceeds the acceptable threshold
+    page_size = get_memory_governor().scale(AncestryRuntimeConstants.nonaggregate_ancestry_records_query_page_size)
     docs = query_registry_db_with_search_after(
         client,
         resolve_multitenant_index_name(client, "registry-refs"),
         query,
         _source,
-        page_size=AncestryRuntimeConstants.nonaggregate_ancestry_records_query_page_size,
+        page_size=page_size,
         request_timeout_seconds=30,
         sort_fields=["batch_id"],
     )
 
     for doc in docs:
-        for ref in doc["_source"].get("product_lidvid", []):
-            yield PdsLidVid.from_string(ref)
+        refs = coerce_list_type(doc["_source"].get("product_lidvid", []))
+        lidvids, invalid_refs = PdsLidVid.from_strings(refs)
+        if invalid_refs:
+            log.warning(
+                limit_log_length(
+                    f'Skipping {len(invalid_refs)} unparseable product_lidvid values in document in index "{doc.get("_index")}" with id "{doc.get("_id")}": {get_ids_list_str([ref for _, ref in invalid_refs])}'
+                )
+            )
+
+        yield from lidvids
 
 
 _orphaned_docs_query = {
@@ -11,11 +11,21 @@ class AncestryRuntimeConstants(ABC):
         os.environ.get("ANCESTRY_NONAGGREGATE_QUERY_PAGE_SIZE", 500)
     )
 
-    # non-aggregate history batches will be dumped to disk periodically as memory usage reaches this threshold
+    # Percentage of container memory above which ancestry shrinks its page sizes and memory-governed BigDicts spill to
+    # disk
     max_acceptable_memory_usage: int = int(os.environ.get("ANCESTRY_DISK_DUMP_MEMORY_THRESHOLD", 80))
 
     # Expects a value like "true" or "1"
     disable_chunking: bool = parse_boolean_env_var("ANCESTRY_DISABLE_CHUNKING")
 
+    # Expects a value like "true" or "1".  When enabled, only bundles/collections harvested after the ancestry
+    # high-water mark (less the overlap below) are queried.  Runs with this disabled act as a full reconciliation, and
+    # should still be scheduled periodically to pick up anything missed by incremental runs.
+    incremental: bool = parse_boolean_env_var("ANCESTRY_INCREMENTAL")
+
+    # Safety margin subtracted from the high-water mark, to tolerate harvest clock skew and harvests which were still in
+    # progress while the previous sweeper run was executing
+    incremental_overlap_minutes: int = int(os.environ.get("ANCESTRY_INCREMENTAL_OVERLAP_MINUTES", 60))
+
     # Not yet implemented
     # db_write_timeout_seconds = int(os.environ.get('DB_WRITE_TIMEOUT_SECONDS'), 90)
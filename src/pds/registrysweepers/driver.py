@@ -53,38 +53,210 @@
 #
 #
 import argparse
+import contextvars
 import functools
+import importlib
 import inspect
 import logging
 import os
+import re
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Callable
+from typing import Dict
+from typing import FrozenSet
+from typing import List
+from typing import Optional
+from typing import Union
 
-from pds.registrysweepers import legacy_registry_sync
-from pds.registrysweepers import provenance
-from pds.registrysweepers.ancestry import main as ancestry
-from pds.registrysweepers.reindexer import main as reindexer
+from opensearchpy import OpenSearch
 from pds.registrysweepers.utils import configure_logging
 from pds.registrysweepers.utils import parse_log_level
+from pds.registrysweepers.utils import sweeper_scope
 from pds.registrysweepers.utils.db.client import get_opensearch_client_from_environment
+from pds.registrysweepers.utils.db.multitenancy import tenant_scope
 from pds.registrysweepers.utils.misc import get_human_readable_elapsed_since
 from pds.registrysweepers.utils.misc import is_dev_mode
 from pds.registrysweepers.utils.misc import limit_log_length
 
+log = logging.getLogger(__name__)
 
-SWEEPER_REGISTRY = {
-    "provenance": provenance.run,
-    "ancestry": ancestry.run,
-    "reindexer": reindexer.run,
-    "legacy-sync": legacy_registry_sync.run,
+# Sweepers are registered by "module:function" path, and only imported once selected, so that a run does not pay for
+# the imports (and their dependencies) of sweepers it does not execute
+SWEEPER_REGISTRY: Dict[str, Union[str, Callable]] = {
+    "provenance": "pds.registrysweepers.provenance:run",
+    "ancestry": "pds.registrysweepers.ancestry.main:run",
+    "reindexer": "pds.registrysweepers.reindexer.main:run",
+    "legacy-sync": "pds.registrysweepers.legacy_registry_sync.legacy_registry_sync:run",
 }
 
 DEFAULT_SWEEPERS = ["provenance", "ancestry", "reindexer"]
 
 
+def get_sweeper(name: str) -> Callable:
+    """Return the entrypoint of the named sweeper, importing its module if necessary"""
+    sweeper = SWEEPER_REGISTRY[name]
+    if not isinstance(sweeper, str):
+        return sweeper
+
+    module_path, function_name = sweeper.split(":")
+    entrypoint: Callable = getattr(importlib.import_module(module_path), function_name)
+    return entrypoint
+
+
+@dataclass(frozen=True)
+class SweeperDependencies:
+    """
+    The data a sweeper reads and writes.  Data are named as an index, optionally qualified by a family of fields within
+    it, e.g. "registry/provenance".  An unqualified index name denotes all of that index's fields.
+    """
+
+    reads: FrozenSet[str] = frozenset()
+    writes: FrozenSet[str] = frozenset()
+
+
+SWEEPER_DEPENDENCIES = {
+    "provenance": SweeperDependencies(
+        reads=frozenset({"registry/identifiers"}),
+        writes=frozenset({"registry/provenance"}),
+    ),
+    "ancestry": SweeperDependencies(
+        reads=frozenset({"registry/identifiers", "registry/references", "registry-refs"}),
+        writes=frozenset({"registry/ancestry", "registry-refs/ancestry"}),
+    ),
+    # the reindexer ensures that every field present in the registry is mapped, so must follow any sweeper adding fields
+    "reindexer": SweeperDependencies(
+        reads=frozenset({"registry", "registry-dd"}),
+        writes=frozenset({"registry/mappings", "registry/reindexer"}),
+    ),
+    "legacy-sync": SweeperDependencies(
+        reads=frozenset({"registry/identifiers", "registry/harvest"}),
+        writes=frozenset({"en-legacy-registry"}),
+    ),
+}
+
+# Optional environment variable specifying the maximum number of sweepers run at once.  Sweepers are run sequentially
+# by default, as the memory footprints of concurrent sweepers are additive
+SWEEPERS_MAX_CONCURRENCY = "SWEEPERS_MAX_CONCURRENCY"
+
+# Optional environment variables specifying the node ids of several tenants to sweep in this process (separated by
+# commas or whitespace), and the maximum number of those tenants swept at once (by default, all of them)
+SWEEPERS_TENANTS = "SWEEPERS_TENANTS"
+SWEEPERS_MAX_TENANT_CONCURRENCY = "SWEEPERS_MAX_TENANT_CONCURRENCY"
+
+# sweepers which operate on the registry as a whole rather than on a single tenant's indices
+TENANT_AGNOSTIC_SWEEPERS = {"legacy-sync"}
+
+
+def _data_overlap(left: str, right: str) -> bool:
+    return left == right or left.startswith(right + "/") or right.startswith(left + "/")
+
+
+def sweepers_conflict(left: SweeperDependencies, right: SweeperDependencies) -> bool:
+    """Return whether either sweeper writes data which the other reads or writes, so that their order matters"""
+
+    def writes_to(writer: SweeperDependencies, other: SweeperDependencies) -> bool:
+        return any(_data_overlap(written, data) for written in writer.writes for data in other.reads | other.writes)
+
+    return writes_to(left, right) or writes_to(right, left)
+
+
+def get_sweeper_prerequisites(names: List[str]) -> Dict[str, List[str]]:
+    """
+    Return, for each named sweeper, the earlier-named sweepers with which it conflicts, and which must therefore have
+    completed before it may start.  Sweepers without declared dependencies conflict with every other sweeper.
+    """
+    prerequisites: Dict[str, List[str]] = {}
+    for idx, name in enumerate(names):
+        dependencies = SWEEPER_DEPENDENCIES.get(name)
+        prerequisites[name] = [
+            earlier_name
+            for earlier_name in names[:idx]
+            if dependencies is None
+            or earlier_name not in SWEEPER_DEPENDENCIES
+            or sweepers_conflict(SWEEPER_DEPENDENCIES[earlier_name], dependencies)
+        ]
+    return prerequisites
+
+
+def run_sweepers(names: List[str], run_sweeper_f: Callable[[str], None], max_concurrency: int = 1) -> Dict[str, str]:
+    """
+    Run the named sweepers on a pool of max_concurrency threads, starting each sweeper (in the given order) once its
+    prerequisites have completed.  If a sweeper fails, no further sweepers are started, and the failure is raised once
+    those already running have completed.
+
+    Return the human-readable execution duration of each sweeper, by name.
+    """
+    prerequisites = get_sweeper_prerequisites(names)
+    pending = list(names)
+    running: Dict[Future, str] = {}
+    durations: Dict[str, str] = {}
+
+    def timed_run(name: str) -> str:
+        sweeper_execution_begin = datetime.now()
+        with sweeper_scope(name):
+            run_sweeper_f(name)
+        return get_human_readable_elapsed_since(sweeper_execution_begin)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="Sweeper") as executor:
+        while pending or running:
+            for name in list(pending):
+                if len(running) >= max_concurrency:
+                    break
+                if all(prerequisite in durations for prerequisite in prerequisites[name]):
+                    pending.remove(name)
+                    # each sweeper runs in a copy of this context, so that it inherits any tenant_scope()
+                    running[executor.submit(contextvars.copy_context().run, timed_run, name)] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                durations[name] = future.result()
+
+    return durations
+
+
+def parse_tenants(value: Optional[str]) -> List[str]:
+    return [tenant for tenant in re.split(r"[\s,]+", value or "") if tenant]
+
+
+@dataclass
+class TenantResult:
+    """The outcome of sweeping one tenant - the execution duration of each sweeper, or the error interrupting them"""
+
+    elapsed: str
+    durations: Dict[str, str]
+    error: Optional[Exception] = None
+
+
+def run_tenants(
+    tenants: List[str], run_tenant_f: Callable[[], Dict[str, str]], max_concurrency: int
+) -> Dict[str, TenantResult]:
+    """
+    Call run_tenant_f within the tenant_scope() of each tenant, on a pool of max_concurrency threads.  The failure of
+    one tenant is logged and recorded in its result, without interrupting the others.
+    """
+
+    def run_tenant(tenant: str) -> TenantResult:
+        tenant_execution_begin = datetime.now()
+        with tenant_scope(tenant):
+            try:
+                durations = run_tenant_f()
+            except Exception as err:
+                log.exception(limit_log_length(f"Sweepers failed for tenant {tenant}: {err}"))
+                return TenantResult(get_human_readable_elapsed_since(tenant_execution_begin), {}, err)
+        return TenantResult(get_human_readable_elapsed_since(tenant_execution_begin), durations)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="Tenant") as executor:
+        return dict(zip(tenants, executor.map(run_tenant, tenants)))
+
+
 def run():
     configure_logging(filepath=None, log_level=logging.INFO)
-    log = logging.getLogger(__name__)
 
     dev_mode = is_dev_mode()
     if dev_mode:
@@ -95,10 +267,10 @@ def run():
 
     log_level = parse_log_level(os.environ.get("LOGLEVEL", "INFO"))
 
-    def run_factory(sweeper_f: Callable) -> Callable:
+    def run_factory(sweeper_f: Callable, client: OpenSearch) -> Callable:
         return functools.partial(
             sweeper_f,
-            client=get_opensearch_client_from_environment(verify_certs=True if not dev_mode else False),
+            client=client,
             # enable for development if required - not necessary in production
             # log_filepath='registry-sweepers.log',
             log_level=log_level,
@@ -119,28 +291,87 @@ def run():
         choices=SWEEPER_REGISTRY.keys(),
         help=f"Only run the specified sweeper(s). Choices: {', '.join(SWEEPER_REGISTRY.keys())}",
     )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=int(os.environ.get(SWEEPERS_MAX_CONCURRENCY, 1)),
+        help="Maximum number of independent sweepers to run at once (default: $SWEEPERS_MAX_CONCURRENCY, else 1)",
+    )
+    parser.add_argument(
+        "--tenants",
+        nargs="+",
+        metavar="NODE_ID",
+        default=parse_tenants(os.environ.get(SWEEPERS_TENANTS)),
+        help="Sweep each of the specified tenants, rather than $MULTITENANCY_NODE_ID (default: $SWEEPERS_TENANTS)",
+    )
+    parser.add_argument(
+        "--max-tenant-concurrency",
+        type=int,
+        default=os.environ.get(SWEEPERS_MAX_TENANT_CONCURRENCY),
+        help="Maximum number of tenants to sweep at once (default: $SWEEPERS_MAX_TENANT_CONCURRENCY, else all of them)",
+    )
 
     args = parser.parse_args()
 
     names = args.only if args.only else DEFAULT_SWEEPERS
-    sweepers = [SWEEPER_REGISTRY[name] for name in names]
+    if args.max_concurrency < 1:
+        parser.error(f"--max-concurrency must be positive (got {args.max_concurrency})")
+    max_tenant_concurrency = args.max_tenant_concurrency or max(len(args.tenants), 1)
+    if args.max_tenant_concurrency is not None and args.max_tenant_concurrency < 1:
+        parser.error(f"--max-tenant-concurrency must be positive (got {args.max_tenant_concurrency})")
+    tenant_agnostic_names = [name for name in names if name in TENANT_AGNOSTIC_SWEEPERS]
+    if args.tenants and tenant_agnostic_names:
+        parser.error(f"{tenant_agnostic_names} do not operate per-tenant, so may not be combined with --tenants")
 
-    sweeper_descriptions = [module_name(f) for f in sweepers]
+    sweeper_descriptions = [module_name(get_sweeper(name)) for name in names]
     log.info(limit_log_length(f"Running sweepers: {sweeper_descriptions}"))
+    if args.max_concurrency > 1:
+        prerequisites = get_sweeper_prerequisites(names)
+        log.info(
+            limit_log_length(
+                f"Running up to {args.max_concurrency} sweepers concurrently, with prerequisites: {prerequisites}"
+            )
+        )
 
     total_execution_begin = datetime.now()
 
-    sweeper_execution_duration_strs = []
+    # a single client (and so a single connection pool) is shared by all sweepers, including those running concurrently,
+    # and the bulk writes of all sweepers are bounded together by the process-wide semaphore of utils.db.bulk
+    client = get_opensearch_client_from_environment(verify_certs=True if not dev_mode else False)
 
-    for sweeper in sweepers:
-        sweeper_execution_begin = datetime.now()
-        run_sweeper_f = run_factory(sweeper)
+    def run_selected_sweepers() -> Dict[str, str]:
+        return run_sweepers(
+            names, lambda name: run_factory(get_sweeper(name), client)(), max_concurrency=args.max_concurrency
+        )
+
+    if args.tenants:
+        log.info(limit_log_length(f"Sweeping tenants {args.tenants}, up to {max_tenant_concurrency} at once"))
+        tenant_results = run_tenants(args.tenants, run_selected_sweepers, max_tenant_concurrency)
 
-        run_sweeper_f()
+        tenant_execution_strs = []
+        for tenant, result in tenant_results.items():
+            outcome = "failed" if result.error is not None else "succeeded"
+            tenant_execution_strs.append(f"{tenant}: {outcome} in {result.elapsed}")
+            tenant_execution_strs.extend(
+                f"   {module_name(get_sweeper(name))}: {result.durations[name]}"
+                for name in names
+                if name in result.durations
+            )
 
-        sweeper_execution_duration_strs.append(
-            f"{module_name(sweeper)}: {get_human_readable_elapsed_since(sweeper_execution_begin)}"
+        failed_tenants = [tenant for tenant, result in tenant_results.items() if result.error is not None]
+        log.info(
+            limit_log_length(
+                f"Sweepers executed for {len(args.tenants)} tenants in "
+                f"{get_human_readable_elapsed_since(total_execution_begin)}\n   "
+                + "\n   ".join(tenant_execution_strs)
+            )
         )
+        if failed_tenants:
+            raise RuntimeError(f"Sweepers failed for tenants {failed_tenants}")
+        return
+
+    durations = run_selected_sweepers()
+    sweeper_execution_duration_strs = [f"{module_name(get_sweeper(name))}: {durations[name]}" for name in names]
 
     log.info(
         limit_log_length(
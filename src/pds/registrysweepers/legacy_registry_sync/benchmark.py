@@ -0,0 +1,260 @@
+"""
+Offline throughput benchmark of the legacy registry sync pipeline, against a Solr stand-in and a stand-in bulk sink.
+
+Documents are served by a SyntheticSolrIndex (seeded, so runs are reproducible) or replayed from a recording made with
+pds-legacy-registry-sync --solr-record, at a configurable per-request latency.  Bulk requests are acknowledged by a
+stand-in client after a configurable latency, so no OpenSearch cluster is required.  Each phase extends the pipeline of
+the previous one, so that the cost of each stage may be isolated:
+
+    online resources   load_online_resources()
+    read               SolrCursorReader
+    transform          SolrCursorReader -> SolrOsWrapperIter
+    sync               SolrCursorReader -> SolrOsWrapperIter -> write_bulk_concurrently()
+
+Results are written as a JSON report, which may be compared against the report of another commit, e.g.
+
+    python -m pds.registrysweepers.legacy_registry_sync.benchmark --docs 200000 --solr-latency-ms 50 --output base.json
+    python -m pds.registrysweepers.legacy_registry_sync.benchmark --docs 200000 --solr-latency-ms 50 --compare base.json
+    python -m pds.registrysweepers.legacy_registry_sync.benchmark --replay /tmp/solr.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from datetime import timezone
+from types import SimpleNamespace
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+from opensearchpy.serializer import JSONSerializer
+from pds.registrysweepers.legacy_registry_sync.online_resources import load_online_resources
+from pds.registrysweepers.legacy_registry_sync.solr_cursor_reader import SolrCursorReader
+from pds.registrysweepers.legacy_registry_sync.solr_doc_export_to_opensearch import SolrOsWrapperIter
+from pds.registrysweepers.legacy_registry_sync.solr_stand_in import create_solr_stand_in_session
+from pds.registrysweepers.legacy_registry_sync.solr_stand_in import RecordedSolrResponses
+from pds.registrysweepers.legacy_registry_sync.solr_stand_in import SolrHandler
+from pds.registrysweepers.legacy_registry_sync.solr_stand_in import SyntheticSolrIndex
+from pds.registrysweepers.utils import configure_logging
+from pds.registrysweepers.utils import parse_log_level
+from pds.registrysweepers.utils.bigdict.benchmark import get_git_commit
+from pds.registrysweepers.utils.db.bulk import write_bulk_concurrently
+
+log = logging.getLogger(__name__)
+
+REPORT_FORMAT_VERSION = 1
+
+# requests are answered by the stand-in whatever the url, so this only appears in logs
+STAND_IN_SOLR_URL = "http://solr-stand-in/services/search/search"
+BENCHMARK_INDEX = "en-legacy-registry-benchmark"
+
+BULK_OP_TYPES = {"index", "create", "update", "delete"}
+
+
+class StandInBulkClient:
+    """Minimal OpenSearch client acknowledging every action of each bulk request as written, after latency_seconds"""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.transport = SimpleNamespace(serializer=JSONSerializer())
+        self._latency_seconds = latency_seconds
+
+    def bulk(self, body: str, **kwargs: Any) -> Dict[str, Any]:
+        if self._latency_seconds > 0:
+            time.sleep(self._latency_seconds)
+
+        items = []
+        for line in body.splitlines():
+            entry = json.loads(line)
+            op_type = next(iter(entry)) if len(entry) == 1 else None
+            if op_type in BULK_OP_TYPES and isinstance(entry[op_type], dict) and "_id" in entry[op_type]:
+                items.append({op_type: {"_id": entry[op_type]["_id"], "status": 200}})
+        return {"errors": False, "items": items}
+
+
+def _count(docs: Iterable[Any]) -> int:
+    return sum(1 for _ in docs)
+
+
+def _timed(phase: str, f: Callable[[], int]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    count = f()
+    seconds = time.perf_counter() - start
+    result = {"seconds": seconds, "docs": count, "docs_per_second": count / seconds if seconds > 0 else None}
+    log.info(f"{phase:<20} {count:>10} docs {seconds:>10.3f}s {result['docs_per_second'] or 0:>12.1f} docs/s")
+    return result
+
+
+def run(
+    doc_count: int = 100000,
+    resource_count: int = 1000,
+    solr_latency_seconds: float = 0.0,
+    bulk_latency_seconds: float = 0.0,
+    solr_workers: int = 4,
+    rows: int = 500,
+    transform_workers: int = 0,
+    bulk_threads: int = 4,
+    max_chunk_bytes: int = 10 * 1024**2,
+    replay_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run every phase against the stand-ins, returning a JSON-serializable report"""
+    parameters = {
+        "docs": doc_count if replay_path is None else None,
+        "resources": resource_count if replay_path is None else None,
+        "replay": replay_path,
+        "solr_latency_seconds": solr_latency_seconds,
+        "bulk_latency_seconds": bulk_latency_seconds,
+        "solr_workers": solr_workers,
+        "rows": rows,
+        "transform_workers": transform_workers,
+        "bulk_threads": bulk_threads,
+        "max_chunk_bytes": max_chunk_bytes,
+    }
+
+    handler: SolrHandler
+    if replay_path is not None:
+        handler = RecordedSolrResponses(replay_path)
+    else:
+        log.info(f"Generating {doc_count} synthetic documents and {resource_count} online resources")
+        handler = SyntheticSolrIndex.generate(doc_count, resource_count)
+    session = create_solr_stand_in_session(handler, latency_seconds=solr_latency_seconds)
+
+    def read_solr() -> SolrCursorReader:
+        return SolrCursorReader(STAND_IN_SOLR_URL, "*", rows=rows, max_workers=solr_workers, session=session)
+
+    phases: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="legacy-sync-benchmark-") as tmp_dir:
+        loaded: List[Any] = []
+
+        def load() -> int:
+            sst_path = os.path.join(tmp_dir, "online_resources.sst")
+            loaded.append(load_online_resources(STAND_IN_SOLR_URL, sst_path, session=session, max_workers=solr_workers))
+            return len(loaded[0])
+
+        phases["online resources"] = _timed("online resources", load)
+        online_resources = loaded[0]
+
+        def transform() -> SolrOsWrapperIter:
+            return SolrOsWrapperIter(
+                read_solr(),
+                BENCHMARK_INDEX,
+                found_ids={},
+                online_resources=online_resources,
+                transform_workers=transform_workers,
+            )
+
+        def run_transform() -> int:
+            es_actions = transform()
+            try:
+                return _count(es_actions)
+            finally:
+                es_actions.close()
+
+        def run_sync() -> int:
+            es_actions = transform()
+            try:
+                results = write_bulk_concurrently(
+                    StandInBulkClient(bulk_latency_seconds),  # type: ignore
+                    es_actions,
+                    thread_count=bulk_threads,
+                    max_chunk_bytes=max_chunk_bytes,
+                )
+                return sum(1 for ok, _ in results if ok)
+            finally:
+                es_actions.close()
+
+        try:
+            phases["read"] = _timed("read", lambda: _count(read_solr()))
+            phases["transform"] = _timed("transform", run_transform)
+            phases["sync"] = _timed("sync", run_sync)
+        finally:
+            online_resources.close()
+
+    return {
+        "format_version": REPORT_FORMAT_VERSION,
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": get_git_commit(),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "parameters": parameters,
+        },
+        "phases": phases,
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare the throughput of each phase present in both reports, returning one row per phase.  A ratio above 1
+    indicates that the current report is faster than the baseline.
+    """
+    rows = []
+    for phase, result in current["phases"].items():
+        baseline_result = baseline["phases"].get(phase)
+        if baseline_result is None:
+            continue
+        baseline_value = baseline_result["docs_per_second"]
+        value = result["docs_per_second"]
+        rows.append(
+            {
+                "phase": phase,
+                "baseline": baseline_value,
+                "current": value,
+                "ratio": value / baseline_value if baseline_value and value is not None else None,
+            }
+        )
+
+    baseline_commit = baseline["metadata"].get("git_commit")
+    log.info(f"Comparison against baseline {baseline_commit or '(unknown commit)'} (docs/s):")
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        log.info(f"  {row['phase']:<20} {ratio:>8}")
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000, help="number of synthetic documents")
+    parser.add_argument("--resources", type=int, default=1000, help="number of synthetic online resources")
+    parser.add_argument("--replay", help="path of a recording made with --solr-record, replayed instead of synthetic")
+    parser.add_argument("--solr-latency-ms", type=float, default=0.0, help="latency of each Solr request")
+    parser.add_argument("--bulk-latency-ms", type=float, default=0.0, help="latency of each bulk request")
+    parser.add_argument("--solr-workers", type=int, default=4, help="number of concurrent Solr cursors")
+    parser.add_argument("--rows", type=int, default=500, help="Solr page size")
+    parser.add_argument("--transform-workers", type=int, default=0, help="number of transform worker processes")
+    parser.add_argument("--bulk-threads", type=int, default=4, help="number of concurrent bulk writers")
+    parser.add_argument("--output", help="path to write the JSON report to")
+    parser.add_argument("--compare", help="path of a previous JSON report to compare against")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    configure_logging(filepath=None, log_level=parse_log_level(args.log_level))
+    report = run(
+        doc_count=args.docs,
+        resource_count=args.resources,
+        solr_latency_seconds=args.solr_latency_ms / 1000,
+        bulk_latency_seconds=args.bulk_latency_ms / 1000,
+        solr_workers=args.solr_workers,
+        rows=args.rows,
+        transform_workers=args.transform_workers,
+        bulk_threads=args.bulk_threads,
+        replay_path=args.replay,
+    )
+
+    if args.output:
+        with open(args.output, "w") as outfile:
+            json.dump(report, outfile, indent=2)
+        log.info(f"Wrote report to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as infile:
+            compare_reports(json.load(infile), report)
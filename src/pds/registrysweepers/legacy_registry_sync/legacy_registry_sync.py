@@ -1,23 +1,41 @@
 import argparse
 import json
 import logging
+import os
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from datetime import timedelta
 from typing import Any
 from typing import Dict
 from typing import IO
 from typing import Optional
 
-import opensearchpy.helpers
 import requests
 from opensearchpy import OpenSearch
-from pds.registrysweepers.legacy_registry_sync.opensearch_loaded_product import get_already_loaded_lidvids
+from pds.registrysweepers.legacy_registry_sync.online_resources import iter_online_resources
+from pds.registrysweepers.legacy_registry_sync.online_resources import LEGACY_SYNC_CACHE_DIR
+from pds.registrysweepers.legacy_registry_sync.online_resources import load_online_resources
+from pds.registrysweepers.legacy_registry_sync.opensearch_loaded_product import iter_already_loaded_lidvids
+from pds.registrysweepers.legacy_registry_sync.solr_cursor_reader import SolrCursorReader
 from pds.registrysweepers.legacy_registry_sync.solr_doc_export_to_opensearch import SolrOsWrapperIter
+from pds.registrysweepers.legacy_registry_sync.solr_stand_in import create_recording_session
+from pds.registrysweepers.legacy_registry_sync.solr_stand_in import create_solr_stand_in_session
+from pds.registrysweepers.legacy_registry_sync.solr_stand_in import RecordedSolrResponses
+from pds.registrysweepers.legacy_registry_sync.sync_state import get_solr_max_version
+from pds.registrysweepers.legacy_registry_sync.sync_state import get_sync_watermark
+from pds.registrysweepers.legacy_registry_sync.sync_state import get_versions_since_query
+from pds.registrysweepers.legacy_registry_sync.sync_state import put_sync_watermark
+from pds.registrysweepers.legacy_registry_sync.sync_state import resolve_incremental_min_version
 from pds.registrysweepers.utils import configure_logging
+from pds.registrysweepers.utils.bigdict.sstabledict import SSTableDict
+from pds.registrysweepers.utils.bigdict.valuecodecs import InterningCodec
+from pds.registrysweepers.utils.db.bulk import write_bulk_concurrently
 from pds.registrysweepers.utils.db.client import get_opensearch_client_from_environment
 from pds.registrysweepers.utils.misc import is_dev_mode
 from pds.registrysweepers.utils.misc import limit_log_length
-from solr_to_es.solrSource import SlowSolrDocs  # type: ignore
+from pds.registrysweepers.utils.misc import parse_boolean_env_var
 
 log = logging.getLogger(__name__)
 
@@ -32,29 +50,43 @@ class _DatetimeEncoder(json.JSONEncoder):
 SOLR_URL = "https://pds.nasa.gov/services/search/search"
 OS_INDEX = "en-legacy-registry"
 MAX_RETRIES = 5
+SOLR_READER_WORKERS = 4
 
+# Optional environment variables. LEGACY_SYNC_INCREMENTAL expects a value like "true" or "1".  The overlap is a safety
+# margin subtracted from the high-water mark, to tolerate clock skew between the Solr shard leaders assigning _version_
+LEGACY_SYNC_INCREMENTAL = "LEGACY_SYNC_INCREMENTAL"
+LEGACY_SYNC_INCREMENTAL_OVERLAP_HOURS = "LEGACY_SYNC_INCREMENTAL_OVERLAP_HOURS"
+BULK_WRITE_THREADS = 4
+BULK_WRITE_MAX_CHUNK_BYTES = 10 * 1024**2
 
-def get_online_resources() -> Dict[str, str]:
-    """Get online resource from Solr."""
-    online_resources = {}
-    rows = 2000
-    start = 0
-    while True:
-        log.debug("pull online resource from solr, starting at %i", start)
-        response = requests.get(
-            f"https://pds.nasa.gov/services/search/search?q=data_class:Resource&wt=json&qt=all&rows={rows}&start={start}"
-        )
-        docs = response.json()["response"]["docs"]
-        for doc in docs:
-            if "lid" in doc and "resource_url" in doc:
-                online_resources[doc["lid"]] = doc["resource_url"][0]
 
-        if len(docs) < rows:
-            break
+def get_incremental_overlap() -> timedelta:
+    return timedelta(hours=int(os.environ.get(LEGACY_SYNC_INCREMENTAL_OVERLAP_HOURS, 1)))
 
-        start += rows
 
-    return online_resources
+def get_online_resources(
+    solr_workers: int = SOLR_READER_WORKERS, solr_session: Optional[requests.Session] = None
+) -> Dict[str, str]:
+    """Get online resource from Solr."""
+    return dict(
+        iter_online_resources(SOLR_URL, session=solr_session, max_workers=solr_workers, max_retries=MAX_RETRIES)
+    )
+
+
+def get_solr_session(
+    replay_path: Optional[str] = None, record_path: Optional[str] = None, pool_size: int = SOLR_READER_WORKERS
+) -> Optional[requests.Session]:
+    """
+    Return a session replaying the Solr responses recorded at replay_path, or recording Solr responses to record_path,
+    or None if neither is given (in which case Solr is queried directly)
+    """
+    if replay_path is not None:
+        log.info(f"Replaying Solr responses recorded at {replay_path}")
+        return create_solr_stand_in_session(RecordedSolrResponses(replay_path))
+    if record_path is not None:
+        log.info(f"Recording Solr responses to {record_path}")
+        return create_recording_session(record_path, pool_size=pool_size)
+    return None
 
 
 def create_legacy_registry_index(es_conn: OpenSearch) -> None:
@@ -75,42 +107,121 @@ def run(
     log_filepath: Optional[str] = None,
     log_level: int = logging.INFO,
     force: bool = False,
+    solr_workers: int = SOLR_READER_WORKERS,
+    cache_dir: Optional[str] = None,
+    incremental: Optional[bool] = None,
+    transform_workers: int = 0,
+    solr_session: Optional[requests.Session] = None,
 ) -> None:
     """
     Runs the Solr Legacy Registry synchronization with OpenSearch.
 
+    Each run which writes every document without error records the greatest Solr _version_ as of its start.  An
+    incremental run only reads Solr documents indexed or updated since that high-water mark (less a safety overlap).
+    Deletions from Solr are not detected, so full runs should still be scheduled periodically to reconcile them.
+
     @param client: OpenSearch client from the opensearchpy library
     @param log_filepath:
     @param log_level:
+    @param force: overwrite the node of documents which already have one, and perform a full (not incremental) sync
+    @param solr_workers: number of concurrent Solr cursors
+    @param cache_dir: directory in which to cache online resources between runs.  Defaults to the value of the
+    LEGACY_SYNC_CACHE_DIR environment variable, if set, else online resources are not cached
+    @param incremental: only sync Solr documents modified since the last successful sync.  Defaults to the value of the
+    LEGACY_SYNC_INCREMENTAL environment variable
+    @param transform_workers: number of worker processes transforming Solr documents, or 0 to transform in-process
+    @param solr_session: session to issue Solr requests with, e.g. a stand-in from get_solr_session()
     @return:
     """
 
     configure_logging(filepath=log_filepath, log_level=log_level)
 
-    solr_itr = SlowSolrDocs(SOLR_URL, "*", rows=500)
+    cache_dir = cache_dir or os.environ.get(LEGACY_SYNC_CACHE_DIR)
+    incremental = parse_boolean_env_var(LEGACY_SYNC_INCREMENTAL) if incremental is None else incremental
 
     create_legacy_registry_index(es_conn=client)
 
-    if force:
-        prod_ids = {}
-    else:
-        prod_ids = get_already_loaded_lidvids(
-            product_classes=["Product_Context", "Product_Collection", "Product_Bundle"], es_conn=client
-        )
-
-    online_resources = get_online_resources()
-
-    es_actions = SolrOsWrapperIter(solr_itr, OS_INDEX, found_ids=prod_ids, online_resources=online_resources, force=force)
-    dev_mode = is_dev_mode()
+    min_version: Optional[int] = None
+    if incremental and not force:
+        min_version = resolve_incremental_min_version(get_sync_watermark(client, OS_INDEX), get_incremental_overlap())
+    # read before any document, so that every document up to the high-water mark is visible to the cursors below
+    watermark = get_solr_max_version(SOLR_URL, session=solr_session, max_retries=MAX_RETRIES)
+    query = "*" if min_version is None else get_versions_since_query(min_version)
+    solr_itr = SolrCursorReader(
+        SOLR_URL, query, rows=500, max_workers=solr_workers, max_retries=MAX_RETRIES, session=solr_session
+    )
 
-    for operation_successful, operation_info in opensearchpy.helpers.streaming_bulk(
-        client, es_actions, chunk_size=50, max_chunk_bytes=50000000, max_retries=5, initial_backoff=10, timeout=120
-    ):
-        if not operation_successful:
-            log.error(limit_log_length(operation_info))
+    # the lidvid->node and lid->url lookup tables are built once then only read, so are held in memory-mapped SSTables
+    # rather than python dicts for the lifetime of the sync
+    with tempfile.TemporaryDirectory(prefix="legacy-registry-sync-") as tmp_dir:
+        # online resources are fetched from Solr while the already-loaded lidvids are read from OpenSearch
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="OnlineResourcesPrefetch") as prefetch_executor:
+            online_resources_future = prefetch_executor.submit(
+                load_online_resources,
+                SOLR_URL,
+                os.path.join(tmp_dir, "online_resources.sst"),
+                cache_dir=cache_dir,
+                session=solr_session,
+                max_workers=solr_workers,
+                max_retries=MAX_RETRIES,
+            )
 
-        if dev_mode:
-            break
+            loaded_lidvids = (
+                []
+                if force
+                else iter_already_loaded_lidvids(
+                    product_classes=["Product_Context", "Product_Collection", "Product_Bundle"], es_conn=client
+                )
+            )
+            # node names are stored as single-byte codes into a table of the few distinct names
+            prod_ids = SSTableDict.build(os.path.join(tmp_dir, "found_ids.sst"), loaded_lidvids, codec=InterningCodec())
+            try:
+                online_resources = online_resources_future.result()
+            except Exception:
+                prod_ids.close()
+                raise
+
+        es_actions = SolrOsWrapperIter(
+            solr_itr,
+            OS_INDEX,
+            found_ids=prod_ids,
+            online_resources=online_resources,
+            force=force,
+            transform_workers=transform_workers,
+        )
+        try:
+            dev_mode = is_dev_mode()
+            failed_count = 0
+            interrupted = False
+
+            for operation_successful, operation_info in write_bulk_concurrently(
+                client,
+                es_actions,
+                thread_count=BULK_WRITE_THREADS,
+                max_chunk_bytes=BULK_WRITE_MAX_CHUNK_BYTES,
+                max_retries=5,
+                initial_backoff_seconds=10,
+                request_timeout_seconds=120,
+            ):
+                if not operation_successful:
+                    failed_count += 1
+                    log.error(limit_log_length(str(operation_info)))
+
+                if dev_mode:
+                    interrupted = True
+                    break
+        finally:
+            es_actions.close()
+            prod_ids.close()
+            online_resources.close()
+
+    # the high-water mark is only advanced once every document up to it is known to have been written
+    if failed_count > 0 or interrupted:
+        log.warning(
+            f"Not advancing legacy sync high-water mark ({failed_count} writes failed, interrupted={interrupted})"
+        )
+    elif watermark is not None:
+        put_sync_watermark(client, OS_INDEX, watermark)
 
     print(es_actions._seen_domains)
     print(es_actions._seen_node_ids)
@@ -124,6 +235,9 @@ def dry_run(
     sample_size: int = 5,
     output_file: Optional[str] = None,
     force: bool = False,
+    solr_workers: int = SOLR_READER_WORKERS,
+    transform_workers: int = 0,
+    solr_session: Optional[requests.Session] = None,
 ) -> Dict[str, Any]:
     """
     Performs a dry run of the Solr Legacy Registry synchronization without interacting with OpenSearch.
@@ -135,6 +249,9 @@ def dry_run(
     @param show_sample_docs: Whether to show sample documents (default: True)
     @param sample_size: Number of sample documents to show (default: 5)
     @param output_file: Path to write OpenSearch payloads as JSON lines (default: None)
+    @param solr_workers: Number of concurrent Solr cursors (default: 4)
+    @param transform_workers: Number of worker processes transforming Solr documents (default: 0, i.e. in-process)
+    @param solr_session: Session to issue Solr requests with, e.g. a stand-in from get_solr_session() (default: None)
     @return: Dictionary with statistics about the dry run
     """
 
@@ -145,12 +262,14 @@ def dry_run(
 
     # Get online resources from Solr
     log.info("Retrieving online resources from Solr...")
-    online_resources = get_online_resources()
+    online_resources = get_online_resources(solr_workers=solr_workers, solr_session=solr_session)
     log.info("Retrieved %d online resources", len(online_resources))
 
     # Initialize Solr iterator
     log.info("Initializing Solr document iterator...")
-    solr_itr = SlowSolrDocs(SOLR_URL, "*", rows=500)
+    solr_itr = SolrCursorReader(
+        SOLR_URL, "*", rows=500, max_workers=solr_workers, max_retries=MAX_RETRIES, session=solr_session
+    )
 
     # Statistics tracking
     stats: Dict[str, Any] = {
@@ -168,7 +287,14 @@ def dry_run(
 
     # Use the existing SolrOsWrapperIter to analyze documents without OpenSearch
     # We pass empty found_ids since we're not checking against OpenSearch
-    wrapper = SolrOsWrapperIter(solr_itr, OS_INDEX, found_ids={}, online_resources=online_resources, force=force)
+    wrapper = SolrOsWrapperIter(
+        solr_itr,
+        OS_INDEX,
+        found_ids={},
+        online_resources=online_resources,
+        force=force,
+        transform_workers=transform_workers,
+    )
 
     output_fh: Optional[IO] = None
     if output_file:
@@ -250,6 +376,7 @@ def dry_run(
         log.error("Error during dry run: %s", str(e))
         stats["errors"].append(str(e))
     finally:
+        wrapper.close()
         if output_fh:
             output_fh.close()
             log.info("Payload written to %s", output_file)
@@ -321,8 +448,13 @@ Examples:
   %(prog)s --dry-run --max-docs 20 --sample-size 10
   %(prog)s --dry-run --max-docs 100 --output-file /tmp/payload.jsonl
 
+  # Record Solr responses during a dry run, then replay them offline
+  %(prog)s --dry-run --max-docs 1000 --solr-record /tmp/solr.jsonl
+  %(prog)s --dry-run --max-docs 1000 --solr-replay /tmp/solr.jsonl
+
   # Full sync to OpenSearch
   %(prog)s
+  %(prog)s --incremental
   %(prog)s --force
   %(prog)s --force --log-file sync.log
         """,
@@ -338,7 +470,46 @@ Examples:
     parser.add_argument(
         "--force",
         action="store_true",
-        help="Overwrite the node for documents that already have one set in the registry",
+        help="Overwrite the node for documents that already have one set in the registry, and perform a full sync",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=None,
+        help="Only sync Solr documents indexed since the last successful sync (default: $LEGACY_SYNC_INCREMENTAL)",
+    )
+
+    parser.add_argument(
+        "--solr-workers",
+        type=int,
+        default=SOLR_READER_WORKERS,
+        help=f"Number of concurrent Solr cursors (default: {SOLR_READER_WORKERS})",
+    )
+
+    parser.add_argument(
+        "--transform-workers",
+        type=int,
+        default=0,
+        help="Number of worker processes transforming Solr documents (default: 0, i.e. transform in-process)",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get(LEGACY_SYNC_CACHE_DIR),
+        help=f"Directory in which to cache Solr online resources between runs (default: ${LEGACY_SYNC_CACHE_DIR})",
+    )
+
+    solr_session_group = parser.add_mutually_exclusive_group()
+    solr_session_group.add_argument(
+        "--solr-record",
+        metavar="PATH",
+        help="Record Solr responses to a JSON lines file, for later replay",
+    )
+    solr_session_group.add_argument(
+        "--solr-replay",
+        metavar="PATH",
+        help="Replay Solr responses from a JSON lines file written by --solr-record, rather than querying Solr",
     )
 
     # Logging arguments
@@ -380,11 +551,22 @@ Examples:
 
     # Convert log level string to integer
     log_level = getattr(logging, args.log_level)
+    solr_session = get_solr_session(args.solr_replay, args.solr_record, pool_size=args.solr_workers)
 
     if not args.dry_run:
         try:
             client = get_opensearch_client_from_environment(verify_certs=not is_dev_mode())
-            run(client=client, log_filepath=args.log_file, log_level=log_level, force=args.force)
+            run(
+                client=client,
+                log_filepath=args.log_file,
+                log_level=log_level,
+                force=args.force,
+                solr_workers=args.solr_workers,
+                transform_workers=args.transform_workers,
+                cache_dir=args.cache_dir,
+                incremental=args.incremental,
+                solr_session=solr_session,
+            )
         except KeyboardInterrupt:
             print("\nSync interrupted by user")
             sys.exit(1)
@@ -405,6 +587,9 @@ Examples:
             sample_size=args.sample_size,
             output_file=args.output_file,
             force=args.force,
+            solr_workers=args.solr_workers,
+            transform_workers=args.transform_workers,
+            solr_session=solr_session,
         )
 
         print("\n" + "=" * 60)
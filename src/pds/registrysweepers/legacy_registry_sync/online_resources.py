@@ -0,0 +1,147 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import requests
+from pds.registrysweepers.legacy_registry_sync.solr_cursor_reader import create_pooled_session
+from pds.registrysweepers.legacy_registry_sync.solr_cursor_reader import solr_request
+from pds.registrysweepers.utils.bigdict.sstabledict import SSTableDict
+from pds.registrysweepers.utils.bigdict.valuecodecs import MarshalCodec
+
+log = logging.getLogger(__name__)
+
+ONLINE_RESOURCES_QUERY = "data_class:Resource"
+ONLINE_RESOURCES_PAGE_SIZE = 2000
+ONLINE_RESOURCES_CACHE_FILENAME = "online_resources.sst"
+
+# Optional environment variable specifying a directory in which to cache online resources between runs
+LEGACY_SYNC_CACHE_DIR = "LEGACY_SYNC_CACHE_DIR"
+
+
+def _resource_params(**params: Any) -> Dict[str, Any]:
+    return {"q": ONLINE_RESOURCES_QUERY, "qt": "all", **params}
+
+
+def iter_online_resources(
+    solr_url: str,
+    session: Optional[requests.Session] = None,
+    max_workers: int = 4,
+    page_size: int = ONLINE_RESOURCES_PAGE_SIZE,
+    max_retries: int = 5,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Stream (lid, resource_url) pairs of online resources from Solr.
+
+    The total count is requested first, so that every page offset is known up front and pages may be fetched
+    concurrently over a shared keep-alive session.  Pages are sorted by the unique key so that offsets are stable.
+
+    @param solr_url: url of the Solr search handler
+    @param session: session to issue requests with.  If None, a session pooling max_workers connections is used
+    @param max_workers: maximum number of pages fetched concurrently
+    @param page_size: number of resources per page
+    @param max_retries: maximum attempts of each request before failing
+    """
+    session = session or create_pooled_session(max_workers)
+
+    count_response = solr_request(session, solr_url, _resource_params(rows=0), max_retries=max_retries)
+    resources_count = count_response["response"]["numFound"]
+    page_starts = range(0, resources_count, page_size)
+    log.info(f"Fetching {resources_count} online resources from Solr in {len(page_starts)} pages")
+
+    def fetch_page(start: int) -> List[Dict]:
+        log.debug("pull online resource from solr, starting at %i", start)
+        params = _resource_params(rows=page_size, start=start, sort="identifier asc")
+        return solr_request(session, solr_url, params, max_retries=max_retries)["response"]["docs"]
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="OnlineResources") as executor:
+        # map() yields pages in offset order as they complete, while later pages continue to be fetched
+        for docs in executor.map(fetch_page, page_starts):
+            for doc in docs:
+                if "lid" in doc and "resource_url" in doc:
+                    yield doc["lid"], doc["resource_url"][0]
+
+
+def get_online_resources_version(
+    solr_url: str, session: Optional[requests.Session] = None, max_retries: int = 5
+) -> Optional[str]:
+    """
+    Return a token which changes whenever the online resources indexed in Solr change, or None if Solr does not
+    support producing one.
+
+    The token combines the number of resources with the greatest _version_ among them.  As Solr assigns each indexed
+    document a monotonically-increasing _version_, any addition or update changes the latter, and any deletion changes
+    the former.
+    """
+    session = session or requests.Session()
+    params = _resource_params(rows=1, fl="_version_", sort="_version_ desc")
+    try:
+        response = solr_request(session, solr_url, params, max_retries=max_retries)
+        docs = response["response"]["docs"]
+        max_version = docs[0]["_version_"] if docs else None
+    except (requests.RequestException, KeyError, ValueError) as err:
+        log.warning(f"Could not determine Solr version of online resources, so the cache will not be used: {err}")
+        return None
+
+    return f"{response['response']['numFound']}-{max_version}"
+
+
+def load_online_resources(
+    solr_url: str,
+    db_path: str,
+    cache_dir: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    max_workers: int = 4,
+    max_retries: int = 5,
+) -> SSTableDict:
+    """
+    Return an SSTableDict mapping online resource lid to url.
+
+    If cache_dir is given, the table is kept there between runs, alongside the Solr version of the resources from
+    which it was built (see get_online_resources_version()), and is only refetched if that version has changed.
+    Otherwise, it is built at db_path.
+
+    @param solr_url: url of the Solr search handler
+    @param db_path: path at which to build the table if no cache_dir is given
+    @param cache_dir: directory in which to cache the table between runs, or None to disable caching
+    @param session: session to issue requests with.  If None, a session pooling max_workers connections is used
+    @param max_workers: maximum number of pages fetched concurrently
+    @param max_retries: maximum attempts of each request before failing
+    """
+    session = session or create_pooled_session(max_workers)
+    codec = MarshalCodec()
+
+    def fetch(path: str) -> SSTableDict:
+        resources = iter_online_resources(solr_url, session, max_workers=max_workers, max_retries=max_retries)
+        return SSTableDict.build(path, resources, codec=codec)
+
+    if cache_dir is None:
+        return fetch(db_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, ONLINE_RESOURCES_CACHE_FILENAME)
+    version_path = cache_path + ".version"
+
+    # the version is taken before fetching, so a change during the fetch leaves the cache stale and refetched next run
+    version = get_online_resources_version(solr_url, session, max_retries=max_retries)
+    if version is not None and os.path.exists(cache_path) and os.path.exists(version_path):
+        with open(version_path) as version_file:
+            cached_version = version_file.read()
+        if cached_version == version:
+            log.info(f"Using cached online resources at {cache_path} (version {version})")
+            return SSTableDict(cache_path, codec=codec)
+        log.info(f"Cached online resources are outdated (version {cached_version}, current {version})")
+
+    # the version file is removed first, so that an interrupted build is never taken for a valid cache
+    if os.path.exists(version_path):
+        os.remove(version_path)
+    table = fetch(cache_path)
+    if version is not None:
+        with open(version_path, "w") as version_file:
+            version_file.write(version)
+    return table
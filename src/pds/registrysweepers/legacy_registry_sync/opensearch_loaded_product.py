@@ -1,12 +1,14 @@
+import sys
 from typing import Any
 from typing import Dict
-from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 
 import opensearchpy  # type: ignore
 from opensearchpy import OpenSearch
-from pds.registrysweepers.utils.db import query_registry_db_with_search_after
+from pds.registrysweepers.utils.db import query_registry_db_for_ids
 from pds.registrysweepers.utils.db.multitenancy import resolve_multitenant_index_name
 
 # Optional Environment variable  used for the Cross Cluster Search
@@ -19,15 +21,28 @@ def get_already_loaded_lidvids(
 ) -> Dict[str, Optional[str]]:
     """
     Get the lidvids of the PDS4 products already loaded in the (new) registry.
+    See iter_already_loaded_lidvids()
+
+    @return: dict mapping already-loaded PDS4 lidvid to ops:Harvest_Info/ops:node_name (or None if absent)
+    """
+    return dict(iter_already_loaded_lidvids(product_classes=product_classes, es_conn=es_conn))
+
+
+def iter_already_loaded_lidvids(
+    product_classes: Optional[List[str]] = None, es_conn: Optional[OpenSearch] = None
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Stream the lidvids of the PDS4 products already loaded in the (new) registry.
     Note that this function should not be applied to the product classes Product_Observational or documents, there would be too many results.
 
     @param product_classes: list of the product classes you are interested in,
     e.g. "Product_Bundle", "Product_Collection" ...
     @param es_conn: elasticsearch.ElasticSearch instance for the ElasticSearch or OpenSearch connection
-    @return: dict mapping already-loaded PDS4 lidvid to ops:Harvest_Info/ops:node_name (or None if absent)
+    @return: (lidvid, ops:Harvest_Info/ops:node_name) pairs for each already-loaded PDS4 product. node_name is None if
+    absent
     """
 
-    query: Dict[str, Any] = {"query": {"bool": {"should": [], "minimum_should_match": 1}}, "fields": ["_id"]}
+    query: Dict[str, Any] = {"query": {"bool": {"should": [], "minimum_should_match": 1}}}
 
     prod_class_prop = "pds:Identification_Area.pds:product_class"
     node_name_field = "ops:Harvest_Info.ops:node_name"
@@ -37,14 +52,16 @@ def get_already_loaded_lidvids(
             dict(match_phrase={prod_class_prop: prod_class}) for prod_class in product_classes
         ]
 
-    sort_field = "ops:Harvest_Info.ops:harvest_date_time"
     assert es_conn is not None, "es_conn must be provided"
-    prod_id_resp: Iterable[Dict[str, Any]] = query_registry_db_with_search_after(
+    # only the _id and node name are required, so neither _source nor a sort on a stored field is fetched
+    hits = query_registry_db_for_ids(
         es_conn,
         resolve_multitenant_index_name(es_conn, "registry"),
-        _source={"includes": ["_id", sort_field, node_name_field], "excludes": []},
         query=query,
-        sort_fields=[sort_field],
+        docvalue_fields=[node_name_field],
     )
 
-    return {p["_id"]: p.get("_source", {}).get(node_name_field) for p in prod_id_resp}
+    for hit in hits:
+        node_names = hit.get("fields", {}).get(node_name_field)
+        # node names are drawn from a small vocabulary, so interning them avoids holding a copy per product
+        yield hit["_id"], sys.intern(node_names[0]) if node_names else None
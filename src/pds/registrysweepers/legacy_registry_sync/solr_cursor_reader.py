@@ -0,0 +1,221 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import requests
+from pds.registrysweepers.utils.misc import auto_raise_for_status
+from pds.registrysweepers.utils.misc import limit_log_length
+from requests.adapters import HTTPAdapter
+from retry.api import retry_call
+
+log = logging.getLogger(__name__)
+
+# marks the exhaustion of a partition's cursor in the page queue
+_END_OF_PARTITION = object()
+
+
+def create_pooled_session(pool_size: int) -> requests.Session:
+    """Return a keep-alive session whose connection pool accommodates pool_size concurrent requests"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def solr_request(
+    session: requests.Session,
+    solr_url: str,
+    params: Dict[str, Any],
+    timeout_seconds: int = 60,
+    max_retries: int = 5,
+) -> Dict[str, Any]:
+    """Issue a Solr request with the given params, retrying with exponential backoff, and return the decoded response"""
+    response = retry_call(
+        auto_raise_for_status(session.get),
+        fargs=[solr_url],
+        fkwargs={"params": {"wt": "json", **params}, "timeout": timeout_seconds},
+        tries=max_retries,
+        delay=2,
+        backoff=2,
+        exceptions=requests.RequestException,
+        logger=log,
+    )
+    return response.json()
+
+
+class SolrCursorReader:
+    """
+    Iterable over all Solr documents matching a query, yielding each document as the raw dict returned by Solr (i.e. in
+    the same shape as solr_to_es.SlowSolrDocs).
+
+    Documents are paged with cursorMark rather than start/rows, so each request costs the same regardless of depth.
+    The keyspace is split into partitions, by default one per value of partition_field (as reported by a facet query),
+    plus one for documents lacking that field, and partitions are read by concurrent cursors sharing a pooled
+    requests.Session.  Documents are yielded in the order their pages arrive, so ordering is unspecified across
+    partitions.
+
+    partition_field must be single-valued, or documents with multiple values will be yielded once per value.
+    """
+
+    def __init__(
+        self,
+        solr_url: str,
+        query: str = "*",
+        rows: int = 500,
+        partition_field: Optional[str] = "product_class",
+        partition_filters: Optional[List[Optional[str]]] = None,
+        max_workers: int = 4,
+        session: Optional[requests.Session] = None,
+        unique_key: str = "identifier",
+        params: Optional[Dict[str, Any]] = None,
+        request_timeout_seconds: int = 60,
+        max_retries: int = 5,
+    ):
+        """
+        @param solr_url: url of the Solr search handler
+        @param query: Solr query (q) selecting the documents to read
+        @param rows: page size
+        @param partition_field: field whose values are used to partition the keyspace, or None to read with one cursor
+        @param partition_filters: explicit filter queries (fq), one per partition, overriding partition_field.  A None
+        element denotes a partition with no filter
+        @param max_workers: maximum number of partitions read concurrently
+        @param session: session to issue requests with.  If None, a session pooling max_workers connections is used
+        @param unique_key: the uniqueKey field of the Solr schema, which cursorMark paging requires in the sort
+        @param params: additional parameters sent with every request, e.g. {"fl": "lid,lidvid"}
+        @param request_timeout_seconds: timeout of each request
+        @param max_retries: maximum attempts of each request before failing
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be positive (got {max_workers})")
+
+        self._solr_url = solr_url
+        self._query = query
+        self._rows = rows
+        self._partition_field = partition_field
+        self._partition_filters = partition_filters
+        self._max_workers = max_workers
+        self._unique_key = unique_key
+        self._params = params or {}
+        self._request_timeout_seconds = request_timeout_seconds
+        self._max_retries = max_retries
+
+        self._session = session or create_pooled_session(max_workers)
+
+    def _request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return solr_request(
+            self._session,
+            self._solr_url,
+            {"q": self._query, **self._params, **params},
+            timeout_seconds=self._request_timeout_seconds,
+            max_retries=self._max_retries,
+        )
+
+    def get_partition_filters(self) -> List[Optional[str]]:
+        """Return the filter query (or None, for no filter) of each partition of the keyspace"""
+        if self._partition_filters is not None:
+            return list(self._partition_filters)
+        if self._partition_field is None:
+            return [None]
+
+        field = self._partition_field
+        response = self._request(
+            {
+                "rows": 0,
+                "facet": "true",
+                "facet.field": field,
+                "facet.limit": -1,
+                "facet.mincount": 1,
+                "facet.missing": "true",
+            }
+        )
+
+        # facet counts are a flat list of alternating values and counts, where the count of documents lacking the
+        # field, if requested, has a null value
+        facet_counts = response["facet_counts"]["facet_fields"][field]
+        filters: List[Optional[str]] = []
+        for value, count in zip(facet_counts[::2], facet_counts[1::2]):
+            if count == 0:
+                continue
+            filters.append(f"-{field}:[* TO *]" if value is None else f"{{!term f={field}}}{value}")
+
+        log.info(
+            f"Partitioned {response['response']['numFound']} Solr documents into {len(filters)} partitions by {field}"
+        )
+        return filters
+
+    def _read_partition(self, filter_query: Optional[str], pages: queue.Queue, stopped: threading.Event) -> None:
+        def put(item: Any) -> bool:
+            # block while the consumer is behind, but give up if it has stopped consuming altogether
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            cursor_mark = "*"
+            served_docs = 0
+            while True:
+                params: Dict[str, Any] = {
+                    "rows": self._rows,
+                    "sort": f"{self._unique_key} asc",
+                    "cursorMark": cursor_mark,
+                }
+                if filter_query is not None:
+                    params["fq"] = filter_query
+                response = self._request(params)
+
+                docs = response["response"]["docs"]
+                served_docs += len(docs)
+                if cursor_mark == "*":
+                    log.info(f"Reading {response['response']['numFound']} Solr documents matching fq={filter_query}")
+
+                if docs and not put(docs):
+                    return
+
+                next_cursor_mark = response["nextCursorMark"]
+                if next_cursor_mark == cursor_mark:
+                    log.info(f"Read {served_docs} Solr documents matching fq={filter_query}")
+                    put(_END_OF_PARTITION)
+                    return
+                cursor_mark = next_cursor_mark
+        except Exception as err:
+            log.error(limit_log_length(f"Failed to read Solr documents matching fq={filter_query}: {err}"))
+            put(err)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        partition_filters = self.get_partition_filters()
+        if not partition_filters:
+            return
+
+        pages: queue.Queue = queue.Queue(maxsize=2 * self._max_workers)
+        stopped = threading.Event()
+        executor = ThreadPoolExecutor(
+            max_workers=min(self._max_workers, len(partition_filters)), thread_name_prefix="SolrCursorReader"
+        )
+        for filter_query in partition_filters:
+            executor.submit(self._read_partition, filter_query, pages, stopped)
+
+        try:
+            remaining_partitions = len(partition_filters)
+            while remaining_partitions > 0:
+                page = pages.get()
+                if page is _END_OF_PARTITION:
+                    remaining_partitions -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield from page
+        finally:
+            # also reached if the consumer stops early, in which case outstanding partition reads are abandoned
+            stopped.set()
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -1,12 +1,23 @@
+import functools
 import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
 from typing import Any
+from typing import Callable
+from typing import Deque
 from typing import Dict
-from typing import Iterator
+from typing import List
 from typing import Optional
 from typing import Set
+from typing import Tuple
+from typing import Union
 from urllib.parse import urlparse
 
+from pds.registrysweepers.utils.bigdict.base import BigDict
 from pds.registrysweepers.utils.misc import limit_log_length
 
 log = logging.getLogger(__name__)
@@ -157,14 +168,206 @@ def get_node_from_file_ref(file_ref: str) -> str:
     return NODE_FOLDERS.get(node_dir, "PDS_ENG")
 
 
+# Context resolved from the lookup tables for each document before transformation, so that transformation itself
+# requires no shared state and may run in worker processes: (found in registry, registry node, resource_ref url)
+DocContext = Tuple[bool, Optional[str], Optional[str]]
+
+
+@functools.lru_cache(maxsize=65536)
+def _parse_solr_date(value: str) -> datetime:
+    # legacy documents share relatively few distinct dates, so parsed values are cached
+    return datetime.fromisoformat(value.replace("Z", ""))
+
+
+def _get_valid_date(field_name: str, value: str) -> datetime:
+    try:
+        return _parse_solr_date(value)
+    except ValueError:
+        log.warning(
+            limit_log_length(
+                f"Date {[value]} for field {field_name} is invalid, assign default datetime 01-01-1950 instead"
+            )
+        )
+        return datetime(1950, 1, 1, 0, 0, 0)
+
+
+def _copy_field(source: Dict[str, Any], field_name: str, values: List[Any]) -> None:
+    source[field_name] = values
+
+
+def _copy_date_field(source: Dict[str, Any], field_name: str, values: List[str]) -> None:
+    source[field_name] = [_get_valid_date(field_name, values[0])]
+
+
+def _copy_latest_date_field(source: Dict[str, Any], field_name: str, values: List[str]) -> None:
+    # only keep the latest modification date, for kibana
+    source[field_name] = [_get_valid_date(field_name, values[-1])]
+
+
+def _copy_year_field(source: Dict[str, Any], field_name: str, values: List[str]) -> None:
+    if len(values[0]) > 0:
+        source[field_name] = values
+    else:
+        log.warning(limit_log_length(f"Year {values} for field {field_name} is invalid"))
+
+
+FieldHandler = Callable[[Dict[str, Any], str, List[Any]], None]
+
+# handler of each field name encountered so far, as the handling of a field depends only on its name
+_field_handlers: Dict[str, FieldHandler] = {}
+
+
+def _get_field_handler(field_name: str) -> FieldHandler:
+    handler = _field_handlers.get(field_name)
+    if handler is None:
+        if field_name == "modification_date":
+            handler = _copy_latest_date_field
+        elif "date" in field_name:
+            handler = _copy_date_field
+        elif "year" in field_name:
+            handler = _copy_year_field
+        else:
+            handler = _copy_field
+        _field_handlers[field_name] = handler
+    return handler
+
+
+def get_url_netloc(url: str) -> str:
+    """Equivalent to urlparse(url).netloc for absolute urls, which is all that legacy resource urls are expected to be"""
+    scheme_end = url.find("://")
+    if scheme_end < 1:
+        return urlparse(url).netloc
+    netloc_start = scheme_end + 3
+    netloc_end = len(url)
+    for delimiter in "/?#":
+        delimiter_index = url.find(delimiter, netloc_start, netloc_end)
+        if delimiter_index >= 0:
+            netloc_end = delimiter_index
+    return url[netloc_start:netloc_end]
+
+
+def attribute_node(
+    doc: Dict[str, Any],
+    context: DocContext,
+    seen_domains: Set[str],
+    seen_node_ids: Set[str],
+) -> str:
+    """
+    Infer the node from the url resource's DNS, or from the other clues present in the document.  Domains and node ids
+    encountered are added to seen_domains and seen_node_ids.
+
+    @param doc: legacy registry document
+    @param context: (found in registry, registry node, resource_ref url) as resolved by SolrOsWrapperIter.  The
+    registry node, if present, takes precedence
+    """
+    _, registry_node, resource_ref_url = context
+    if registry_node:
+        return registry_node
+
+    if "agency_name" in doc:
+        agency = doc["agency_name"][0]
+        if agency == "esa":
+            return "PSA"
+        elif agency == "Unknown":
+            return UNKNOWN_NODE
+
+    if "product_class" in doc:
+        product_class = doc["product_class"][0]
+        if product_class in ENG_PRODUCT_CLASSES:
+            # we automatically assign specific product classes to ENG
+            return "PDS_ENG"
+        elif product_class in UNK_PRODUCT_CLASSES:  # we don't bother to attribute a node to other product classes
+            return UNKNOWN_NODE
+
+    if "resource_url" in doc:
+        domain = get_url_netloc(doc["resource_url"][0])
+        seen_domains.add(domain)
+        if domain in NODE_DOMAINS:
+            return NODE_DOMAINS[domain]
+
+    if "resource_ref" in doc:
+        if resource_ref_url is not None:
+            domain = get_url_netloc(resource_ref_url)
+            seen_domains.add(domain)
+            if domain in NODE_DOMAINS:
+                return NODE_DOMAINS[domain]
+        else:
+            online_resource_id = get_online_resource_id(doc["resource_ref"][0])
+            log.warning("Skipping not found online resource '%s' of doc %s", online_resource_id, doc["lid"])
+
+    if "node_id" in doc:
+        node_id = doc["node_id"][0]
+        seen_node_ids.add(node_id)
+        if node_id in NODE_ID:
+            return NODE_ID[node_id]
+
+    if "file_ref_url" in doc:
+        url = doc["file_ref_url"][0]
+        return get_node_from_file_ref(url)
+
+    log.warning(
+        "Unable to attribute node for product %s, none of resource_url, resource_ref, file_ref_url, node_id were found",
+        doc["lid"],
+    )
+
+    return UNKNOWN_NODE
+
+
+def transform_solr_doc(
+    doc: Dict[str, Any],
+    context: DocContext,
+    index: str,
+    seen_domains: Set[str],
+    seen_node_ids: Set[str],
+) -> Dict[str, Any]:
+    """Return the OpenSearch bulk action migrating a legacy registry document with a lidvid, given its context"""
+    new_doc: Dict[str, Any] = dict()
+    new_doc["_index"] = index
+    new_doc["_type"] = "update"
+    new_doc["doc_as_upsert"] = True
+
+    # remove empty fields
+    source: Dict[str, Any] = {}
+    for k, v in doc.items():
+        _get_field_handler(k)(source, k, v)
+
+    # add modification date because kibana needs it for its time field
+    if "modification_date" not in source:
+        source["modification_date"] = [DEFAULT_MODIFICATION_DATE]
+
+    new_doc["_id"] = pds4_id_field_fun(doc)
+    new_doc["_source"] = source
+    found_in_registry, _, _ = context
+    source["found_in_registry"] = "true" if found_in_registry else "false"
+    source["node"] = attribute_node(doc, context, seen_domains, seen_node_ids)
+    return new_doc
+
+
+def transform_solr_docs(
+    docs_with_context: List[Tuple[Dict[str, Any], DocContext]], index: str
+) -> Tuple[List[Dict[str, Any]], Set[str], Set[str]]:
+    """
+    Transform a batch of legacy registry documents, returning their bulk actions alongside the domains and node ids
+    encountered.  This is a module-level function so that batches may be transformed in worker processes.
+    """
+    seen_domains: Set[str] = set()
+    seen_node_ids: Set[str] = set()
+    os_docs = [
+        transform_solr_doc(doc, context, index, seen_domains, seen_node_ids) for doc, context in docs_with_context
+    ]
+    return os_docs, seen_domains, seen_node_ids
+
+
 class SolrOsWrapperIter:
     def __init__(
         self,
         solr_itr: Any,
         es_index: str,
-        found_ids: Optional[Dict[str, Optional[str]]] = None,
-        online_resources: Optional[Dict[str, str]] = None,
+        found_ids: Optional[Union[Dict[str, Optional[str]], BigDict]] = None,
+        online_resources: Optional[Union[Dict[str, str], BigDict]] = None,
         force: bool = False,
+        batch_size: int = 500,
+        transform_workers: int = 0,
     ):
         """
         Iterable on the Solr legacy registry documents returning the migrated document for each iteration (next).
@@ -173,10 +376,15 @@ class SolrOsWrapperIter:
         - the Discipline Node responsible for the product
         - a flag set to True if the current document was loaded in the new registry.
 
-        @param solr_itr: iterator on the solr documents. SlowSolrDocs instance from the solr-to-es repository
+        Documents are read and transformed in batches.  Lookups into found_ids and online_resources are made in the
+        calling process (with online resources memoized per LID), after which each batch may be transformed in a pool
+        of transform_workers processes, as transformation is CPU-bound.  Documents are returned in the order read.
+
+        @param solr_itr: iterator on the solr documents, e.g. a SolrCursorReader
         @param es_index: OpenSearch/ElasticSearch index name
         @param found_ids: dict mapping lidvid to ops:Harvest_Info/ops:node_name for products already in the new registry
-        @param rolls_over_target: artificially increase the number entries by re-running the loop n times
+        @param batch_size: number of documents transformed at once
+        @param transform_workers: number of worker processes transforming batches, or 0 to transform in this process
         """
         self.index = es_index
         self.type = "update"
@@ -188,117 +396,100 @@ class SolrOsWrapperIter:
         self._seen_domains: Set[str] = set()
         self._seen_node_ids: Set[str] = set()
 
+        self._batch_size = batch_size
+        self._transform_workers = transform_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending_batches: Deque[Future] = deque()
+        self._transformed_docs: Deque[Dict[str, Any]] = deque()
+        self._solr_exhausted = False
+
+        # online resource lid -> url, or None where not found
+        self._resource_ref_urls: Dict[str, Optional[str]] = {}
+
     def __iter__(self) -> "SolrOsWrapperIter":
         return self
 
-    def _get_node(self, doc: dict) -> str:
-        """Infer the node from the url resource's DNS"""
+    def _get_resource_ref_url(self, doc: Dict[str, Any]) -> Optional[str]:
+        if "resource_ref" not in doc or self.online_resources is None:
+            return None
 
-        if not self.force and "lidvid" in doc and self.found_ids is not None:
-            registry_node = self.found_ids.get(doc["lidvid"])
-            if registry_node:
-                return registry_node
-
-        if "agency_name" in doc:
-            agency = doc["agency_name"][0]
-            if agency == "esa":
-                return "PSA"
-            elif agency == "Unknown":
-                return UNKNOWN_NODE
-
-        if "product_class" in doc:
-            product_class = doc["product_class"][0]
-            if product_class in ENG_PRODUCT_CLASSES:
-                # we automatically assign specific product classes to ENG
-                return "PDS_ENG"
-            elif product_class in UNK_PRODUCT_CLASSES:  # we don't bother to attribute a node to other product classes
-                return UNKNOWN_NODE
-
-        if "resource_url" in doc:
-            url = doc["resource_url"][0]
-            domain = urlparse(url).netloc
-            self._seen_domains.add(domain)
-            if domain in NODE_DOMAINS:
-                return NODE_DOMAINS[domain]
+        online_resource_id = get_online_resource_id(doc["resource_ref"][0])
+        if online_resource_id not in self._resource_ref_urls:
+            self._resource_ref_urls[online_resource_id] = self.online_resources.get(online_resource_id)
+        return self._resource_ref_urls[online_resource_id]
 
-        if "resource_ref" in doc:
-            online_resource_id = get_online_resource_id(doc["resource_ref"][0])
-            if self.online_resources is not None and online_resource_id in self.online_resources:
-                url = self.online_resources.get(online_resource_id)
-                domain = urlparse(url).netloc
-                self._seen_domains.add(domain)
-                if domain in NODE_DOMAINS:
-                    return NODE_DOMAINS[domain]
-            else:
-                log.warning("Skipping not found online resource '%s' of doc %s", online_resource_id, doc["lid"])
-
-        if "node_id" in doc:
-            node_id = doc["node_id"][0]
-            self._seen_node_ids.add(node_id)
-            if node_id in NODE_ID:
-                return NODE_ID[node_id]
-
-        if "file_ref_url" in doc:
-            url = doc["file_ref_url"][0]
-            return get_node_from_file_ref(url)
+    def _get_context(self, doc: Dict[str, Any]) -> DocContext:
+        found_in_registry = False
+        registry_node = None
+        if "lidvid" in doc and self.found_ids is not None:
+            found_in_registry = doc["lidvid"] in self.found_ids
+            if found_in_registry and not self.force:
+                registry_node = self.found_ids.get(doc["lidvid"])
+        return found_in_registry, registry_node, self._get_resource_ref_url(doc)
 
-        log.warning(
-            "Unable to attribute node for product %s, none of resource_url, resource_ref, file_ref_url, node_id were found",
-            doc["lid"],
-        )
-
-        return UNKNOWN_NODE
+    def _get_node(self, doc: dict) -> str:
+        """Infer the node from the url resource's DNS"""
+        return attribute_node(doc, self._get_context(doc), self._seen_domains, self._seen_node_ids)
 
     def solr_doc_to_os_doc(self, doc: Dict[str, Any]) -> Dict[str, Any]:
-        new_doc: Dict[str, Any] = dict()
-        new_doc["_index"] = self.index
-        new_doc["_type"] = self.type
-        new_doc["doc_as_upsert"] = True
-
-        # remove empty fields
-        new_doc["_source"] = {}
-        for k, v in doc.items():
-            # manage dates
-            if "date" in k:
-                # only keep the latest modification date, for kibana
-                if k == "modification_date":
-                    v = [v[-1]]
-
-                # validate dates
-                try:
-                    v = [datetime.fromisoformat(v[0].replace("Z", ""))]
-                    new_doc["_source"][k] = v
-                except ValueError:
-                    log.warning(
-                        limit_log_length(
-                            f"Date {v} for field {k} is invalid, assign default datetime 01-01-1950 instead"
-                        )
-                    )
-                    new_doc["_source"][k] = [datetime(1950, 1, 1, 0, 0, 0)]
-            elif "year" in k:
-                if len(v[0]) > 0:
-                    new_doc["_source"][k] = v
-                else:
-                    log.warning(limit_log_length(f"Year {v} for field {k} is invalid"))
-            else:
-                new_doc["_source"][k] = v
-
-        # add modification date because kibana needs it for its time field
-        if "modification_date" not in new_doc["_source"]:
-            new_doc["_source"]["modification_date"] = [DEFAULT_MODIFICATION_DATE]
-
-        doc_id = self.id_field_fun(doc)
-        new_doc["_id"] = doc_id
-        new_doc["_source"]["found_in_registry"] = "true" if self.found_ids is not None and doc_id in self.found_ids else "false"
-
-        new_doc["_source"]["node"] = self._get_node(doc)
-        return new_doc
+        self.id_field_fun(doc)  # raises MissingIdentifierError before any lookups are made
+        return transform_solr_doc(doc, self._get_context(doc), self.index, self._seen_domains, self._seen_node_ids)
+
+    def _read_batch(self) -> List[Tuple[Dict[str, Any], DocContext]]:
+        """Read the next batch of documents, which is empty only once the Solr documents are exhausted"""
+        batch: List[Tuple[Dict[str, Any], DocContext]] = []
+        while not batch:
+            docs = list(islice(self._solr_itr, self._batch_size))
+            if not docs:
+                self._solr_exhausted = True
+                break
+
+            for doc in docs:
+                # skip rows without an id
+                if "lidvid" not in doc:
+                    log.warning(limit_log_length(str(MissingIdentifierError())))
+                    continue
+                batch.append((doc, self._get_context(doc)))
+        return batch
+
+    def _collect(self, batch_result: Tuple[List[Dict[str, Any]], Set[str], Set[str]]) -> None:
+        os_docs, seen_domains, seen_node_ids = batch_result
+        self._transformed_docs.extend(os_docs)
+        self._seen_domains.update(seen_domains)
+        self._seen_node_ids.update(seen_node_ids)
+
+    def _transform_next_batches(self) -> None:
+        if self._transform_workers < 1:
+            batch = self._read_batch()
+            if batch:
+                self._collect(transform_solr_docs(batch, self.index))
+            return
+
+        if self._executor is None:
+            # workers are spawned rather than forked, as the Solr reader and bulk writer threads are running by now
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._transform_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+        # keep every worker busy with one batch queued behind it, while returning batches in the order read
+        while not self._solr_exhausted and len(self._pending_batches) < 2 * self._transform_workers:
+            batch = self._read_batch()
+            if batch:
+                self._pending_batches.append(self._executor.submit(transform_solr_docs, batch, self.index))
+        if self._pending_batches:
+            self._collect(self._pending_batches.popleft().result())
 
     def __next__(self) -> Dict[str, Any]:
-        while True:
-            # skip rows without an id
-            try:
-                doc = next(self._solr_itr)
-                return self.solr_doc_to_os_doc(doc)
-            except MissingIdentifierError as e:
-                log.warning(limit_log_length(str(e)))
+        while not self._transformed_docs:
+            if self._solr_exhausted and not self._pending_batches:
+                self.close()
+                raise StopIteration
+            self._transform_next_batches()
+        return self._transformed_docs.popleft()
+
+    def close(self) -> None:
+        """Release the transform worker processes, if any"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._pending_batches.clear()
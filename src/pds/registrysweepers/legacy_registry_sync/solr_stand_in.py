@@ -0,0 +1,257 @@
+"""
+Local stand-ins for the legacy registry Solr search endpoint, for running legacy sync offline.
+
+Stand-ins are injected as a requests transport adapter, so any component accepting a requests.Session (SolrCursorReader,
+load_online_resources() etc.) may be pointed at one without modification.  Responses are produced by a handler, either
+SyntheticSolrIndex, which serves a generated collection of legacy-like documents, or RecordedSolrResponses, which
+replays responses captured from the live endpoint by a session from create_recording_session().
+
+See legacy_registry_sync.benchmark for measuring sync throughput against a stand-in.
+"""
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from datetime import timedelta
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SolrHandler = Callable[[Dict[str, str]], Dict[str, Any]]
+
+# parameters which do not affect the content of a response, and are ignored when matching recorded responses
+_IGNORED_PARAMS = {"wt"}
+
+
+def get_request_params(request: requests.PreparedRequest) -> Dict[str, str]:
+    return dict(parse_qsl(urlsplit(request.url).query, keep_blank_values=True))  # type: ignore
+
+
+def get_recording_key(params: Dict[str, str]) -> str:
+    return json.dumps(sorted((k, str(v)) for k, v in params.items() if k not in _IGNORED_PARAMS))
+
+
+class SolrStandInAdapter(HTTPAdapter):
+    """Transport adapter answering every request with the response of handler, after latency_seconds"""
+
+    def __init__(self, handler: SolrHandler, latency_seconds: float = 0.0):
+        super().__init__()
+        self._handler = handler
+        self._latency_seconds = latency_seconds
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:
+        if self._latency_seconds > 0:
+            time.sleep(self._latency_seconds)
+
+        response = requests.Response()
+        response.request = request
+        response.url = request.url  # type: ignore
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = "application/json"
+        try:
+            body = self._handler(get_request_params(request))
+            response.status_code = 200
+        except LookupError as err:
+            body = {"error": {"msg": str(err), "code": 404}}
+            response.status_code = 404
+        response._content = json.dumps(body).encode("utf-8")
+        return response
+
+
+class RecordingSolrAdapter(HTTPAdapter):
+    """Transport adapter which appends each successful response, keyed by its request params, to a JSON-lines file"""
+
+    def __init__(self, recording_path: str, pool_size: int = 10):
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._recording_path = recording_path
+        self._lock = threading.Lock()
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:
+        response = super().send(request, *args, **kwargs)
+        if response.status_code == 200:
+            record = {"params": get_request_params(request), "response": response.json()}
+            with self._lock, open(self._recording_path, "a") as recording_file:
+                recording_file.write(json.dumps(record) + "\n")
+        return response
+
+
+def create_solr_stand_in_session(handler: SolrHandler, latency_seconds: float = 0.0) -> requests.Session:
+    """Return a session whose requests are all answered by handler rather than the network"""
+    session = requests.Session()
+    adapter = SolrStandInAdapter(handler, latency_seconds=latency_seconds)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def create_recording_session(recording_path: str, pool_size: int = 10) -> requests.Session:
+    """Return a session which records the responses to its requests, for later replay with RecordedSolrResponses"""
+    session = requests.Session()
+    adapter = RecordingSolrAdapter(recording_path, pool_size=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class RecordedSolrResponses:
+    """Handler replaying the responses recorded by create_recording_session(), raising LookupError for others"""
+
+    def __init__(self, recording_path: str):
+        self._responses: Dict[str, Dict[str, Any]] = {}
+        with open(recording_path) as recording_file:
+            for line in recording_file:
+                record = json.loads(line)
+                self._responses[get_recording_key(record["params"])] = record["response"]
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def __call__(self, params: Dict[str, str]) -> Dict[str, Any]:
+        key = get_recording_key(params)
+        if key not in self._responses:
+            raise LookupError(f"No response was recorded for request params {key}")
+        return self._responses[key]
+
+
+NODE_URL_PREFIXES = [
+    "https://pds-geosciences.wustl.edu/",
+    "https://pds-ppi.igpp.ucla.edu/",
+    "https://pds-rings.seti.org/",
+    "https://sbn.psi.edu/",
+    "https://pds-imaging.jpl.nasa.gov/",
+]
+NODE_IDS = ["Geosciences", "Small Bodies", "Planetary Plasma Interactions", "Imaging"]
+PRODUCT_CLASSES = ["Product_Observational", "Product_Document", "Product_Collection", "Product_Bundle"]
+
+
+class SyntheticSolrIndex:
+    """
+    Handler serving a generated collection of legacy-registry-like documents, supporting the subset of Solr search
+    behaviour used by legacy sync: q (*, field:value, field:[from TO *] and field:{from TO *] forms), a single fq (term
+    or missing-field forms), field facets, sort by identifier or _version_, and paging by start/rows or cursorMark.
+    """
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = sorted(docs, key=lambda doc: doc["identifier"])
+        self._result_sets: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def generate(cls, doc_count: int, resource_count: int = 100, seed: int = 0) -> "SyntheticSolrIndex":
+        rng = random.Random(seed)
+        base_date = datetime(2010, 1, 1)
+
+        def solr_date() -> str:
+            return (base_date + timedelta(minutes=rng.randrange(10 * 365 * 24 * 60))).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        docs: List[Dict[str, Any]] = []
+        resource_lids = []
+        for i in range(resource_count):
+            lid = f"urn:nasa:pds:context_pds3:resource:resource.{i}"
+            resource_lids.append(lid)
+            url = rng.choice(NODE_URL_PREFIXES) + f"resource/{i}"
+            docs.append(
+                {
+                    "identifier": lid,
+                    "lid": lid,
+                    "lidvid": f"{lid}::1.0",
+                    "data_class": ["Resource"],
+                    "resource_url": [url],
+                    "modification_date": [solr_date()],
+                }
+            )
+
+        for i in range(doc_count):
+            lid = f"urn:nasa:pds:bundle_{i % 97}:collection_{i % 13}:product_{i}"
+            doc: Dict[str, Any] = {
+                "identifier": f"{lid}::1.0",
+                "lid": lid,
+                "lidvid": f"{lid}::1.0",
+                "product_class": [rng.choice(PRODUCT_CLASSES)],
+                "title": [f"Synthetic product {i}"],
+                "modification_date": sorted(solr_date() for _ in range(rng.randint(1, 3))),
+                "start_date_time": [solr_date()],
+                "stop_date_time": [solr_date()],
+            }
+            clue = rng.randrange(4)
+            if clue == 0 and resource_lids:
+                doc["resource_ref"] = [f"{rng.choice(resource_lids)}::1.0"]
+            elif clue == 1:
+                doc["resource_url"] = [rng.choice(NODE_URL_PREFIXES) + f"data/{i}"]
+            elif clue == 2:
+                doc["node_id"] = [rng.choice(NODE_IDS)]
+            else:
+                doc["file_ref_url"] = [f"https://pds.nasa.gov/data/pds4/releases/{rng.choice(['geo', 'img'])}/{i}.xml"]
+            docs.append(doc)
+
+        for version, doc in enumerate(docs):
+            doc["_version_"] = version + 1
+        return cls(docs)
+
+    @staticmethod
+    def _matches_query(doc: Dict[str, Any], query: str) -> bool:
+        if query in {"*", "*:*"}:
+            return True
+        field, value = query.split(":", 1)
+        values = doc.get(field, [])
+        values = values if isinstance(values, list) else [values]
+        if value[:1] in {"[", "{"} and value.endswith(" TO *]"):
+            # bounds are compared as the type of the field, e.g. numerically for _version_
+            lower_bound = value[1 : -len(" TO *]")]
+            if value.startswith("{"):
+                return any(v > type(v)(lower_bound) for v in values)
+            return any(v >= type(v)(lower_bound) for v in values)
+        return value in values
+
+    @staticmethod
+    def _matches_filter(doc: Dict[str, Any], filter_query: str) -> bool:
+        if not filter_query:
+            return True
+        if filter_query.startswith("-") and filter_query.endswith(":[* TO *]"):
+            return filter_query[1 : -len(":[* TO *]")] not in doc
+        field, value = filter_query.removeprefix("{!term f=").split("}", 1)
+        return value in doc.get(field, [])
+
+    def _get_result_set(self, query: str, filter_query: str, sort: str) -> List[Dict[str, Any]]:
+        key = (query, filter_query, sort)
+        with self._lock:
+            if key not in self._result_sets:
+                docs = [d for d in self.docs if self._matches_query(d, query) and self._matches_filter(d, filter_query)]
+                if sort == "_version_ desc":
+                    docs.sort(key=lambda doc: doc["_version_"], reverse=True)
+                self._result_sets[key] = docs
+            return self._result_sets[key]
+
+    def __call__(self, params: Dict[str, str]) -> Dict[str, Any]:
+        docs = self._get_result_set(params.get("q", "*"), params.get("fq", ""), params.get("sort", "identifier asc"))
+        body: Dict[str, Any] = {"response": {"numFound": len(docs), "start": 0, "docs": []}}
+
+        if params.get("facet") == "true":
+            field = params["facet.field"]
+            counts: Dict[Optional[str], int] = {}
+            for doc in docs:
+                for value in doc.get(field, [None]):
+                    counts[value] = counts.get(value, 0) + 1
+            body["facet_counts"] = {"facet_fields": {field: [x for kv in counts.items() for x in kv]}}
+
+        rows = int(params.get("rows", 10))
+        if "cursorMark" in params:
+            cursor_mark = params["cursorMark"]
+            start = 0 if cursor_mark == "*" else int(cursor_mark)
+            page = docs[start : start + rows]
+            body["nextCursorMark"] = str(start + len(page)) if page else cursor_mark
+        else:
+            start = int(params.get("start", 0))
+            page = docs[start : start + rows]
+            body["response"]["start"] = start
+        body["response"]["docs"] = page
+        return body
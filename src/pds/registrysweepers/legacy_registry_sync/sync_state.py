@@ -0,0 +1,83 @@
+import logging
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Optional
+
+import requests
+from opensearchpy import NotFoundError
+from opensearchpy import OpenSearch
+from pds.registrysweepers.legacy_registry_sync.solr_cursor_reader import solr_request
+
+log = logging.getLogger(__name__)
+
+SYNC_STATE_DOC_ID = "watermark"
+
+# Solr derives each _version_ from the clock of the shard leader indexing the document, in milliseconds, shifted left to
+# leave room for a counter distinguishing versions assigned within the same millisecond
+SOLR_VERSION_CLOCK_SHIFT = 20
+
+
+def get_sync_state_index_name(target_index: str) -> str:
+    return f"{target_index}-sync-state"
+
+
+def get_sync_watermark(client: OpenSearch, target_index: str) -> Optional[int]:
+    """
+    Return the Solr _version_ high-water mark recorded by the last successful sync to target_index, or None if no
+    successful sync has been recorded.
+    """
+    try:
+        state = client.get(index=get_sync_state_index_name(target_index), id=SYNC_STATE_DOC_ID)
+    except NotFoundError:
+        return None
+
+    # state recorded before the high-water mark was a _version_ cannot be trusted, so a full sync is performed
+    return state["_source"].get("solr_version_watermark")
+
+
+def put_sync_watermark(client: OpenSearch, target_index: str, watermark: int) -> None:
+    """Record the Solr _version_ high-water mark of a successful sync to target_index"""
+    state = {"solr_version_watermark": watermark, "synced_at": datetime.now(timezone.utc)}
+    client.index(index=get_sync_state_index_name(target_index), id=SYNC_STATE_DOC_ID, body=state, refresh=True)
+    log.info(f"Recorded legacy sync _version_ high-water mark {watermark}")
+
+
+def get_solr_max_version(
+    solr_url: str, session: Optional[requests.Session] = None, max_retries: int = 5
+) -> Optional[int]:
+    """
+    Return the greatest _version_ among all documents indexed in Solr, or None if Solr holds no documents.
+
+    Every document with a _version_ no greater than this is visible to any query issued afterwards, so the value read
+    before a sync begins is a high-water mark which cannot skip documents indexed while the sync is in progress.
+    """
+    session = session or requests.Session()
+    response = solr_request(
+        session, solr_url, {"q": "*", "rows": 1, "fl": "_version_", "sort": "_version_ desc"}, max_retries=max_retries
+    )
+    docs = response["response"]["docs"]
+    return docs[0]["_version_"] if docs else None
+
+
+def get_versions_since_query(min_version: int) -> str:
+    """Return a Solr query matching the documents indexed or updated with a _version_ greater than min_version"""
+    return f"_version_:{{{min_version} TO *]"
+
+
+def resolve_incremental_min_version(watermark: Optional[int], overlap: timedelta) -> Optional[int]:
+    """
+    Return the _version_ after which an incremental sync should read Solr documents, i.e. the high-water mark of the
+    last successful sync less the given safety overlap (converted to the clock units of _version_, to tolerate clock
+    skew between Solr shard leaders), or None if a full sync is necessary.
+    """
+    if watermark is None:
+        log.info("No legacy sync high-water mark found - performing full sync")
+        return None
+
+    min_version = watermark - (int(overlap.total_seconds() * 1000) << SOLR_VERSION_CLOCK_SHIFT)
+    log.info(
+        f"Performing incremental sync of Solr documents with _version_ greater than {min_version} "
+        f"(high-water mark {watermark}, overlap {overlap})"
+    )
+    return min_version
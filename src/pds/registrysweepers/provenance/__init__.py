@@ -69,7 +69,6 @@ from pds.registrysweepers.utils.misc import get_ids_list_str
 from pds.registrysweepers.utils.misc import group_by_key
 from pds.registrysweepers.utils.misc import limit_log_length
 from pds.registrysweepers.utils.productidentifiers.pdslid import PdsLid
-from tqdm import tqdm
 
 log = logging.getLogger(__name__)
 
@@ -169,6 +168,8 @@ def fetch_target_lids(client: OpenSearch) -> Iterable[PdsLid]:
 
     lids = {bucket["key"] for bucket in response["aggregations"]["unique_lids"]["buckets"]}
 
+    from tqdm import tqdm  # imported on use, to keep startup fast
+
     # disable=None enables auto-detection: progress bar is shown in interactive terminals (TTY)
     # and suppressed automatically in non-interactive environments (production containers, CI pipelines).
     with tqdm(desc="Provenance sweeper progress (approximate)", total=response["hits"]["total"]["value"], disable=None) as pbar:
@@ -23,7 +23,6 @@ from pds.registrysweepers.utils.db.indexing import ensure_index_mapping
 from pds.registrysweepers.utils.db.multitenancy import resolve_multitenant_index_name
 from pds.registrysweepers.utils.db.update import Update
 from pds.registrysweepers.utils.misc import limit_log_length
-from tqdm import tqdm
 
 log = logging.getLogger(__name__)
 
@@ -325,6 +324,8 @@ def run(
     sort_fields = ["ops:Harvest_Info.ops:harvest_date_time"]
     total_outstanding_doc_count = get_updated_hits_count()
 
+    from tqdm import tqdm  # imported on use, to keep startup fast
+
     # disable=None enables auto-detection: progress bar is shown in interactive terminals (TTY)
     # and suppressed automatically in non-interactive environments (production containers, CI pipelines).
     with tqdm(
@@ -1,11 +1,22 @@
 import argparse
 import logging
 from argparse import Namespace
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
 from typing import List
+from typing import Optional
 from typing import Union
 
+from pds.registrysweepers.utils.db.multitenancy import get_multitenancy_node_id
+
 log = logging.getLogger(__name__)
 
+LOG_FORMAT = "%(asctime)s::%(tenant)s::%(sweeper)s::%(name)s::%(levelname)s::%(message)s"
+
+# The name of the sweeper in scope, stamped onto log records alongside the tenant by LogContextFilter
+_sweeper_name: ContextVar[Optional[str]] = ContextVar("sweeper_name", default=None)
+
 
 def parse_args(description: str = "", epilog: str = "") -> Namespace:
     """
@@ -61,6 +72,25 @@ def _vid_as_tuple_of_int(lidvid: str):
     return (int(major_version), int(minor_version))
 
 
+@contextmanager
+def sweeper_scope(name: str) -> Iterator[None]:
+    """Attribute the log records emitted within this context to the named sweeper"""
+    token = _sweeper_name.set(name)
+    try:
+        yield
+    finally:
+        _sweeper_name.reset(token)
+
+
+class LogContextFilter(logging.Filter):
+    """Stamp each log record with the tenant and sweeper in scope where it was emitted, or "-" if none"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.tenant = get_multitenancy_node_id() or "-"
+        record.sweeper = _sweeper_name.get() or "-"
+        return True
+
+
 def configure_logging(filepath: Union[str, None], log_level: int):
     logging.root.handlers = []
     handlers: List[logging.StreamHandler] = [logging.StreamHandler()]
@@ -68,4 +98,7 @@ def configure_logging(filepath: Union[str, None], log_level: int):
     if filepath:
         handlers.append(logging.FileHandler(filepath))
 
-    logging.basicConfig(level=log_level, format="%(asctime)s::%(name)s::%(levelname)s::%(message)s", handlers=handlers)
+    for handler in handlers:
+        handler.addFilter(LogContextFilter())
+
+    logging.basicConfig(level=log_level, format=LOG_FORMAT, handlers=handlers)
@@ -4,37 +4,71 @@ import tempfile
 from typing import Any
 from typing import Iterator
 from typing import Optional
+from typing import Type
+from typing import Union
 
 from pds.registrysweepers.utils.bigdict.base import BigDict
 from pds.registrysweepers.utils.bigdict.dictdict import DictDict
+from pds.registrysweepers.utils.bigdict.lmdbdict import LmdbDict
 from pds.registrysweepers.utils.bigdict.sqlite3dict import SqliteDict
+from pds.registrysweepers.utils.bigdict.valuecodecs import ValueCodec
+from pds.registrysweepers.utils.memorygovernor import MemoryGovernor
 
 
 class AutoDict(BigDict):
     """
     A dictionary that starts as an in-memory DictDict but
-    automatically switches to a SqliteDict when its size exceeds
-    item_count_threshold.
+    automatically switches to a disk-backed dict (SqliteDict, by default) when its size exceeds
+    item_count_threshold, or when process memory usage exceeds the target of memory_governor.
     """
 
-    def __init__(self, item_count_threshold: int, db_path: Optional[str] = None):
+    def __init__(
+        self,
+        item_count_threshold: Optional[int],
+        db_path: Optional[str] = None,
+        disk_backend: Type[Union[SqliteDict, LmdbDict]] = SqliteDict,
+        codec: Optional[ValueCodec] = None,
+        memory_governor: Optional[MemoryGovernor] = None,
+    ):
         """
-        :param item_count_threshold: max in-memory items before switching to SQLite.
-        :param db_path: optional explicit SQLite file path. If None, a temp file is used.
+        :param item_count_threshold: max in-memory items before switching to disk, or None for no item limit.
+        :param db_path: optional explicit database file path. If None, a temp file is used.
+        :param disk_backend: the disk-backed BigDict implementation to switch to
+        :param codec: codec used to serialize values once on disk; PickleCodec if None
+        :param memory_governor: if provided, switch to disk once the governor reports memory pressure
         """
+        if item_count_threshold is None and memory_governor is None:
+            raise ValueError("At least one of item_count_threshold and memory_governor must be provided")
+
         self.item_count_threshold = item_count_threshold
-        self._db_path = db_path or os.path.join(tempfile.gettempdir(), f"autodict_{os.getpid()}_{id(self)}.sqlite")
+        self._memory_governor = memory_governor
+        self._disk_backend = disk_backend
+        self._codec = codec
+        self._db_path = db_path or os.path.join(
+            tempfile.gettempdir(), f"autodict_{os.getpid()}_{id(self)}{disk_backend.file_suffix}"
+        )
         self._dict: BigDict = DictDict()  # start with in-memory
 
-    def _check_upgrade(self) -> None:
-        """If threshold exceeded and still using DictDict, switch to SqliteDict."""
-        if isinstance(self._dict, DictDict) and len(self._dict) > self.item_count_threshold:
-            # Create new SqliteDict and copy items over
-            sqlite_dict = SqliteDict(self._db_path)
+    def _threshold_reached(self) -> bool:
+        if self.item_count_threshold is not None and len(self._dict) > self.item_count_threshold:
             logging.info(f"AutoDict disk flood threshold reached ({self.item_count_threshold})")
-            logging.info(f"Switching AutoDict backend from {type(self._dict).__name__} to {type(sqlite_dict).__name__}")
-            sqlite_dict.put_many(self._dict.items())
-            self._dict = sqlite_dict
+            return True
+
+        if self._memory_governor is not None and self._memory_governor.is_under_pressure():
+            target_percent = self._memory_governor.target_percent
+            logging.info(f"AutoDict memory threshold reached ({target_percent}%) with {len(self._dict)} items")
+            return True
+
+        return False
+
+    def _check_upgrade(self) -> None:
+        """If threshold exceeded and still using DictDict, switch to the disk backend."""
+        if isinstance(self._dict, DictDict) and self._threshold_reached():
+            # Create new disk-backed dict and copy items over
+            disk_dict = self._disk_backend(self._db_path, codec=self._codec)
+            logging.info(f"Switching AutoDict backend from {type(self._dict).__name__} to {type(disk_dict).__name__}")
+            disk_dict.put_many(self._dict.items())
+            self._dict = disk_dict
 
     def put(self, key: str, value: Any) -> None:
         self._dict.put(key, value)
@@ -74,9 +108,8 @@ class AutoDict(BigDict):
         return key in self._dict
 
     def close(self):
-        """Close underlying SQLite connection if we have one."""
-        if isinstance(self._dict, SqliteDict):
-            self._dict.close()
+        """Close underlying disk-backed dict if we have one."""
+        self._dict.close()
 
     def __del__(self):
         try:
@@ -86,5 +119,5 @@ class AutoDict(BigDict):
 
     @property
     def backend(self) -> str:
-        """Return the name of the current backend ('DictDict' or 'SqliteDict') for unit testing"""
+        """Return the name of the current backend ('DictDict', 'SqliteDict' or 'LmdbDict') for unit testing"""
         return type(self._dict).__name__
@@ -1,15 +1,19 @@
 from abc import ABC
 from abc import abstractmethod
 from typing import Any
+from typing import Collection
+from typing import Iterable
 from typing import Iterator
+from typing import List
 from typing import Optional
+from typing import Tuple
 
 
 class BigDict(ABC):
     """Abstract base class for a big dictionary-like object."""
 
-    # TODO: investigate lmdb as an alternative backend (as standalone, or for spill) in case it provides superior
-    #  performance.  It's used in https://pypi.org/project/bigdict/ - edunn 20250922
+    # suffix applied to auto-generated paths for disk-backed implementations
+    file_suffix: str = ".db"
 
     @abstractmethod
     def put(self, key: str, value: Any) -> None:
@@ -35,6 +39,44 @@ class BigDict(ABC):
     def __len__(self) -> int:
         pass
 
+    def put_many(self, kv_pairs: Iterable[Tuple[str, Any]]) -> None:
+        for key, value in kv_pairs:
+            self.put(key, value)
+
+    def put_many_returning_conflicts(self, kv_pairs: Iterable[Tuple[str, Any]]) -> List[str]:
+        """Insert each pair whose key is not already present, returning the keys of those which were not inserted"""
+        conflicts = []
+        for key, value in kv_pairs:
+            if self.has(key):
+                conflicts.append(key)
+            else:
+                self.put(key, value)
+        return conflicts
+
+    def get_many(self, keys: Iterable[str]) -> Iterable[Tuple[str, Any]]:
+        """Given an iterable collection of keys, return an iterable collection of dict.items()-like (k, v) tuples"""
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                yield key, value
+
+    def keys_excluding(self, keys: Collection[str]) -> Iterator[str]:
+        """Yield the stored keys which are not members of the given keys"""
+        return (key for key in self if key not in keys)
+
+    def items_excluding(self, keys: Collection[str]) -> Iterator[Tuple[str, Any]]:
+        """Yield the stored items whose keys are not members of the given keys"""
+        return ((key, value) for key, value in self.items() if key not in keys)
+
+    def items_intersecting(self, keys: Collection[str]) -> Iterator[Tuple[str, Any]]:
+        """Yield the stored items whose keys are members of the given keys"""
+        return iter(self.get_many(key for key in keys))
+
+    # optional rather than abstract, as in-memory implementations hold no resources to release
+    def close(self) -> None:  # noqa: B027
+        """Release any resources held by this dict.  Does nothing unless overridden"""
+        return None
+
     def keys(self) -> Iterator[str]:
         return iter(self)
 
@@ -0,0 +1,452 @@
+"""
+Benchmark and memory-profiling suite for the BigDict implementations, against an ancestry-like workload.
+
+Keys are nonaggregate-product LIDVIDs and values are small sets of ancestor LIDVIDs, mirroring the records accumulated
+by the ancestry sweeper.  The workload is synthetic and seeded, so runs are reproducible and require no database.
+
+Each (backend, count) case runs in a fresh subprocess, so that its peak RSS is not inflated by earlier cases.  Results
+are written as a JSON report, which may be compared against the report of another commit, e.g.
+
+    python -m pds.registrysweepers.utils.bigdict.benchmark --counts 10000 100000 1000000 --output before.json
+    python -m pds.registrysweepers.utils.bigdict.benchmark --counts 10000 100000 1000000 --compare before.json
+
+Ancestry-scale runs involve tens of millions of keys, e.g. --counts 10000000 --backends SqliteDict LmdbDict
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import psutil  # type: ignore
+from pds.registrysweepers.utils import configure_logging
+from pds.registrysweepers.utils import parse_log_level
+from pds.registrysweepers.utils.bigdict.autodict import AutoDict
+from pds.registrysweepers.utils.bigdict.base import BigDict
+from pds.registrysweepers.utils.bigdict.dictdict import DictDict
+from pds.registrysweepers.utils.bigdict.lmdbdict import LmdbDict
+from pds.registrysweepers.utils.bigdict.shardedsqlitedict import ShardedSqliteDict
+from pds.registrysweepers.utils.bigdict.spilldict import SpillDict
+from pds.registrysweepers.utils.bigdict.sqlite3dict import SqliteDict
+from pds.registrysweepers.utils.bigdict.sstabledict import SSTableDict
+from pds.registrysweepers.utils.bigdict.valuecodecs import LidVidSetCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import MarshalCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import MsgpackCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import PickleCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import ValueCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import ZlibCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import ZstdCodec
+
+log = logging.getLogger(__name__)
+
+REPORT_FORMAT_VERSION = 1
+
+
+def _merge_sets(left: Any, right: Any) -> Any:
+    return left | right
+
+
+@dataclass(frozen=True)
+class BenchmarkBackend:
+    """
+    Constructs a BigDict under test.  Mutable backends are created empty from (db_path, codec, threshold), where
+    threshold is the in-memory item limit of hybrid backends.  Immutable backends are instead built from all items.
+    """
+
+    create: Optional[Callable[[str, ValueCodec, int], BigDict]] = None
+    build: Optional[Callable[[str, ValueCodec, Iterable[Tuple[str, Any]]], BigDict]] = None
+    required_module: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        return self.required_module is None or importlib.util.find_spec(self.required_module) is not None
+
+
+BACKENDS: Dict[str, BenchmarkBackend] = {
+    "DictDict": BenchmarkBackend(create=lambda db_path, codec, threshold: DictDict()),
+    "SqliteDict": BenchmarkBackend(create=lambda db_path, codec, threshold: SqliteDict(db_path, codec=codec)),
+    "LmdbDict": BenchmarkBackend(
+        create=lambda db_path, codec, threshold: LmdbDict(db_path, codec=codec), required_module="lmdb"
+    ),
+    "ShardedSqliteDict": BenchmarkBackend(
+        create=lambda db_path, codec, threshold: ShardedSqliteDict(db_path, codec=codec)
+    ),
+    "SSTableDict": BenchmarkBackend(build=lambda db_path, codec, items: SSTableDict.build(db_path, items, codec=codec)),
+    "AutoDict": BenchmarkBackend(
+        create=lambda db_path, codec, threshold: AutoDict(threshold, db_path=db_path, codec=codec)
+    ),
+    "SpillDict": BenchmarkBackend(
+        create=lambda db_path, codec, threshold: SpillDict(threshold, merge=_merge_sets, db_path=db_path, codec=codec)
+    ),
+}
+
+CODECS: Dict[str, Callable[[], ValueCodec]] = {
+    "pickle": PickleCodec,
+    "marshal": MarshalCodec,
+    "msgpack": MsgpackCodec,
+    "lidvidset": LidVidSetCodec,
+    "lidvidset+zlib": lambda: ZlibCodec(LidVidSetCodec()),
+    "lidvidset+zstd": lambda: ZstdCodec(LidVidSetCodec()),
+}
+
+
+def generate_key(idx: int) -> str:
+    return f"urn:nasa:pds:benchmark_bundle:collection_{idx % 100}:product_{idx}::1.0"
+
+
+def generate_value(idx: int) -> Any:
+    collection_lidvid = f"urn:nasa:pds:benchmark_bundle:collection_{idx % 100}::1.0"
+    return {collection_lidvid, "urn:nasa:pds:benchmark_bundle::1.0"}
+
+
+def generate_update_value(idx: int) -> Any:
+    """A value for an existing key which, when merged, adds a second collection to its ancestry"""
+    return {f"urn:nasa:pds:benchmark_bundle:collection_{(idx + 1) % 100}::1.0"}
+
+
+def generate_items(start: int, stop: int) -> Iterator[Tuple[str, Any]]:
+    for idx in range(start, stop):
+        yield generate_key(idx), generate_value(idx)
+
+
+def get_dir_size_bytes(path: str) -> int:
+    """Return the total size of all files under path, including any sidecar (WAL, lock, shard) files"""
+    return sum(
+        os.path.getsize(os.path.join(dirpath, filename))
+        for dirpath, _, filenames in os.walk(path)
+        for filename in filenames
+    )
+
+
+class PeakRssSampler:
+    """Context manager which samples process RSS on a background thread, recording the peak"""
+
+    def __init__(self, interval_seconds: float = 0.01):
+        self._interval_seconds = interval_seconds
+        self._process = psutil.Process()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.baseline_bytes = 0
+        self.peak_bytes = 0
+
+    def _sample(self) -> None:
+        self.peak_bytes = max(self.peak_bytes, self._process.memory_info().rss)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval_seconds):
+            self._sample()
+
+    def __enter__(self) -> "PeakRssSampler":
+        self.baseline_bytes = self._process.memory_info().rss
+        self.peak_bytes = self.baseline_bytes
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self._sample()
+
+
+class _PhaseTimer:
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+
+    def __call__(self, phase: str, ops: int, f: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        result = f()
+        seconds = time.perf_counter() - start
+        self.phases[phase] = {"seconds": seconds, "ops": ops, "ops_per_second": ops / seconds if seconds else 0.0}
+        log.info(f"    {phase}: {seconds:.3f}s ({self.phases[phase]['ops_per_second']:.0f} ops/s)")
+        return result
+
+
+def _run_mutable_phases(
+    bigdict: BigDict, timed: _PhaseTimer, count: int, sample_idxs: List[int], conflict_proportion: float
+) -> None:
+    single_put_count = len(sample_idxs)
+    timed("put", single_put_count, lambda: [bigdict.put(k, v) for k, v in generate_items(0, single_put_count)])
+    timed("put_many", count - single_put_count, lambda: bigdict.put_many(generate_items(single_put_count, count)))
+    _run_read_phases(bigdict, timed, count, sample_idxs)
+
+    # for SpillDict, updates of keys which have already spilled incur a merge with the spilled value
+    timed(
+        "put (updates)",
+        len(sample_idxs),
+        lambda: [bigdict.put(generate_key(idx), generate_update_value(idx)) for idx in sample_idxs],
+    )
+
+    conflicts_start = count - int(count * conflict_proportion)
+    conflicts_stop = count + int(count * conflict_proportion)
+    conflicts: List[str] = timed(
+        "put_many_returning_conflicts",
+        conflicts_stop - conflicts_start,
+        lambda: bigdict.put_many_returning_conflicts(list(generate_items(conflicts_start, conflicts_stop))),
+    )
+    assert len(conflicts) == count - conflicts_start
+
+    pop_idxs = sample_idxs[: max(1, len(sample_idxs) // 10)]
+    timed("pop", len(pop_idxs), lambda: [bigdict.pop(generate_key(idx)) for idx in pop_idxs])
+
+
+def _run_read_phases(bigdict: BigDict, timed: _PhaseTimer, count: int, sample_idxs: List[int]) -> None:
+    sample_keys = [generate_key(idx) for idx in sample_idxs]
+    timed("get (hits)", len(sample_keys), lambda: [bigdict.get(key) for key in sample_keys])
+    timed(
+        "has (misses)",
+        len(sample_keys),
+        lambda: [bigdict.has(generate_key(count + idx)) for idx in range(len(sample_keys))],
+    )
+    timed("get_many", len(sample_keys), lambda: list(bigdict.get_many(sample_keys)))
+
+
+def run_case(
+    backend_name: str,
+    count: int,
+    sample_size: int,
+    conflict_proportion: float,
+    threshold_proportion: float,
+    codec_name: str = "pickle",
+) -> Dict[str, Any]:
+    """
+    Run the benchmark workload against a fresh instance of the named backend, returning a report entry containing the
+    duration and throughput of each phase, the peak RSS of the process, and the resulting on-disk size.
+    """
+    backend = BACKENDS[backend_name]
+    log.info(f"Benchmarking {backend_name} with {count} keys and {codec_name} codec")
+    rng = random.Random(0)
+    sample_idxs = rng.sample(range(count), min(sample_size, count))
+    timed = _PhaseTimer()
+    extra: Dict[str, Any] = {}
+
+    with tempfile.TemporaryDirectory() as db_dir, PeakRssSampler() as rss:
+        db_path = os.path.join(db_dir, "benchmark.db")
+        codec = CODECS[codec_name]()
+        if backend.build is not None:
+            build = backend.build
+            bigdict = timed("build", count, lambda: build(db_path, codec, generate_items(0, count)))
+        else:
+            threshold = max(1, int(count * threshold_proportion))
+            bigdict = backend.create(db_path, codec, threshold)  # type: ignore[misc]
+            extra["threshold"] = threshold
+
+        try:
+            if backend.build is not None:
+                _run_read_phases(bigdict, timed, count, sample_idxs)
+            else:
+                _run_mutable_phases(bigdict, timed, count, sample_idxs, conflict_proportion)
+
+            timed("iterate items", len(bigdict), lambda: sum(1 for _ in bigdict.items()))
+            timed("len", 1, lambda: len(bigdict))
+
+            if isinstance(bigdict, SpillDict):
+                extra["spill_stats"] = vars(bigdict.stats)
+            if isinstance(bigdict, AutoDict):
+                extra["final_backend"] = bigdict.backend
+        finally:
+            bigdict.close()
+
+        db_size_bytes = get_dir_size_bytes(db_dir)
+
+    log.info(f"    peak rss: {rss.peak_bytes / 2**20:.1f}MiB, db size: {db_size_bytes / 2**20:.1f}MiB")
+    return {
+        "backend": backend_name,
+        "count": count,
+        "codec": codec_name,
+        "phases": timed.phases,
+        "baseline_rss_bytes": rss.baseline_bytes,
+        "peak_rss_bytes": rss.peak_bytes,
+        "db_size_bytes": db_size_bytes,
+        "extra": extra,
+    }
+
+
+def _run_case_isolated(*args: Any) -> Dict[str, Any]:
+    # a spawned (rather than forked) process starts from a clean heap, so the peak RSS of one case is not inflated by
+    # the allocations of another
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_case, *args).result()
+
+
+def get_git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=os.path.dirname(__file__), timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def run(
+    backend_names: List[str],
+    counts: List[int],
+    sample_size: int,
+    conflict_proportion: float,
+    threshold_proportion: float = 0.1,
+    codec_name: str = "pickle",
+    isolate: bool = True,
+) -> Dict[str, Any]:
+    """Run every (backend, count) case, returning a JSON-serializable report"""
+    parameters = {
+        "backends": backend_names,
+        "counts": counts,
+        "sample_size": sample_size,
+        "conflict_proportion": conflict_proportion,
+        "threshold_proportion": threshold_proportion,
+        "codec": codec_name,
+        "isolated": isolate,
+    }
+    run_case_f = _run_case_isolated if isolate else run_case
+    results = [
+        run_case_f(backend_name, count, sample_size, conflict_proportion, threshold_proportion, codec_name)
+        for count in counts
+        for backend_name in backend_names
+    ]
+
+    log.info("Summary (seconds):")
+    for count in counts:
+        count_results = [result for result in results if result["count"] == count]
+        phases = list(dict.fromkeys(phase for result in count_results for phase in result["phases"]))
+        log.info(" | ".join([f"{f'{count} keys':<30}"] + [f"{result['backend']:>17}" for result in count_results]))
+        for phase in phases:
+            cells = [
+                f"{result['phases'][phase]['seconds']:>17.3f}" if phase in result["phases"] else f"{'-':>17}"
+                for result in count_results
+            ]
+            log.info(" | ".join([f"{phase:<30}"] + cells))
+        peaks = [f"{result['peak_rss_bytes'] / 2**20:>14.1f}MiB" for result in count_results]
+        log.info(" | ".join([f"{'peak rss':<30}"] + peaks))
+
+    return {
+        "format_version": REPORT_FORMAT_VERSION,
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": get_git_commit(),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "parameters": parameters,
+        },
+        "results": results,
+    }
+
+
+def _comparable_metrics(result: Dict[str, Any]) -> Dict[str, float]:
+    metrics = {f"{phase} (s)": timing["seconds"] for phase, timing in result["phases"].items()}
+    metrics["peak rss (bytes)"] = result["peak_rss_bytes"]
+    return metrics
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare the phase durations and peak RSS of each case present in both reports, returning one row per metric.
+    A ratio above 1 indicates that the current report is slower, or uses more memory, than the baseline.
+    """
+
+    def case_key(result: Dict[str, Any]) -> Tuple[str, int, str]:
+        return result["backend"], result["count"], result["codec"]
+
+    baseline_results = {case_key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        baseline_result = baseline_results.get(case_key(result))
+        if baseline_result is None:
+            continue
+
+        metrics = _comparable_metrics(result)
+        baseline_metrics = _comparable_metrics(baseline_result)
+
+        for metric, value in metrics.items():
+            if metric not in baseline_metrics:
+                continue
+            baseline_value = baseline_metrics[metric]
+            rows.append(
+                {
+                    "backend": result["backend"],
+                    "count": result["count"],
+                    "codec": result["codec"],
+                    "metric": metric,
+                    "baseline": baseline_value,
+                    "current": value,
+                    "ratio": value / baseline_value if baseline_value else None,
+                }
+            )
+
+    baseline_commit = baseline["metadata"].get("git_commit")
+    log.info(f"Comparison against baseline {baseline_commit or '(unknown commit)'}:")
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        log.info(f"  {row['backend']:>17} {row['count']:>10} {row['metric']:<36} {ratio:>8}")
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10000, 100000], help="numbers of keys to load")
+    parser.add_argument("--sample-size", type=int, default=10000, help="number of keys to read during lookup phases")
+    parser.add_argument(
+        "--conflict-proportion",
+        type=float,
+        default=0.1,
+        help="size of conflicting bulk insert, as a proportion of count.  Half of the inserted keys will conflict",
+    )
+    parser.add_argument(
+        "--threshold-proportion",
+        type=float,
+        default=0.1,
+        help="in-memory item threshold of AutoDict/SpillDict, as a proportion of count",
+    )
+    available_backends = [name for name, backend in BACKENDS.items() if backend.available]
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS.keys()), default=available_backends)
+    parser.add_argument("--codec", choices=list(CODECS.keys()), default="pickle", help="value codec")
+    parser.add_argument("--output", help="path to write the JSON report to")
+    parser.add_argument("--compare", help="path of a previous JSON report to compare against")
+    parser.add_argument(
+        "--no-isolate",
+        action="store_true",
+        help="run all cases in this process.  Faster, but peak RSS of later cases includes that of earlier ones",
+    )
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    configure_logging(filepath=None, log_level=parse_log_level(args.log_level))
+    report = run(
+        args.backends,
+        args.counts,
+        args.sample_size,
+        args.conflict_proportion,
+        args.threshold_proportion,
+        args.codec,
+        isolate=not args.no_isolate,
+    )
+
+    if args.output:
+        with open(args.output, "w") as outfile:
+            json.dump(report, outfile, indent=2)
+        log.info(f"Wrote report to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as infile:
+            compare_reports(json.load(infile), report)
@@ -0,0 +1,59 @@
+import hashlib
+import math
+from typing import Iterable
+from typing import List
+
+
+class BloomFilter:
+    """
+    In-memory Bloom filter over str keys, for short-circuiting lookups of keys which are definitely absent from a
+    disk-backed store.  Membership tests never give false negatives, and give false positives at approximately the
+    configured rate provided no more than capacity keys are added.  Keys cannot be removed.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        """
+        :param capacity: expected number of keys to be added
+        :param false_positive_rate: target false-positive rate at capacity, in (0, 1)
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive (got {capacity})")
+        if not 0 < false_positive_rate < 1:
+            raise ValueError(f"false_positive_rate must be in (0, 1) (got {false_positive_rate})")
+
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self._bit_count = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self._hash_count = max(1, round(self._bit_count / capacity * math.log(2)))
+        self._bits = bytearray(math.ceil(self._bit_count / 8))
+        self._added_count = 0
+
+    def _positions(self, key: str) -> List[int]:
+        # Kirsch-Mitzenmacher double hashing - derive all k positions from two halves of a single digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self._bit_count for i in range(self._hash_count)]
+
+    def add(self, key: str) -> None:
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self._added_count += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def added_count(self) -> int:
+        """Number of add() calls, including re-adds of keys already present"""
+        return self._added_count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
@@ -1,5 +1,6 @@
 from typing import Any
 from typing import Iterator
+from typing import KeysView
 from typing import Optional
 
 from pds.registrysweepers.utils.bigdict.base import BigDict
@@ -28,3 +29,7 @@ class DictDict(BigDict):
 
     def __len__(self) -> int:
         return len(self._store)
+
+    def keys_view(self) -> KeysView[str]:
+        """Return a live, set-like view of the stored keys, e.g. to exclude or intersect with another BigDict's keys"""
+        return self._store.keys()
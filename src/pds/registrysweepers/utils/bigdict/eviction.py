@@ -0,0 +1,130 @@
+from abc import ABC
+from abc import abstractmethod
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict
+from typing import Iterable
+from typing import List
+
+from pds.registrysweepers.utils.bigdict.dictdict import DictDict
+
+
+class EvictionPolicy(ABC):
+    """
+    Selects which SpillDict cache keys to spill to disk.
+
+    SpillDict notifies the policy of each cache put/get/removal, so implementations should keep that bookkeeping O(1).
+    Keys hinted as cold by the caller (e.g. records which will not be updated again) are always selected first, in
+    the order hinted.
+    """
+
+    def __init__(self):
+        self._cold_keys: OrderedDict[str, None] = OrderedDict()
+
+    # on_put() and on_get() are optional hooks rather than abstract, as policies which ignore access order need not
+    # implement them
+    def on_put(self, key: str) -> None:  # noqa: B027
+        """Note that key was added to, or updated in, the cache.  Does nothing unless overridden"""
+        return None
+
+    def on_get(self, key: str) -> None:  # noqa: B027
+        """Note that key was read from the cache.  Does nothing unless overridden"""
+        return None
+
+    def on_remove(self, key: str) -> None:
+        self._cold_keys.pop(key, None)
+
+    def mark_cold(self, keys: Iterable[str]) -> None:
+        """Hint that the given keys are unlikely to be accessed again, so should be spilled ahead of all others"""
+        for key in keys:
+            self._cold_keys[key] = None
+
+    def select(self, cache: DictDict, count: int) -> List[str]:
+        """Return up to count keys of the given cache to spill"""
+        selected: Dict[str, None] = {}
+        while self._cold_keys and len(selected) < count:
+            key, _ = self._cold_keys.popitem(last=False)
+            if cache.has(key):
+                selected[key] = None
+
+        if len(selected) < count:
+            # warm selection may include keys already selected as cold, so request a full quota to ensure enough remain
+            for key in self._select_warm(cache, count):
+                if len(selected) >= count:
+                    break
+                selected[key] = None
+
+        return list(selected)
+
+    @abstractmethod
+    def _select_warm(self, cache: DictDict, count: int) -> Iterable[str]:
+        pass
+
+
+class FifoEvictionPolicy(EvictionPolicy):
+    """Spill keys in the order they were first inserted into the cache, regardless of access.  Zero overhead."""
+
+    def _select_warm(self, cache: DictDict, count: int) -> Iterable[str]:
+        return list(islice(iter(cache), count))
+
+
+class LruEvictionPolicy(EvictionPolicy):
+    """Spill least-recently put/got keys first"""
+
+    def __init__(self):
+        super().__init__()
+        self._recency: OrderedDict[str, None] = OrderedDict()
+
+    def on_put(self, key: str) -> None:
+        self._recency[key] = None
+        self._recency.move_to_end(key)
+
+    def on_get(self, key: str) -> None:
+        if key in self._recency:
+            self._recency.move_to_end(key)
+
+    def on_remove(self, key: str) -> None:
+        super().on_remove(key)
+        self._recency.pop(key, None)
+
+    def _select_warm(self, cache: DictDict, count: int) -> Iterable[str]:
+        return list(islice(self._recency, count))
+
+
+class ClockEvictionPolicy(EvictionPolicy):
+    """
+    CLOCK (second-chance) approximation of LRU/LFU.  Access only sets a reference bit, which is cheaper than LRU's
+    reordering.  During selection, the hand sweeps keys in insertion order, evicting unreferenced keys and clearing the
+    bit of (and passing over) referenced ones.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._referenced: OrderedDict[str, bool] = OrderedDict()
+
+    def on_put(self, key: str) -> None:
+        # re-put of a cached key counts as a reference, while a new key starts unreferenced
+        self._referenced[key] = key in self._referenced
+
+    def on_get(self, key: str) -> None:
+        if key in self._referenced:
+            self._referenced[key] = True
+
+    def on_remove(self, key: str) -> None:
+        super().on_remove(key)
+        self._referenced.pop(key, None)
+
+    def _select_warm(self, cache: DictDict, count: int) -> Iterable[str]:
+        selected: Dict[str, None] = {}
+        # bounded at two sweeps - the first sweep clears every reference bit, so the second must fill the quota
+        for _ in range(2 * len(self._referenced)):
+            if len(selected) >= count or not self._referenced:
+                break
+            key, referenced = next(iter(self._referenced.items()))
+            self._referenced.move_to_end(key)
+            if referenced:
+                self._referenced[key] = False
+            else:
+                selected[key] = None
+
+        return list(selected)
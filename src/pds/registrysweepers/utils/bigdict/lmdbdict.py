@@ -0,0 +1,161 @@
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from pds.registrysweepers.utils.bigdict.base import BigDict
+from pds.registrysweepers.utils.bigdict.bloomfilter import BloomFilter
+from pds.registrysweepers.utils.bigdict.valuecodecs import PickleCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import ValueCodec
+from pds.registrysweepers.utils.misc import iterate_pages_of_size
+
+
+def _import_lmdb():
+    try:
+        import lmdb  # type: ignore
+    except ImportError as err:
+        raise ImportError(
+            'LmdbDict requires the optional "lmdb" package - install with "pip install pds.registry-sweepers[lmdb]"'
+        ) from err
+    return lmdb
+
+
+class LmdbDict(BigDict):
+    """
+    LMDB-backed BigDict for large datasets.
+
+    Data is held in a memory-mapped B+tree, so reads are served directly from the page cache (values are decoded
+    straight from the mapped buffer, without an intermediate copy) and writes are batched into as few transactions as
+    possible.  Keys are limited to LMDB's maximum key size of 511 bytes when utf-8 encoded, which comfortably exceeds
+    the 255-character limit on LIDs.
+    """
+
+    file_suffix = ".lmdb"
+
+    def __init__(
+        self,
+        db_path: str,
+        map_size: int = 2**38,
+        bloom_filter: Optional[BloomFilter] = None,
+        codec: Optional[ValueCodec] = None,
+    ):
+        """
+        :param db_path: path to the LMDB data file.  A lockfile is created alongside it, at <db_path>-lock
+        :param map_size: maximum size of the database.  Address space is reserved up-front but disk space is not
+        :param bloom_filter: optional filter used to skip LMDB for keys which are definitely absent.  It is populated
+          with any keys already present in the database, and must not be shared with another store.
+        :param codec: codec used to serialize values; PickleCodec if None.  Must match the codec of any existing data
+        """
+        lmdb = _import_lmdb()
+        self._db_path = db_path
+        self._codec = codec or PickleCodec()
+        # db is transient - corruption-on-crash is acceptable, so skip fsync entirely
+        self._env = lmdb.open(db_path, map_size=map_size, subdir=False, sync=False, metasync=False, readahead=False)
+
+        self._bloom_filter = bloom_filter
+        if self._bloom_filter is not None:
+            self._bloom_filter.update(self)
+
+    def _definitely_absent(self, key: str) -> bool:
+        return self._bloom_filter is not None and key not in self._bloom_filter
+
+    def put(self, key: str, value: Any) -> None:
+        blob = self._codec.encode(value)
+        with self._env.begin(write=True) as txn:
+            txn.put(key.encode(), blob)
+        if self._bloom_filter is not None:
+            self._bloom_filter.add(key)
+
+    def put_many(self, kv_pairs: Iterable[Tuple[str, Any]], batch_size: int = 100000) -> None:
+        """
+        Insert or replace multiple key/value pairs efficiently, in one transaction per batch.
+
+        :param kv_pairs: sequence of (key, value) pairs
+        """
+        for batch in iterate_pages_of_size(batch_size, kv_pairs):
+            to_insert = [(key.encode(), self._codec.encode(value)) for key, value in batch]
+            with self._env.begin(write=True) as txn:
+                txn.cursor().putmulti(to_insert)
+            if self._bloom_filter is not None:
+                self._bloom_filter.update(key for key, _ in batch)
+
+    def put_many_returning_conflicts(self, kv_pairs: Iterable[Tuple[str, Any]]) -> List[str]:
+        """
+        Insert rows in bulk, rejecting and returning the keys of rows whose key already exists.
+        This is useful when merging conflicts is necessary.
+
+        Returns:
+            List of keys that conflicted.
+        """
+        to_insert = [(key, self._codec.encode(value)) for key, value in kv_pairs]
+
+        conflicts = []
+        with self._env.begin(write=True) as txn:
+            for key, blob in to_insert:
+                # keys which are definitely absent cannot conflict, so skip the existence check
+                if self._definitely_absent(key):
+                    txn.put(key.encode(), blob)
+                elif not txn.put(key.encode(), blob, overwrite=False):
+                    conflicts.append(key)
+
+        if self._bloom_filter is not None:
+            self._bloom_filter.update(key for key, _ in to_insert)
+
+        return conflicts
+
+    def get(self, key: str) -> Optional[Any]:
+        if self._definitely_absent(key):
+            return None
+        with self._env.begin(buffers=True) as txn:
+            buffer = txn.get(key.encode())
+            return None if buffer is None else self._codec.decode(buffer)
+
+    def get_many(self, keys: Iterable[str]) -> Iterable[Tuple[str, Any]]:
+        """Given an iterable collection of keys, return an iterable collection of dict.items()-like (k, v) tuples"""
+        results = []
+        with self._env.begin(buffers=True) as txn:
+            for key in keys:
+                if self._definitely_absent(key):
+                    continue
+                buffer = txn.get(key.encode())
+                if buffer is not None:
+                    results.append((key, self._codec.decode(buffer)))
+        return results
+
+    def pop(self, key: str) -> Optional[Any]:
+        # popped keys remain in the bloom filter, if any, as Bloom filters do not support removal
+        if self._definitely_absent(key):
+            return None
+        with self._env.begin(write=True) as txn:
+            blob = txn.pop(key.encode())
+        return None if blob is None else self._codec.decode(blob)
+
+    def has(self, key: str) -> bool:
+        if self._definitely_absent(key):
+            return False
+        with self._env.begin(buffers=True) as txn:
+            return txn.get(key.encode()) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._env.begin() as txn:
+            for key in txn.cursor().iternext(keys=True, values=False):
+                yield key.decode()
+
+    def __len__(self) -> int:
+        return self._env.stat()["entries"]
+
+    def values(self) -> Iterator[Any]:
+        with self._env.begin(buffers=True) as txn:
+            for buffer in txn.cursor().iternext(keys=False, values=True):
+                yield self._codec.decode(buffer)
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        with self._env.begin(buffers=True) as txn:
+            for key, buffer in txn.cursor():
+                yield bytes(key).decode(), self._codec.decode(buffer)
+
+    def close(self):
+        """Close the LMDB environment."""
+        self._env.close()
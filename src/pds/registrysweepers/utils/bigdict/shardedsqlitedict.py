@@ -0,0 +1,197 @@
+import functools
+import itertools
+import threading
+import zlib
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+from pds.registrysweepers.utils.bigdict.base import BigDict
+from pds.registrysweepers.utils.bigdict.sqlite3dict import SqliteDict
+from pds.registrysweepers.utils.bigdict.valuecodecs import ValueCodec
+from pds.registrysweepers.utils.misc import iterate_pages_of_size
+
+T = TypeVar("T")
+
+
+class _Shard:
+    """A SqliteDict owned by a dedicated thread, which performs every operation on it in submission order"""
+
+    def __init__(self, db_path: str, codec: Optional[ValueCodec], max_pending_writes: int, thread_name: str):
+        self.db_path = db_path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=thread_name)
+        # sqlite3 connections may only be used by the thread which created them, so create it on the shard thread
+        self._dict: SqliteDict = self._executor.submit(SqliteDict, db_path, codec=codec).result()
+        self._pending_writes = threading.BoundedSemaphore(max_pending_writes)
+        self._write_errors: List[BaseException] = []
+
+    def call(self, f: Callable[[SqliteDict], T]) -> T:
+        """Run f against the shard dict on the shard thread, after all previously-submitted writes, and wait for it"""
+        return self._executor.submit(f, self._dict).result()
+
+    def submit(self, f: Callable[[SqliteDict], T]) -> "Future[T]":
+        return self._executor.submit(f, self._dict)
+
+    def write(self, f: Callable[[SqliteDict], Any]) -> None:
+        """Queue a write without waiting for it, blocking only while max_pending_writes are already queued"""
+        self._pending_writes.acquire()
+        future = self._executor.submit(f, self._dict)
+        future.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, future: Future) -> None:
+        self._pending_writes.release()
+        if future.exception() is not None:
+            self._write_errors.append(future.exception())  # type: ignore[arg-type]
+
+    def raise_write_errors(self) -> None:
+        if self._write_errors:
+            err = self._write_errors.pop(0)
+            raise RuntimeError(f'Queued write to shard "{self.db_path}" failed') from err
+
+    def close(self) -> None:
+        self._executor.submit(SqliteDict.close, self._dict).result()
+        self._executor.shutdown()
+
+
+class ShardedSqliteDict(BigDict):
+    """
+    SqliteDict hash-partitioned across shard_count SQLite files, for use by multiple concurrent producer threads.
+
+    Each shard is owned by a dedicated writer thread fed by a queue, so producers never contend for a single sqlite3
+    connection.  Writes (put/put_many) are queued without waiting for them to complete, while reads are queued behind
+    any pending writes to the same shard, and so always observe them.  Failures of queued writes are raised by the next
+    operation on the affected shard, or by flush()/close().
+
+    Instances are safe to share between threads.  Iteration order is shard by shard, and otherwise unspecified.
+    """
+
+    file_suffix = ".sqlite"
+
+    def __init__(
+        self,
+        db_path: str,
+        shard_count: int = 4,
+        codec: Optional[ValueCodec] = None,
+        max_pending_writes: int = 64,
+    ):
+        """
+        :param db_path: base path of the shard files.  Shard i is stored at <db_path>.<i>
+        :param shard_count: number of shards, and of writer threads.  Must not change between opens of the same files
+        :param codec: codec used to serialize values; PickleCodec if None.  Must match the codec of any existing data
+        :param max_pending_writes: maximum queued writes per shard before writers block, bounding queued memory
+        """
+        if shard_count < 1:
+            raise ValueError(f"shard_count must be positive (got {shard_count})")
+
+        self._db_path = db_path
+        self._codec = codec
+        self._shards = [
+            _Shard(f"{db_path}.{idx}", codec, max_pending_writes, thread_name=f"ShardedSqliteDict-{idx}")
+            for idx in range(shard_count)
+        ]
+
+    def _shard_idx(self, key: str) -> int:
+        # crc32 rather than hash(), which is salted per-process, so keys map to the same shard when files are reopened
+        return zlib.crc32(key.encode()) % len(self._shards)
+
+    def _shard_for(self, key: str) -> _Shard:
+        shard = self._shards[self._shard_idx(key)]
+        shard.raise_write_errors()
+        return shard
+
+    def _partition(self, items: Iterable[T], key_of: Callable[[T], str]) -> Dict[int, List[T]]:
+        partitions: Dict[int, List[T]] = {}
+        for item in items:
+            partitions.setdefault(self._shard_idx(key_of(item)), []).append(item)
+        return partitions
+
+    def _call_all(self, partitions: Dict[int, List[T]], f: Callable[[SqliteDict, List[T]], Any]) -> List[Any]:
+        """Run f against each shard with its partition concurrently, waiting for and returning all results"""
+        def bind(part: List[T]) -> Callable[[SqliteDict], Any]:
+            return lambda d: f(d, part)
+
+        for idx in partitions:
+            self._shards[idx].raise_write_errors()
+        futures = [self._shards[idx].submit(bind(part)) for idx, part in partitions.items()]
+        return [future.result() for future in futures]
+
+    def put(self, key: str, value: Any) -> None:
+        self._shard_for(key).write(lambda d: d.put(key, value))
+
+    def put_many(self, kv_pairs: Iterable[Tuple[str, Any]], batch_size: int = 10000) -> None:
+        """Partition the pairs among shards in batches of batch_size, queueing a put_many() to each shard per batch"""
+        for batch in iterate_pages_of_size(batch_size, kv_pairs):
+            for idx, partition in self._partition(batch, key_of=lambda kv: kv[0]).items():
+                self._shards[idx].write(functools.partial(SqliteDict.put_many, kv_pairs=partition))
+
+    def put_many_returning_conflicts(self, kv_pairs: Iterable[Tuple[str, Any]]) -> List[str]:
+        partitions = self._partition(kv_pairs, key_of=lambda kv: kv[0])
+        results = self._call_all(partitions, lambda d, part: d.put_many_returning_conflicts(part))
+        return list(itertools.chain.from_iterable(results))
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._shard_for(key).call(lambda d: d.get(key))
+
+    def get_many(self, keys: Iterable[str]) -> Iterable[Tuple[str, Any]]:
+        partitions = self._partition(keys, key_of=lambda key: key)
+        results = self._call_all(partitions, lambda d, part: list(d.get_many(part)))
+        return list(itertools.chain.from_iterable(results))
+
+    def pop(self, key: str) -> Optional[Any]:
+        return self._shard_for(key).call(lambda d: d.pop(key))
+
+    def has(self, key: str) -> bool:
+        return self._shard_for(key).call(lambda d: d.has(key))
+
+    def flush(self) -> None:
+        """Wait for all queued writes to complete, raising if any failed"""
+        for shard in self._shards:
+            shard.call(lambda d: None)
+            shard.raise_write_errors()
+
+    def _iter_shard_readers(self) -> Iterator[SqliteDict]:
+        """
+        Flush queued writes, then yield a reader connection to each shard in turn.  SQLite's write-ahead log allows
+        these to read concurrently with the shard writer threads, on the calling thread.
+        """
+        self.flush()
+        for shard in self._shards:
+            reader = SqliteDict(shard.db_path, codec=self._codec)
+            try:
+                yield reader
+            finally:
+                reader.close()
+
+    def __iter__(self) -> Iterator[str]:
+        for reader in self._iter_shard_readers():
+            yield from reader
+
+    def __len__(self) -> int:
+        for shard in self._shards:
+            shard.raise_write_errors()
+        futures = [shard.submit(len) for shard in self._shards]
+        return sum(future.result() for future in futures)
+
+    def values(self) -> Iterator[Any]:
+        for reader in self._iter_shard_readers():
+            yield from reader.values()
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        for reader in self._iter_shard_readers():
+            yield from reader.items()
+
+    def close(self) -> None:
+        """Flush queued writes, then close all shards and stop their threads."""
+        try:
+            self.flush()
+        finally:
+            for shard in self._shards:
+                shard.close()
@@ -3,69 +3,144 @@ import logging
 import math
 import os
 import tempfile
-from itertools import islice
+from dataclasses import dataclass
 from typing import Any
 from typing import Callable
+from typing import Iterable
 from typing import Iterator
 from typing import Optional
 from typing import Tuple
+from typing import Type
+from typing import Union
 
 from more_itertools import batched
 from pds.registrysweepers.utils.bigdict.base import BigDict
+from pds.registrysweepers.utils.bigdict.bloomfilter import BloomFilter
 from pds.registrysweepers.utils.bigdict.dictdict import DictDict
+from pds.registrysweepers.utils.bigdict.eviction import EvictionPolicy
+from pds.registrysweepers.utils.bigdict.eviction import FifoEvictionPolicy
+from pds.registrysweepers.utils.bigdict.lmdbdict import LmdbDict
 from pds.registrysweepers.utils.bigdict.sqlite3dict import SqliteDict
+from pds.registrysweepers.utils.bigdict.valuecodecs import ValueCodec
+from pds.registrysweepers.utils.memorygovernor import MemoryGovernor
+
+
+@dataclass
+class SpillStats:
+    """Counters for tuning a SpillDict's threshold and eviction policy"""
+
+    spills: int = 0
+    spilled_items: int = 0
+    spill_merges: int = 0  # spilled items which conflicted with an existing spilled item, and were merged with it
 
 
 class SpillDict(BigDict):
     """
-    A hybrid dictionary with an in-memory cache and a SQLite spillover
+    A hybrid dictionary with an in-memory cache and a disk spillover (SQLite, by default)
 
     - Fast access for recently-added items in _cache
-    - When cache length exceeds item_count_threshold, items spill into SQLite
-    - When spilling an item with a key already existing in the Sqlite db, the conflict is managed according to a
+    - When cache length exceeds spill_threshold, or process memory usage exceeds the target of memory_governor, items
+      spill to disk
+    - When spilling an item with a key already existing on disk, the conflict is managed according to a
       function provided by the caller during initialisation
+    - The number of spilled keys, and of those which are also cached, is tracked incrementally on spill, put and pop so
+      that len() is O(1).  A put only looks up the spill once something has spilled, and the lookup is answered from
+      the Bloom filter (if any) for keys which were never spilled
+    - Which cached items are spilled is determined by a pluggable EvictionPolicy (FIFO, by default)
     """
 
     _cache: DictDict
-    _spill: SqliteDict
+    _spill: Union[SqliteDict, LmdbDict]
     _item_merge_fn: Callable[[Any, Any], Any]
     _spill_proportion: float
 
     def __init__(
         self,
-        spill_threshold: int,
+        spill_threshold: Optional[int],
         merge: Callable[[Any, Any], Any],
         spill_proportion: float = 0.9,
         db_path: Optional[str] = None,
+        disk_backend: Type[Union[SqliteDict, LmdbDict]] = SqliteDict,
+        eviction_policy: Optional[EvictionPolicy] = None,
+        expected_key_count: Optional[int] = None,
+        false_positive_rate: float = 0.01,
+        codec: Optional[ValueCodec] = None,
+        memory_governor: Optional[MemoryGovernor] = None,
+        pressure_spill_min_items: int = 1024,
     ):
         """
-        :param spill_threshold: maximum fast cache items before spilling to disk
+        :param spill_threshold: maximum fast cache items before spilling to disk, or None for no item limit
         :param merge: function merge(new, existing) -> merged_value
-        :param spill_proportion: proportion of filled cache to spill to disk
-        :param db_path: path to SQLite DB file; temp file if None
+        :param spill_proportion: proportion of filled cache (of spill_threshold if exceeded, else of the current cache
+          length) to spill to disk
+        :param db_path: path to spill DB file; temp file if None
+        :param disk_backend: the disk-backed BigDict implementation to spill to
+        :param eviction_policy: policy selecting which cached items to spill; FifoEvictionPolicy if None
+        :param expected_key_count: if provided, a Bloom filter sized for this many keys (at false_positive_rate) is kept
+          in front of the spill, avoiding disk lookups for keys which were never spilled
+        :param false_positive_rate: target false-positive rate of the Bloom filter, if any
+        :param codec: codec used to serialize spilled values; PickleCodec if None
+        :param memory_governor: if provided, spill whenever the governor reports memory pressure.  RSS rarely falls
+          once freed objects are returned to the allocator, so pressure persists after a spill.  To avoid repeatedly
+          emptying the cache, another pressure-triggered spill only occurs once the cache has regrown to the length at
+          which the last one did
+        :param pressure_spill_min_items: the minimum cache length at which memory pressure triggers a spill
         """
+        if spill_threshold is None and memory_governor is None:
+            raise ValueError("At least one of spill_threshold and memory_governor must be provided")
+
         self.spill_threshold = spill_threshold
+        self._memory_governor = memory_governor
+        self._pressure_spill_min_items = pressure_spill_min_items
+        self._pressure_spill_cache_length = 0  # cache length at the last pressure-triggered spill
         self._item_merge_fn = merge
         self._spill_proportion = spill_proportion
-        self._db_path = db_path or os.path.join(tempfile.gettempdir(), f"spilldict_{os.getpid()}_{id(self)}.sqlite")
+        self._db_path = db_path or os.path.join(
+            tempfile.gettempdir(), f"spilldict_{os.getpid()}_{id(self)}{disk_backend.file_suffix}"
+        )
         self._cache = DictDict()
-        self._spill = SqliteDict(self._db_path)
+        bloom_filter = BloomFilter(expected_key_count, false_positive_rate) if expected_key_count else None
+        self._spill = disk_backend(self._db_path, bloom_filter=bloom_filter, codec=codec)
+        self._spilled_count = len(self._spill)
+        self._overlap_count = 0  # count of keys present in both _cache and _spill
+        self._eviction_policy = eviction_policy or FifoEvictionPolicy()
+        self.stats = SpillStats()
+
+    def _is_pressure_spill_due(self) -> bool:
+        """Whether the cache has regrown enough since the last pressure-triggered spill, and is under memory pressure"""
+        if self._memory_governor is None:
+            return False
+
+        min_cache_length = max(self._pressure_spill_min_items, self._pressure_spill_cache_length)
+        return len(self._cache) >= min_cache_length and self._memory_governor.is_under_pressure()
 
     def _spill_if_needed(self):
-        """Spill items from cache into the SQLite store when threshold exceeded."""
-        if len(self._cache) <= self.spill_threshold:
+        """Spill items from cache into the disk store when threshold exceeded."""
+        if self.spill_threshold is not None and len(self._cache) > self.spill_threshold:
+            spill_count = math.ceil(self.spill_threshold * self._spill_proportion)
+            logging.info(
+                f"Spill threshold {self.spill_threshold} reached - spilling {spill_count} items from cache to disk"
+            )
+        elif self._is_pressure_spill_due():
+            self._pressure_spill_cache_length = len(self._cache)
+            spill_count = math.ceil(len(self._cache) * self._spill_proportion)
+            logging.info(
+                f"Memory threshold {self._memory_governor.target_percent}% reached - spilling {spill_count} items from "
+                f"cache to disk"
+            )
+        else:
             return
 
-        spill_count = math.ceil(self.spill_threshold * self._spill_proportion)
-        logging.info(
-            f"Spill threshold {self.spill_threshold} reached - spilling {spill_count} items from cache to disk"
-        )
-
-        items_to_spill = list(islice(self._cache.items(), spill_count))
+        keys_to_spill = self._eviction_policy.select(self._cache, spill_count)
+        items_to_spill = [(key, self._cache[key]) for key in keys_to_spill]
+        self.stats.spills += 1
+        self.stats.spilled_items += len(items_to_spill)
 
-        # Move the first {spill_count} items to the SqliteDict
+        # Move the selected items to the disk store
         for batch in batched(items_to_spill, spill_count):
             conflicting_ids = self._spill.put_many_returning_conflicts(batch)
+            self._spilled_count += len(batch) - len(conflicting_ids)
+            self._overlap_count -= len(conflicting_ids)
             if conflicting_ids:
                 merged_items = {}
                 existing_items = self._spill.get_many(conflicting_ids)
@@ -75,6 +150,7 @@ class SpillDict(BigDict):
                     merged_items[k] = merged_item
 
                 logging.info(f"Merged {len(merged_items)} conflicting items during spill operation")
+                self.stats.spill_merges += len(merged_items)
 
                 # Write the merged items back to _spill, overwriting
                 self._spill.put_many(merged_items.items())
@@ -82,15 +158,25 @@ class SpillDict(BigDict):
         # Pop the spilled/merged items from _cache
         for k, _ in items_to_spill:
             self._cache.pop(k)
+            self._eviction_policy.on_remove(k)
 
     def put(self, key: str, value: Any) -> None:
         """Insert into cache, then spill if needed."""
+        if self._spilled_count > 0 and key not in self._cache and self._spill.has(key):
+            self._overlap_count += 1
         self._cache[key] = value
+        self._eviction_policy.on_put(key)
         self._spill_if_needed()
 
+    def mark_cold(self, keys: Iterable[str]) -> None:
+        """Hint that the given keys will not be accessed again soon, so should be spilled ahead of all others"""
+        self._eviction_policy.mark_cold(keys)
+
     def get(self, key: str) -> Optional[Any]:
         """Get the union of cached and spilled data for a key"""
         cached_value = self._cache.get(key)
+        if cached_value is not None:
+            self._eviction_policy.on_get(key)
         spilled_value = self._spill.get(key)
 
         if cached_value is not None and spilled_value is not None:
@@ -100,35 +186,35 @@ class SpillDict(BigDict):
 
     def pop(self, key: str) -> Optional[Any]:
         """Union cached and spilled data for a key, and pop from both"""
-        if key in self._cache:
-            cached_value = self._cache.pop(key)
-        else:
-            cached_value = None
+        is_cached = key in self._cache
+        cached_value = self._cache.pop(key) if is_cached else None
+        if is_cached:
+            self._eviction_policy.on_remove(key)
 
         spilled_value = self._spill.pop(key)
+        if spilled_value is not None:
+            self._spilled_count -= 1
+            if is_cached:
+                self._overlap_count -= 1
+
         if cached_value is not None and spilled_value is not None:
             return self._item_merge_fn(cached_value, spilled_value)
         else:
             return cached_value or spilled_value
 
     def has(self, key: str) -> bool:
-        """Check in cache, then SQLite."""
+        """Check in cache, then disk."""
         return key in self._cache or self._spill.has(key)
 
     def __iter__(self) -> Iterator[str]:
         """Iterate over the union of cached and spilled keys"""
 
-        for key in self._cache:
-            yield key
-
-        for key in self._spill:
-            if key in self._cache:
-                continue
-            yield key
+        yield from self._cache
+        yield from self._spill.keys_excluding(self._cache.keys_view())
 
     def __len__(self) -> int:
         """Total unique count across cache and spill."""
-        return len(self._cache) + sum(1 for k in self._spill if k not in self._cache)
+        return len(self._cache) + self._spilled_count - self._overlap_count
 
     def keys(self) -> Iterator[str]:
         return iter(self)
@@ -138,17 +224,17 @@ class SpillDict(BigDict):
             yield value
 
     def items(self) -> Iterator[Tuple[str, Any]]:
-        remaining_cached_keys = set(self._cache.keys())
-        for key, spilled_value in self._spill.items():
-            if key in self._cache:
-                cached_value = self._cache[key]
-                yield key, self._item_merge_fn(cached_value, spilled_value)
-                remaining_cached_keys.remove(key)
-            else:
-                yield key, spilled_value
-
-        for key in remaining_cached_keys:
-            yield key, self._cache[key]
+        """Iterate over the union of cached and spilled items, merging those which are both cached and spilled"""
+        overlapping_keys = set()
+        for key, spilled_value in self._spill.items_intersecting(self._cache.keys_view()):
+            yield key, self._item_merge_fn(self._cache[key], spilled_value)
+            overlapping_keys.add(key)
+
+        yield from self._spill.items_excluding(self._cache.keys_view())
+
+        for key, cached_value in self._cache.items():
+            if key not in overlapping_keys:
+                yield key, cached_value
 
     def __getitem__(self, key: str) -> Any:
         val = self.get(key)
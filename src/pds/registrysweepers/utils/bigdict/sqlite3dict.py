@@ -1,6 +1,8 @@
-import pickle
+import itertools
 import sqlite3
+from contextlib import contextmanager
 from typing import Any
+from typing import Collection
 from typing import Iterable
 from typing import Iterator
 from typing import List
@@ -8,15 +10,30 @@ from typing import Optional
 from typing import Tuple
 
 from pds.registrysweepers.utils.bigdict.base import BigDict
+from pds.registrysweepers.utils.bigdict.bloomfilter import BloomFilter
+from pds.registrysweepers.utils.bigdict.valuecodecs import PickleCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import ValueCodec
 from pds.registrysweepers.utils.misc import iterate_pages_of_size
 
 
 class SqliteDict(BigDict):
     """SQLite-backed BigDict for large datasets"""
 
-    def __init__(self, db_path: str):
+    file_suffix = ".sqlite"
+
+    def __init__(
+        self, db_path: str, bloom_filter: Optional[BloomFilter] = None, codec: Optional[ValueCodec] = None
+    ):
+        """
+        :param db_path: path to the SQLite DB file
+        :param bloom_filter: optional filter used to skip SQLite for keys which are definitely absent.  It is populated
+          with any keys already present in the database, and must not be shared with another store.
+        :param codec: codec used to serialize values; PickleCodec if None.  Must match the codec of any existing data
+        """
         self.table_name = "bigdict"
+        self._codec = codec or PickleCodec()
         self._db_path = db_path
+        self._temp_table_ids = itertools.count()
         self._conn = sqlite3.connect(self._db_path)
         self._conn.execute("PRAGMA journal_mode = WAL")  # enable write-ahead logging for sanic.gif (>4x when tested)
         self._conn.execute("PRAGMA synchronous = OFF")  # db is transient - corruption-on-crash is acceptable
@@ -35,10 +52,19 @@ class SqliteDict(BigDict):
         )
         self._conn.commit()
 
+        self._bloom_filter = bloom_filter
+        if self._bloom_filter is not None:
+            self._bloom_filter.update(self)
+
+    def _definitely_absent(self, key: str) -> bool:
+        return self._bloom_filter is not None and key not in self._bloom_filter
+
     def put(self, key: str, value: Any) -> None:
-        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        blob = self._codec.encode(value)
         with self._conn:
             self._conn.execute(f"REPLACE INTO {self.table_name} (key, value) VALUES (?, ?)", (key, blob))
+        if self._bloom_filter is not None:
+            self._bloom_filter.add(key)
 
     def put_many(self, kv_pairs: Iterable[Tuple[str, Any]], batch_size: int = 500) -> None:
         """
@@ -46,11 +72,13 @@ class SqliteDict(BigDict):
 
         :param kv_pairs: sequence of (key, value) pairs
         """
-        # Pre-pickle everything to avoid pickling inside the transaction loop
-        to_insert = [(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) for key, value in kv_pairs]
+        # Pre-encode everything to avoid encoding inside the transaction loop
+        to_insert = [(key, self._codec.encode(value)) for key, value in kv_pairs]
         for batch in iterate_pages_of_size(batch_size, to_insert):
             with self._conn:
                 self._conn.executemany(f"REPLACE INTO {self.table_name} (key, value) VALUES (?, ?)", batch)
+        if self._bloom_filter is not None:
+            self._bloom_filter.update(key for key, _ in to_insert)
 
     def put_many_returning_conflicts(self, kv_pairs: Iterable[Tuple[str, Any]]) -> List[Any]:
         """
@@ -65,7 +93,20 @@ class SqliteDict(BigDict):
 
         temp_table_name = f"{self.table_name}_tmp"
 
-        to_insert = [(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) for key, value in kv_pairs]
+        to_insert = [(key, self._codec.encode(value)) for key, value in kv_pairs]
+
+        if self._bloom_filter is not None:
+            # Rows whose keys are definitely absent cannot conflict, so are inserted directly, leaving only possible
+            # conflicts to be resolved by joining against the table
+            definitely_new = [row for row in to_insert if row[0] not in self._bloom_filter]
+            to_insert = [row for row in to_insert if row[0] in self._bloom_filter]
+            with self._conn:
+                self._conn.executemany(f"INSERT INTO {self.table_name} (key, value) VALUES (?, ?)", definitely_new)
+            self._bloom_filter.update(key for key, _ in definitely_new)
+
+            if not to_insert:
+                return []
+            self._bloom_filter.update(key for key, _ in to_insert)
 
         cur = self._conn.cursor()
         # 1. Create temporary table
@@ -101,21 +142,24 @@ class SqliteDict(BigDict):
         return conflicts
 
     def get(self, key: str) -> Optional[Any]:
+        if self._definitely_absent(key):
+            return None
         cur = self._conn.execute(f"SELECT value FROM {self.table_name} WHERE key = ?", (key,))
         row = cur.fetchone()
         if row is None:
             return None
-        return pickle.loads(row[0])
+        return self._codec.decode(row[0])
 
     def get_many(self, keys: Iterable[str]) -> Iterable[Tuple[str, Any]]:
         """Given an iterable collection of keys, return an iterable collection of dict.items()-like (k, v) tuples"""
-        keys = list(keys)
+        keys = [key for key in keys if not self._definitely_absent(key)]
         placeholders = ", ".join("?" for key in keys)
         cur = self._conn.execute(f"SELECT key, value FROM {self.table_name} WHERE key IN ({placeholders})", tuple(keys))
         rows = cur.fetchall()
-        return map(lambda row: (row[0], pickle.loads(row[1])), rows)
+        return map(lambda row: (row[0], self._codec.decode(row[1])), rows)
 
     def pop(self, key: str) -> Optional[Any]:
+        # popped keys remain in the bloom filter, if any, as Bloom filters do not support removal
         val = self.get(key)
         if val is not None:
             with self._conn:
@@ -123,6 +167,8 @@ class SqliteDict(BigDict):
         return val
 
     def has(self, key: str) -> bool:
+        if self._definitely_absent(key):
+            return False
         cur = self._conn.execute(f"SELECT 1 FROM {self.table_name} WHERE key = ? LIMIT 1", (key,))
         return cur.fetchone() is not None
 
@@ -131,6 +177,52 @@ class SqliteDict(BigDict):
         for (key,) in cur:
             yield key
 
+    @contextmanager
+    def _temp_keys_table(self, keys: Iterable[str]) -> Iterator[str]:
+        """Load the given keys into a temporary table for the duration of the context, yielding the table name"""
+        temp_table_name = f"{self.table_name}_keys_{next(self._temp_table_ids)}"
+        self._conn.execute(f"CREATE TEMP TABLE {temp_table_name} (key TEXT PRIMARY KEY)")
+        try:
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO {temp_table_name} (key) VALUES (?)", ((key,) for key in keys)
+            )
+            yield temp_table_name
+        finally:
+            self._conn.execute(f"DROP TABLE {temp_table_name}")
+
+    def keys_excluding(self, keys: Collection[str]) -> Iterator[str]:
+        """Yield the stored keys which are not members of the given keys, as an anti-join in SQLite"""
+        with self._temp_keys_table(keys) as temp_table_name:
+            cur = self._conn.execute(
+                f"""
+                SELECT key FROM {self.table_name}
+                WHERE NOT EXISTS (SELECT 1 FROM {temp_table_name} WHERE {temp_table_name}.key = {self.table_name}.key)
+            """
+            )
+            for (key,) in cur:
+                yield key
+
+    def items_excluding(self, keys: Collection[str]) -> Iterator[Tuple[str, Any]]:
+        """Yield the stored items whose keys are not members of the given keys, as an anti-join in SQLite"""
+        with self._temp_keys_table(keys) as temp_table_name:
+            cur = self._conn.execute(
+                f"""
+                SELECT key, value FROM {self.table_name}
+                WHERE NOT EXISTS (SELECT 1 FROM {temp_table_name} WHERE {temp_table_name}.key = {self.table_name}.key)
+            """
+            )
+            for key, value in cur:
+                yield key, self._codec.decode(value)
+
+    def items_intersecting(self, keys: Collection[str]) -> Iterator[Tuple[str, Any]]:
+        """Yield the stored items whose keys are members of the given keys, as a join in SQLite"""
+        with self._temp_keys_table(keys) as temp_table_name:
+            cur = self._conn.execute(
+                f"SELECT key, value FROM {self.table_name} JOIN {temp_table_name} USING (key)"
+            )
+            for key, value in cur:
+                yield key, self._codec.decode(value)
+
     def __len__(self) -> int:
         cur = self._conn.execute(f"SELECT COUNT(*) FROM {self.table_name}")
         (count,) = cur.fetchone()
@@ -139,12 +231,12 @@ class SqliteDict(BigDict):
     def values(self) -> Iterator[Any]:
         cur = self._conn.execute(f"SELECT value FROM {self.table_name}")
         for (value,) in cur:
-            yield pickle.loads(value)
+            yield self._codec.decode(value)
 
     def items(self) -> Iterator[tuple[str, Any]]:
         cur = self._conn.execute(f"SELECT key, value FROM {self.table_name}")
         for key, value in cur:
-            yield key, pickle.loads(value)
+            yield key, self._codec.decode(value)
 
     def close(self):
         """Close the SQLite connection."""
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from array import array
+from base64 import b64decode
+from base64 import b64encode
+from bisect import bisect_right
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from pds.registrysweepers.utils.bigdict.base import BigDict
+from pds.registrysweepers.utils.bigdict.valuecodecs import _read_varint
+from pds.registrysweepers.utils.bigdict.valuecodecs import _write_varint
+from pds.registrysweepers.utils.bigdict.valuecodecs import PickleCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import ValueCodec
+from pds.registrysweepers.utils.externalsort import external_sort
+
+# magic, byte-order sentinel, entry count, data section length, sparse index entry count
+_HEADER = struct.Struct("=8sQQQQ")
+_MAGIC = b"SSTABLE1"
+_BYTE_ORDER_SENTINEL = 0x0102030405060708
+
+# separates the key, sequence number and value of each line sorted by external_sort.  As it precedes every other
+# character, lines sort in the utf-8 order of their keys, then in input order
+_SORT_FIELD_SEPARATOR = "\0"
+
+
+def _external_sort_pairs(
+    kv_pairs: Iterable[Tuple[str, bytes]], max_items_in_memory: int, tmp_dir: Optional[str]
+) -> Iterator[Tuple[bytes, bytes]]:
+    """
+    Yield the given (key, encoded value) pairs in utf-8 key order, keeping the last value of each repeated key, with at
+    most max_items_in_memory pairs held in memory
+    """
+
+    def to_lines() -> Iterator[str]:
+        for sequence_number, (key, blob) in enumerate(kv_pairs):
+            if _SORT_FIELD_SEPARATOR in key or "\n" in key:
+                raise ValueError(f"Keys may not contain null characters or newlines (got {key!r})")
+            yield _SORT_FIELD_SEPARATOR.join([key, f"{sequence_number:020d}", b64encode(blob).decode("ascii")])
+
+    previous_key: Optional[str] = None
+    previous_blob = ""
+    for line in external_sort(to_lines(), max_items_in_memory=max_items_in_memory, unique=False, tmp_dir=tmp_dir):
+        key, _, blob = line.split(_SORT_FIELD_SEPARATOR)
+        if previous_key is not None and key != previous_key:
+            yield previous_key.encode(), b64decode(previous_blob)
+        previous_key, previous_blob = key, blob
+
+    if previous_key is not None:
+        yield previous_key.encode(), b64decode(previous_blob)
+
+
+class SSTableDict(BigDict):
+    """
+    Immutable, read-optimized BigDict for maps which are built once and then only read, e.g. lookup tables of LIDVIDs.
+
+    Records are written to a single file in utf-8 key order, as length-prefixed key/value pairs, followed by a sparse
+    index of the offset of every index_interval-th record.  The file is memory-mapped, so only the keys of the indexed
+    records (~1/index_interval of all keys) are held in memory.  A lookup is a binary search of the sparse index
+    followed by a short scan of at most index_interval records, and values are decoded straight from the mapped file.
+
+    Build with SSTableDict.build(), and reopen a previously-built file (e.g. from an earlier run) with
+    SSTableDict(path).  put() and pop() are unsupported.
+    """
+
+    file_suffix = ".sst"
+
+    def __init__(self, db_path: str, codec: Optional[ValueCodec] = None):
+        """
+        :param db_path: path to a file previously written by SSTableDict.build()
+        :param codec: codec used to deserialize values; PickleCodec if None.  Must match the codec used to build it
+        """
+        self._db_path = db_path
+        self._codec = codec or PickleCodec()
+
+        with open(db_path, "rb") as infile:
+            self._mmap = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, sentinel, self._count, data_length, index_count = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or sentinel != _BYTE_ORDER_SENTINEL:
+            self._mmap.close()
+            raise ValueError(f'File "{db_path}" is not an SSTableDict written on a platform with the same byte order')
+
+        self._data_start = _HEADER.size
+        self._data_end = self._data_start + data_length
+        index_end = self._data_end + 8 * index_count
+        self._index_offsets = memoryview(self._mmap)[self._data_end : index_end].cast("Q")
+        self._index_keys: List[bytes] = [self._read_record(offset)[0] for offset in self._index_offsets]
+
+    @classmethod
+    def build(
+        cls,
+        db_path: str,
+        kv_pairs: Iterable[Tuple[str, Any]],
+        codec: Optional[ValueCodec] = None,
+        index_interval: int = 64,
+        presorted: bool = False,
+        max_items_in_memory: int = 1000000,
+    ) -> SSTableDict:
+        """
+        Write the given pairs to a new table at db_path (replacing any existing file) and open it.  Where a key is
+        repeated, the last value wins.
+
+        :param db_path: path of the table file to write
+        :param kv_pairs: (key, value) pairs, in any order
+        :param codec: codec used to serialize values; PickleCodec if None
+        :param index_interval: number of records per sparse index entry.  Larger values reduce memory, at the cost of
+          longer scans per lookup
+        :param presorted: if True, kv_pairs must already be in strictly-ascending utf-8 key order, and are streamed to
+          disk without sorting
+        :param max_items_in_memory: if not presorted, the maximum pairs held in memory while sorting, beyond which they
+          are sorted in runs beside db_path with utils.externalsort
+        """
+        if index_interval < 1:
+            raise ValueError(f"index_interval must be positive (got {index_interval})")
+
+        codec = codec or PickleCodec()
+        encoded: Iterable[Tuple[bytes, bytes]]
+        if presorted:
+            encoded = ((key.encode(), codec.encode(value)) for key, value in kv_pairs)
+        else:
+            encoded = _external_sort_pairs(
+                ((key, codec.encode(value)) for key, value in kv_pairs),
+                max_items_in_memory,
+                tmp_dir=os.path.dirname(os.path.abspath(db_path)),
+            )
+
+        # write to a temporary path and rename, so that a failed build never leaves a partial table at db_path
+        tmp_path = f"{db_path}.tmp"
+        index_offsets = array("Q")
+        count = 0
+        offset = _HEADER.size
+        previous_key: Optional[bytes] = None
+        try:
+            with open(tmp_path, "wb") as outfile:
+                outfile.write(bytes(_HEADER.size))
+                for key, blob in encoded:
+                    if previous_key is not None and key <= previous_key:
+                        raise ValueError(f'Presorted keys are not in strictly-ascending order at key "{key.decode()}"')
+                    previous_key = key
+
+                    if count % index_interval == 0:
+                        index_offsets.append(offset)
+
+                    record = bytearray()
+                    _write_varint(record, len(key))
+                    record += key
+                    _write_varint(record, len(blob))
+                    record += blob
+                    outfile.write(record)
+                    offset += len(record)
+                    count += 1
+
+                outfile.write(index_offsets.tobytes())
+                outfile.seek(0)
+                outfile.write(
+                    _HEADER.pack(_MAGIC, _BYTE_ORDER_SENTINEL, count, offset - _HEADER.size, len(index_offsets))
+                )
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        os.replace(tmp_path, db_path)
+        return cls(db_path, codec=codec)
+
+    def _read_record(self, offset: int) -> Tuple[bytes, int, int]:
+        """
+        Return the key of the record at offset, and the start and end offsets of its value.  The end offset of the value
+        is the offset of the following record.
+        """
+        key_length, offset = _read_varint(self._mmap, offset)
+        key = self._mmap[offset : offset + key_length]
+        value_length, value_start = _read_varint(self._mmap, offset + key_length)
+        return key, value_start, value_start + value_length
+
+    def _decode(self, value_start: int, value_end: int) -> Any:
+        with memoryview(self._mmap)[value_start:value_end] as blob:
+            return self._codec.decode(blob)
+
+    def _find(self, key: str) -> Optional[Tuple[int, int]]:
+        """Return the start and end offsets of the value of key, or None if key is absent"""
+        key_bytes = key.encode()
+        block = bisect_right(self._index_keys, key_bytes) - 1
+        if block < 0:
+            return None
+
+        offset = self._index_offsets[block]
+        block_end = self._index_offsets[block + 1] if block + 1 < len(self._index_offsets) else self._data_end
+        while offset < block_end:
+            record_key, value_start, value_end = self._read_record(offset)
+            offset = value_end
+            if record_key == key_bytes:
+                return value_start, value_end
+            if record_key > key_bytes:
+                return None
+        return None
+
+    def _iter_records(self) -> Iterator[Tuple[bytes, int, int]]:
+        offset = self._data_start
+        while offset < self._data_end:
+            key, value_start, value_end = self._read_record(offset)
+            yield key, value_start, value_end
+            offset = value_end
+
+    def put(self, key: str, value: Any) -> None:
+        raise TypeError("SSTableDict is immutable - use SSTableDict.build() to write a new table")
+
+    def pop(self, key: str) -> Optional[Any]:
+        raise TypeError("SSTableDict is immutable - use SSTableDict.build() to write a new table")
+
+    def get(self, key: str) -> Optional[Any]:
+        location = self._find(key)
+        return None if location is None else self._decode(*location)
+
+    def has(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (key.decode() for key, _, _ in self._iter_records())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def values(self) -> Iterator[Any]:
+        return (self._decode(value_start, value_end) for _, value_start, value_end in self._iter_records())
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        return ((key.decode(), self._decode(start, end)) for key, start, end in self._iter_records())
+
+    def close(self) -> None:
+        """Release the underlying memory-map.  The table must not be used after closing."""
+        if self._mmap.closed:
+            return
+        self._index_offsets.release()
+        self._mmap.close()
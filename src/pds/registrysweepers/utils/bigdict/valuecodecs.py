@@ -0,0 +1,227 @@
+"""
+Codecs for serializing the values of disk-backed BigDicts.
+
+PickleCodec is the default, and handles any picklable value.  MarshalCodec is faster and more compact for values built
+from builtin types only (e.g. sets of str, small dicts).  MsgpackCodec requires the optional msgpack package.
+LidVidSetCodec front-codes sets of identifier strings, which share long prefixes, falling back to another codec for
+other values.  InterningCodec stores each of a small set of repeated values (e.g. node names) as an integer code.  Any
+codec may be wrapped in ZlibCodec or ZstdCodec (which requires the optional zstandard package).
+"""
+import marshal
+import pickle
+import zlib
+from abc import ABC
+from abc import abstractmethod
+from mmap import mmap
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+Blob = Union[bytes, memoryview]
+
+
+class ValueCodec(ABC):
+    @abstractmethod
+    def encode(self, value: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, blob: Blob) -> Any:
+        pass
+
+
+class PickleCodec(ValueCodec):
+    def encode(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, blob: Blob) -> Any:
+        return pickle.loads(blob)
+
+
+class MarshalCodec(ValueCodec):
+    """Supports values composed only of builtin types.  Encodings are specific to the python version."""
+
+    def encode(self, value: Any) -> bytes:
+        return marshal.dumps(value)
+
+    def decode(self, blob: Blob) -> Any:
+        return marshal.loads(blob)
+
+
+class MsgpackCodec(ValueCodec):
+    """MessagePack codec, extended to round-trip sets and frozensets.  Tuples are decoded as lists."""
+
+    _SET_EXT_CODE = 1
+    _FROZENSET_EXT_CODE = 2
+
+    def __init__(self):
+        try:
+            import msgpack  # type: ignore
+        except ImportError as err:
+            raise ImportError(
+                'MsgpackCodec requires the optional "msgpack" package - install with "pip install msgpack"'
+            ) from err
+        self._msgpack = msgpack
+
+    def _default(self, value: Any) -> Any:
+        if isinstance(value, frozenset):
+            return self._msgpack.ExtType(self._FROZENSET_EXT_CODE, self.encode(list(value)))
+        if isinstance(value, set):
+            return self._msgpack.ExtType(self._SET_EXT_CODE, self.encode(list(value)))
+        raise TypeError(f"MsgpackCodec cannot encode value of type {type(value)}")
+
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code == self._SET_EXT_CODE:
+            return set(self.decode(data))
+        if code == self._FROZENSET_EXT_CODE:
+            return frozenset(self.decode(data))
+        return self._msgpack.ExtType(code, data)
+
+    def encode(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def decode(self, blob: Blob) -> Any:
+        return self._msgpack.unpackb(blob, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(blob: Union[Blob, mmap], offset: int) -> Tuple[int, int]:
+    """Return the varint at offset, and the offset following it"""
+    value = 0
+    shift = 0
+    while True:
+        byte = blob[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class LidVidSetCodec(ValueCodec):
+    """
+    Encodes sets/frozensets of str (e.g. the LIDVIDs referenced by an ancestry record) by sorting them and storing each
+    as the length of the prefix it shares with its predecessor plus the remaining suffix.  As LIDVIDs within a set
+    typically share everything up to the product name, this stores each prefix once.  Other values are delegated to
+    the fallback codec.
+    """
+
+    _FALLBACK_TAG = 0
+    _SET_TAG = 1
+    _FROZENSET_TAG = 2
+
+    def __init__(self, fallback: Optional[ValueCodec] = None):
+        self._fallback = fallback or PickleCodec()
+
+    def encode(self, value: Any) -> bytes:
+        if not isinstance(value, (set, frozenset)) or not all(isinstance(element, str) for element in value):
+            return bytes([self._FALLBACK_TAG]) + self._fallback.encode(value)
+
+        buffer = bytearray([self._FROZENSET_TAG if isinstance(value, frozenset) else self._SET_TAG])
+        _write_varint(buffer, len(value))
+        previous = b""
+        for element in sorted(value):
+            encoded = element.encode()
+            shared_length = 0
+            max_shared_length = min(len(previous), len(encoded))
+            while shared_length < max_shared_length and previous[shared_length] == encoded[shared_length]:
+                shared_length += 1
+
+            _write_varint(buffer, shared_length)
+            _write_varint(buffer, len(encoded) - shared_length)
+            buffer += encoded[shared_length:]
+            previous = encoded
+
+        return bytes(buffer)
+
+    def decode(self, blob: Blob) -> Any:
+        blob = bytes(blob)
+        tag = blob[0]
+        if tag == self._FALLBACK_TAG:
+            return self._fallback.decode(blob[1:])
+
+        count, offset = _read_varint(blob, 1)
+        elements = []
+        previous = b""
+        for _ in range(count):
+            shared_length, offset = _read_varint(blob, offset)
+            suffix_length, offset = _read_varint(blob, offset)
+            encoded = previous[:shared_length] + blob[offset : offset + suffix_length]
+            offset += suffix_length
+            elements.append(encoded.decode())
+            previous = encoded
+
+        return frozenset(elements) if tag == self._FROZENSET_TAG else set(elements)
+
+
+class InterningCodec(ValueCodec):
+    """
+    Encodes each distinct hashable value as a varint code, assigned in order of first encoding, and holds the table of
+    distinct values in memory.  Suited to values drawn from a small vocabulary, e.g. node names, for which each entry
+    then costs a single byte.  As the table is not persisted, a BigDict written with an InterningCodec may only be read
+    with the same instance.
+    """
+
+    def __init__(self):
+        self._values: List[Hashable] = []
+        self._codes: Dict[Hashable, int] = {}
+
+    def encode(self, value: Any) -> bytes:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._values.append(value)
+            self._codes[value] = code
+
+        buffer = bytearray()
+        _write_varint(buffer, code)
+        return bytes(buffer)
+
+    def decode(self, blob: Blob) -> Any:
+        code, _ = _read_varint(blob, 0)
+        return self._values[code]
+
+
+class ZlibCodec(ValueCodec):
+    """Compresses the output of another codec with zlib"""
+
+    def __init__(self, inner: Optional[ValueCodec] = None, level: int = 6):
+        self._inner = inner or PickleCodec()
+        self._level = level
+
+    def encode(self, value: Any) -> bytes:
+        return zlib.compress(self._inner.encode(value), self._level)
+
+    def decode(self, blob: Blob) -> Any:
+        return self._inner.decode(zlib.decompress(blob))
+
+
+class ZstdCodec(ValueCodec):
+    """Compresses the output of another codec with zstd"""
+
+    def __init__(self, inner: Optional[ValueCodec] = None, level: int = 3):
+        try:
+            import zstandard  # type: ignore
+        except ImportError as err:
+            raise ImportError(
+                'ZstdCodec requires the optional "zstandard" package - install with "pip install zstandard"'
+            ) from err
+        self._inner = inner or PickleCodec()
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, value: Any) -> bytes:
+        return self._compressor.compress(self._inner.encode(value))
+
+    def decode(self, blob: Blob) -> Any:
+        return self._inner.decode(self._decompressor.decompress(blob))
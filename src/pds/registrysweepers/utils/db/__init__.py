@@ -6,20 +6,22 @@ from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Mapping
 from typing import Optional
 from typing import Union
 
 from opensearchpy import OpenSearch
+from opensearchpy import TransportError
 from pds.registrysweepers.ancestry.constants import ANCESTRY_REFS_METADATA_KEY
+from pds.registrysweepers.utils.db.bulk import bulk_request
 from pds.registrysweepers.utils.db.update import Update
 from pds.registrysweepers.utils.misc import get_ids_list_str
 from pds.registrysweepers.utils.misc import get_random_hex_id
 from pds.registrysweepers.utils.misc import limit_log_length
 from retry import retry
 from retry.api import retry_call
-from tqdm import tqdm
 
 log = logging.getLogger(__name__)
 
@@ -169,6 +171,8 @@ def query_registry_db_with_search_after(
         limit_log_length(f"Query {query_id} returns {total_hits} total hits{limit_log_msg_part}: {json.dumps(query)}")
     )
 
+    from tqdm import tqdm  # imported on use, to keep startup fast
+
     # disable=None enables auto-detection: progress bar is shown in interactive terminals (TTY)
     # and suppressed automatically in non-interactive environments (production containers, CI pipelines).
     with tqdm(total=expected_hits, desc=f"Query {query_id}", disable=None) as pbar:
@@ -263,6 +267,84 @@ def query_registry_db_with_search_after(
     log.debug(limit_log_length(f"Query {query_id} complete!"))
 
 
+def query_registry_db_for_ids(
+    client: OpenSearch,
+    index_name: str,
+    query: Dict,
+    docvalue_fields: Optional[List[str]] = None,
+    page_size: int = 10000,
+    fallback_sort_field: str = "lidvid",
+    pit_keep_alive: str = "5m",
+    request_timeout_seconds: int = 20,
+) -> Iterator[Dict]:
+    """
+    Given an OpenSearch client and query, return an iterable collection of hits stripped of their _source, i.e. each
+    carrying only its _id and the values of the requested docvalue_fields (in hit["fields"]).  This avoids fetching and
+    parsing _source when only ids and a few keyword values are required.
+
+    Pages are read from a point-in-time, sorted by _shard_doc, which is the cheapest stable sort available.  Where PIT
+    is not supported (e.g. AOSS, or cross-cluster aliases), hits are instead paged with search_after on
+    fallback_sort_field, which must be unique per document.
+
+    Example query: {"query": {"term": {"pds:Identification_Area.pds:product_class": "Product_Bundle"}}}
+    """
+    query_id = get_random_hex_id()  # This is just used to differentiate queries during logging
+    body: Dict[str, Any] = {**query, "_source": False, "docvalue_fields": docvalue_fields or [], "size": page_size}
+
+    try:
+        pit_id = client.create_pit(index=index_name, keep_alive=pit_keep_alive)["pit_id"]
+    except TransportError as err:
+        log.info(
+            limit_log_length(
+                f"Query {query_id} could not create point-in-time on {index_name} ({err}) - "
+                f"paging by {fallback_sort_field} instead"
+            )
+        )
+        pit_id = None
+
+    if pit_id is not None:
+        body["pit"] = {"id": pit_id, "keep_alive": pit_keep_alive}
+        body["sort"] = [{"_shard_doc": "asc"}]
+        search_kwargs: Dict[str, Any] = {}
+    else:
+        body["sort"] = [{fallback_sort_field: "asc"}]
+        search_kwargs = {"index": index_name}
+
+    log.debug(limit_log_length(f"Query {query_id} fetching ids: {json.dumps(body)}"))
+    served_hits = 0
+    try:
+        while True:
+            results = retry_call(
+                client.search,
+                fkwargs={"body": body, "request_timeout": request_timeout_seconds, **search_kwargs},
+                tries=6,
+                delay=2,
+                backoff=2,
+                logger=log,
+            )
+            response_hits = results["hits"]["hits"]
+            for hit in response_hits:
+                yield hit
+            served_hits += len(response_hits)
+
+            if pit_id is not None:
+                # the PIT id may change between requests
+                pit_id = results.get("pit_id", pit_id)
+                body["pit"] = {"id": pit_id, "keep_alive": pit_keep_alive}
+
+            if len(response_hits) < page_size:
+                break
+            body["search_after"] = response_hits[-1]["sort"]
+    finally:
+        if pit_id is not None:
+            try:
+                client.delete_pit(body={"pit_id": [pit_id]})
+            except TransportError as err:
+                log.warning(limit_log_length(f"Query {query_id} failed to delete point-in-time: {err}"))
+
+    log.debug(limit_log_length(f"Query {query_id} complete! ({served_hits} hits)"))
+
+
 def query_registry_db_or_mock(
     mock_f: Optional[Callable[[str], Iterable[Dict]]],
     mock_query_id: str,
@@ -356,6 +438,12 @@ def write_updated_docs(
     )
 
 
+# Sweepers may run concurrently, partially updating different fields of the same documents, so an unversioned update
+# which loses a race on the document version is re-applied server-side rather than failing.  Versioned updates are
+# compare-and-write operations, which must fail on conflict and so cannot be retried.
+UPDATE_RETRY_ON_CONFLICT = 5
+
+
 def update_as_statements(update: Update, as_upsert: bool = False) -> Iterable[str]:
     """
     Given an Update, convert it to an ElasticSearch-style set of request body content strings
@@ -365,6 +453,8 @@ def update_as_statements(update: Update, as_upsert: bool = False) -> Iterable[st
     if update.has_versioning_information():
         metadata_statement["if_primary_term"] = update.primary_term
         metadata_statement["if_seq_no"] = update.seq_no
+    else:
+        metadata_statement["update"]["retry_on_conflict"] = UPDATE_RETRY_ON_CONFLICT
 
     # Presumably, upsert is incompatible with inline scripts - edunn 20251111
     conflict = update.inline_script_content is not None and as_upsert
@@ -400,7 +490,7 @@ def _write_bulk_updates_chunk(client: OpenSearch, index_name: str, bulk_updates:
     bulk_data = "\n".join(bulk_updates) + "\n"
 
     request_timeout = 180
-    response_content = client.bulk(index=index_name, body=bulk_data, request_timeout=request_timeout)
+    response_content = bulk_request(client, bulk_data, index=index_name, request_timeout=request_timeout)
 
     if response_content.get("errors"):
         warn_types = {
@@ -0,0 +1,187 @@
+"""
+Concurrency-limited bulk writes to OpenSearch.
+
+All bulk requests issued by sweepers acquire a single process-wide semaphore, so that however many writers run at
+once, the number of in-flight bulk requests (and therefore the write load on the cluster) stays bounded.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Set
+from typing import Tuple
+
+from opensearchpy import ConnectionError
+from opensearchpy import OpenSearch
+from opensearchpy import TransportError
+from opensearchpy.helpers import expand_action
+from pds.registrysweepers.utils.misc import limit_log_length
+
+log = logging.getLogger(__name__)
+
+# Optional environment variable overriding the maximum number of concurrent bulk requests per process
+BULK_WRITE_MAX_CONCURRENCY = "BULK_WRITE_MAX_CONCURRENCY"
+DEFAULT_BULK_WRITE_MAX_CONCURRENCY = 4
+
+# response statuses for which a whole bulk request, or an individual item of one, is resubmitted
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+@functools.cache
+def get_bulk_write_semaphore() -> threading.BoundedSemaphore:
+    """Return the semaphore which must be held while issuing a bulk request"""
+    max_concurrency = int(os.environ.get(BULK_WRITE_MAX_CONCURRENCY, DEFAULT_BULK_WRITE_MAX_CONCURRENCY))
+    log.debug(f"Limiting concurrent bulk writes to {max_concurrency}")
+    return threading.BoundedSemaphore(max_concurrency)
+
+
+def bulk_request(client: OpenSearch, body: str, **kwargs: Any) -> Dict[str, Any]:
+    """Issue a bulk request once a slot is available, and return its response"""
+    with get_bulk_write_semaphore():
+        return client.bulk(body=body, **kwargs)
+
+
+BulkChunk = List[Tuple[Dict[str, Any], str]]
+
+
+def _chunk_actions(
+    client: OpenSearch, actions: Iterable[Dict[str, Any]], max_chunk_bytes: int, max_chunk_actions: int
+) -> Iterator[BulkChunk]:
+    """Yield chunks of (action metadata, serialized bulk lines) pairs, bounded in total bytes and action count"""
+    serializer = client.transport.serializer
+    chunk: BulkChunk = []
+    chunk_bytes = 0
+    for action in actions:
+        metadata, source = expand_action(action)
+        lines = serializer.dumps(metadata) + "\n"
+        if source is not None:
+            lines += serializer.dumps(source) + "\n"
+        action_bytes = len(lines.encode("utf-8"))
+
+        if chunk and (chunk_bytes + action_bytes > max_chunk_bytes or len(chunk) >= max_chunk_actions):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+
+        chunk.append((metadata, lines))
+        chunk_bytes += action_bytes
+
+    if chunk:
+        yield chunk
+
+
+def _write_chunk(
+    client: OpenSearch,
+    chunk: BulkChunk,
+    max_retries: int,
+    initial_backoff_seconds: float,
+    request_timeout_seconds: int,
+) -> List[Tuple[bool, Dict[str, Any]]]:
+    """
+    Write a chunk, resubmitting the request or its items while they fail with a retryable status, and return the
+    (success, response item) result of each action.
+    """
+    results: List[Tuple[bool, Dict[str, Any]]] = []
+    pending = chunk
+    for attempt in range(max_retries + 1):
+        if attempt > 0:
+            time.sleep(initial_backoff_seconds * 2 ** (attempt - 1))
+
+        is_final_attempt = attempt == max_retries
+        body = "".join(lines for _, lines in pending)
+        try:
+            response = bulk_request(client, body, request_timeout=request_timeout_seconds)
+        except TransportError as err:
+            is_retryable = isinstance(err, ConnectionError) or err.status_code in RETRYABLE_STATUSES
+            if is_final_attempt or not is_retryable:
+                log.error(limit_log_length(f"Bulk request of {len(pending)} actions failed: {err}"))
+                for metadata, _ in pending:
+                    op_type, item = next(iter(metadata.items()))
+                    results.append((False, {op_type: {**item, "status": err.status_code, "error": str(err)}}))
+                return results
+            log.warning(limit_log_length(f"Bulk request of {len(pending)} actions failed, and will be retried: {err}"))
+            continue
+
+        retryable: BulkChunk = []
+        for (metadata, lines), response_item in zip(pending, response["items"]):
+            op_type, item = next(iter(response_item.items()))
+            ok = 200 <= item.get("status", 500) < 300
+            if not ok and not is_final_attempt and item.get("status") in RETRYABLE_STATUSES:
+                retryable.append((metadata, lines))
+            else:
+                results.append((ok, {op_type: item}))
+
+        if not retryable:
+            return results
+        log.warning(f"{len(retryable)} of {len(pending)} bulk actions were throttled, and will be retried")
+        pending = retryable
+
+    return results
+
+
+def write_bulk_concurrently(
+    client: OpenSearch,
+    actions: Iterable[Dict[str, Any]],
+    thread_count: int = 4,
+    max_chunk_bytes: int = 10 * 1024**2,
+    max_chunk_actions: int = 10000,
+    max_retries: int = 5,
+    initial_backoff_seconds: float = 2,
+    request_timeout_seconds: int = 120,
+) -> Iterator[Tuple[bool, Dict[str, Any]]]:
+    """
+    Write actions (in the format accepted by opensearchpy.helpers.streaming_bulk) with up to thread_count concurrent
+    bulk requests, yielding the (success, response item) result of each action as its chunk completes.
+
+    Actions are chunked by serialized size rather than count.  Failed items do not interrupt writing - they are yielded
+    for the caller to handle, after any retryable statuses (e.g. HTTP429 throttling) have been retried with exponential
+    backoff.  Results are yielded in order of chunk completion, not action order.  If the caller stops consuming
+    results, chunks which have not yet been submitted are abandoned.
+
+    Bulk requests also acquire the process-wide bulk write semaphore (see get_bulk_write_semaphore()), so thread_count
+    beyond BULK_WRITE_MAX_CONCURRENCY only serves to overlap chunk serialization with writing.
+
+    :param client: OpenSearch client
+    :param actions: bulk actions, e.g. {"_index": ..., "_id": ..., "_source": {...}}
+    :param thread_count: maximum number of chunks written concurrently
+    :param max_chunk_bytes: maximum serialized size of a chunk.  A single action larger than this forms its own chunk
+    :param max_chunk_actions: maximum number of actions in a chunk
+    :param max_retries: maximum number of times a request or item is resubmitted
+    :param initial_backoff_seconds: delay before the first resubmission, doubling with each subsequent attempt
+    :param request_timeout_seconds: timeout of each bulk request
+    """
+    if thread_count < 1:
+        raise ValueError(f"thread_count must be positive (got {thread_count})")
+
+    executor = ThreadPoolExecutor(max_workers=thread_count, thread_name_prefix="BulkWriter")
+    in_flight: Set[Future] = set()
+
+    def drain(max_in_flight: int) -> Iterator[Tuple[bool, Dict[str, Any]]]:
+        nonlocal in_flight
+        while len(in_flight) > max_in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+    try:
+        for chunk in _chunk_actions(client, actions, max_chunk_bytes, max_chunk_actions):
+            # queue at most one further chunk per writer, to bound memory
+            yield from drain(2 * thread_count - 1)
+            in_flight.add(
+                executor.submit(
+                    _write_chunk, client, chunk, max_retries, initial_backoff_seconds, request_timeout_seconds
+                )
+            )
+        yield from drain(0)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -1,15 +1,18 @@
 import json
 import logging
 import os
+from typing import TYPE_CHECKING
 from typing import Union
 
-import boto3  # type: ignore
 import requests
-from botocore.credentials import Credentials
 from opensearchpy import OpenSearch
 from opensearchpy import RequestsAWSV4SignerAuth
 from opensearchpy import RequestsHttpConnection
-from requests_aws4auth import AWS4Auth  # type: ignore
+
+# The AWS SDK is slow to import, and only required to connect to AOSS, so is imported on use
+if TYPE_CHECKING:
+    from botocore.credentials import Credentials
+    from requests_aws4auth import AWS4Auth  # type: ignore
 
 
 def get_opensearch_client_from_environment(verify_certs: bool = True) -> OpenSearch:
@@ -56,7 +59,9 @@ def get_userpass_opensearch_client(
     )
 
 
-def get_aws_credentials_from_ec2_metadata_service(iam_role_name: str) -> Credentials:
+def get_aws_credentials_from_ec2_metadata_service(iam_role_name: str) -> "Credentials":
+    from botocore.credentials import Credentials
+
     url = f"http://169.254.169.254/latest/meta-data/iam/security-credentials/{iam_role_name}"
     response = requests.get(url)
     if response.status_code != 200:
@@ -72,6 +77,8 @@ def get_aws_credentials_from_ec2_metadata_service(iam_role_name: str) -> Credent
 
 
 def log_assumed_identity() -> None:
+    import boto3  # type: ignore
+
     sts_client = boto3.client("sts")
 
     response = sts_client.get_caller_identity()
@@ -89,6 +96,8 @@ def log_assumed_identity() -> None:
 
 def get_aws_aoss_client_from_ssm(endpoint_url: str) -> OpenSearch:
     # https://opensearch.org/blog/aws-sigv4-support-for-clients/
+    import boto3  # type: ignore
+
     log_assumed_identity()
 
     credentials = boto3.Session().get_credentials()
@@ -96,7 +105,7 @@ def get_aws_aoss_client_from_ssm(endpoint_url: str) -> OpenSearch:
     return get_aws_opensearch_client(endpoint_url, auth)
 
 
-def get_aws_opensearch_client(endpoint_url: str, auth: AWS4Auth) -> OpenSearch:
+def get_aws_opensearch_client(endpoint_url: str, auth: "AWS4Auth") -> OpenSearch:
     try:
         scheme, host = endpoint_url.replace("://", ":", 1).split(":")
     except ValueError:
@@ -1,13 +1,42 @@
 import logging
 import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from typing import Optional
 from typing import Union
 
 from opensearchpy import OpenSearch
 
+# Environment variable specifying the node id of the tenant to sweep, if running in a multitenant environment
+MULTITENANCY_NODE_ID = "MULTITENANCY_NODE_ID"
+
+# The node id of the tenant in scope, which takes precedence over MULTITENANCY_NODE_ID.  Being a context variable, this
+# allows several tenants to be swept concurrently by one process, each in its own thread (or context)
+_tenant_node_id: ContextVar[Optional[str]] = ContextVar("tenant_node_id", default=None)
+
+
+@contextmanager
+def tenant_scope(node_id: str) -> Iterator[None]:
+    """Resolve index names for the given tenant within this context, rather than that of MULTITENANCY_NODE_ID"""
+    token = _tenant_node_id.set(node_id)
+    try:
+        yield
+    finally:
+        _tenant_node_id.reset(token)
+
+
+def get_multitenancy_node_id() -> str:
+    """Return the node id of the tenant in scope, or that of MULTITENANCY_NODE_ID if none, or "" if not multitenant"""
+    node_id = _tenant_node_id.get()
+    if node_id is None:
+        node_id = os.environ.get(MULTITENANCY_NODE_ID, "")
+    return node_id.strip(" ")
+
 
 def resolve_multitenant_index_name(client: Union[OpenSearch, None], index_type: str) -> str:
     supported_index_types = {"registry", "registry-refs", "registry-dd"}
-    node_id = os.environ.get("MULTITENANCY_NODE_ID", "").strip(" ")
+    node_id = get_multitenancy_node_id()
 
     if client is None:
         return index_type
@@ -0,0 +1,162 @@
+"""
+External-memory sort and merge-join of identifier streams.
+
+Identifiers are streamed into sorted runs of bounded size, spilled to temporary files, and k-way merged, so streams of
+any length (e.g. every _id of an index) may be sorted, diffed or joined in O(n log n) time with a fixed memory budget.
+"""
+import heapq
+import logging
+import os
+import tempfile
+from contextlib import ExitStack
+from enum import auto
+from enum import Enum
+from itertools import count
+from typing import IO
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from more_itertools import batched
+from pds.registrysweepers.utils.misc import iterate_pages_of_size
+
+log = logging.getLogger(__name__)
+
+
+class JoinSide(Enum):
+    LEFT_ONLY = auto()
+    RIGHT_ONLY = auto()
+    BOTH = auto()
+
+
+def _open_run(path: str, mode: str = "r") -> IO[str]:
+    # newline translation is disabled so that only "\n" ends an identifier, and any "\r" within one is preserved
+    return open(path, mode, newline="\n", encoding="utf-8")
+
+
+def _read_run(run_file: IO[str]) -> Iterator[str]:
+    return (line.rstrip("\n") for line in run_file)
+
+
+def _dedupe_sorted(ids: Iterable[str]) -> Iterator[str]:
+    previous: Optional[str] = None
+    for id in ids:
+        if id != previous:
+            yield id
+            previous = id
+
+
+def external_sort(
+    ids: Iterable[str],
+    max_items_in_memory: int = 1000000,
+    unique: bool = True,
+    tmp_dir: Optional[str] = None,
+    max_merge_fan_in: int = 64,
+) -> Iterator[str]:
+    """
+    Lazily yield the given identifiers in ascending order, holding at most max_items_in_memory of them in memory.
+
+    Identifiers are sorted in pages of max_items_in_memory, which are written to temporary run files unless the input
+    fits in a single page, and then merged.  Where more than max_merge_fan_in runs exist, they are first merged in
+    groups, to bound the number of simultaneously-open files.  Temporary files are removed once iteration completes or
+    the returned iterator is closed.
+
+    :param ids: identifiers to sort.  Must not contain newlines
+    :param max_items_in_memory: maximum identifiers held in memory at once, i.e. the size of each sorted run
+    :param unique: if True, yield each distinct identifier only once
+    :param tmp_dir: directory in which to create run files, or None for the system default
+    :param max_merge_fan_in: maximum number of runs merged at once
+    """
+    if max_merge_fan_in < 2:
+        raise ValueError(f"max_merge_fan_in must be at least 2 (got {max_merge_fan_in})")
+
+    with tempfile.TemporaryDirectory(prefix="externalsort-", dir=tmp_dir) as runs_dir:
+        run_ids = count()
+
+        def write_run(sorted_ids: Iterable[str]) -> str:
+            run_path = os.path.join(runs_dir, f"{next(run_ids)}.run")
+            with _open_run(run_path, "w") as run_file:
+                for id in sorted_ids:
+                    if "\n" in id:
+                        raise ValueError(f"Identifiers may not contain newlines (got {id!r})")
+                    run_file.write(id)
+                    run_file.write("\n")
+            return run_path
+
+        run_paths: List[str] = []
+        for page in iterate_pages_of_size(max_items_in_memory, ids):
+            is_final_page = len(page) < max_items_in_memory
+            sorted_page = sorted(set(page)) if unique else sorted(page)
+            del page
+            if not run_paths and is_final_page:
+                # the whole input fits in memory, so no disk is required
+                yield from sorted_page
+                return
+            run_paths.append(write_run(sorted_page))
+            del sorted_page
+
+        log.info(f"Sorted input into {len(run_paths)} runs of up to {max_items_in_memory} identifiers")
+        while len(run_paths) > max_merge_fan_in:
+            merged_run_paths = []
+            for group in batched(run_paths, max_merge_fan_in):
+                with ExitStack() as stack:
+                    runs = [_read_run(stack.enter_context(_open_run(path))) for path in group]
+                    merged_run_paths.append(write_run(heapq.merge(*runs)))
+                for path in group:
+                    os.remove(path)
+            run_paths = merged_run_paths
+
+        with ExitStack() as stack:
+            runs = [_read_run(stack.enter_context(_open_run(path))) for path in run_paths]
+            merged = heapq.merge(*runs)
+            yield from _dedupe_sorted(merged) if unique else merged
+
+
+def merge_join_sorted(left: Iterable[str], right: Iterable[str]) -> Iterator[Tuple[JoinSide, str]]:
+    """
+    Given two streams of unique identifiers in ascending order, yield each identifier present in either stream in
+    ascending order, tagged with the side(s) on which it is present.  Raises ValueError if either stream is unordered.
+    """
+    left_itr = iter(left)
+    right_itr = iter(right)
+
+    def next_id(itr: Iterator[str], previous: Optional[str], side: str) -> Optional[str]:
+        id = next(itr, None)
+        if id is not None and previous is not None and id <= previous:
+            raise ValueError(f'{side} stream is not in strictly-ascending order at "{id}" (preceded by "{previous}")')
+        return id
+
+    left_id = next_id(left_itr, None, "Left")
+    right_id = next_id(right_itr, None, "Right")
+    while left_id is not None or right_id is not None:
+        if right_id is None or (left_id is not None and left_id < right_id):
+            yield JoinSide.LEFT_ONLY, left_id  # type: ignore[misc]
+            left_id = next_id(left_itr, left_id, "Left")
+        elif left_id is None or right_id < left_id:
+            yield JoinSide.RIGHT_ONLY, right_id
+            right_id = next_id(right_itr, right_id, "Right")
+        else:
+            yield JoinSide.BOTH, left_id
+            left_id = next_id(left_itr, left_id, "Left")
+            right_id = next_id(right_itr, right_id, "Right")
+
+
+def external_join(
+    left: Iterable[str],
+    right: Iterable[str],
+    max_items_in_memory: int = 1000000,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[Tuple[JoinSide, str]]:
+    """
+    Full outer join of two streams of identifiers in any order, with bounded memory.  Each distinct identifier is
+    yielded once, in ascending order, tagged with the side(s) on which it is present.  Filter the output by JoinSide to
+    obtain a diff (LEFT_ONLY/RIGHT_ONLY) or inner join (BOTH).
+
+    As each stream is sorted before the first result is yielded, memory use is bounded by 2 * max_items_in_memory.
+    """
+    return merge_join_sorted(
+        external_sort(left, max_items_in_memory=max_items_in_memory, tmp_dir=tmp_dir),
+        external_sort(right, max_items_in_memory=max_items_in_memory, tmp_dir=tmp_dir),
+    )
@@ -5,6 +5,8 @@ import functools
 
 @functools.total_ordering
 class MajorMinorVersion:
+    __slots__ = ("major_version", "minor_version")
+
     major_version_minimum = 0
     minor_version_minimum = 0
 
@@ -31,7 +33,7 @@ class MajorMinorVersion:
         return f"{self.major_version}.{self.minor_version}"
 
     def __hash__(self):
-        return hash(str(self))
+        return hash((self.major_version, self.minor_version))
 
     def __repr__(self):
         return f"{self.__class__.__name__}({str(self)})"
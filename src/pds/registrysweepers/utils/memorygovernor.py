@@ -0,0 +1,101 @@
+import logging
+import math
+import time
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+_CGROUP_MEMORY_LIMIT_PATHS = [
+    "/sys/fs/cgroup/memory.max",  # cgroup v2
+    "/sys/fs/cgroup/memory/memory.limit_in_bytes",  # cgroup v1
+]
+
+
+def get_memory_limit_bytes() -> int:
+    """
+    Return the memory available to this process - the lesser of the container (cgroup) memory limit, if any, and the
+    total physical memory of the host.  Under ECS/Fargate, the cgroup limit reflects the task size.
+    """
+    import psutil  # type: ignore  # imported on use, as it is slow to import and unneeded by most sweepers
+
+    limit = psutil.virtual_memory().total
+    for path in _CGROUP_MEMORY_LIMIT_PATHS:
+        try:
+            with open(path) as limit_file:
+                value = limit_file.read().strip()
+        except OSError:
+            continue
+
+        # cgroup v2 reports "max" when unlimited, and cgroup v1 reports a huge page-aligned sentinel value
+        if value.isdigit():
+            limit = min(limit, int(value))
+
+    return limit
+
+
+class MemoryGovernor:
+    """
+    Tracks this process' resident memory as a percentage of the memory available to it, so that memory-hungry
+    structures can be sized against a proportion of the container rather than fixed item counts, and behave the same on
+    small and large task sizes.
+
+    RSS is sampled at most once per sample_interval_seconds, and the previous sample is reused in between, so it is
+    cheap to consult on every operation.
+    """
+
+    def __init__(
+        self,
+        target_percent: float,
+        sample_interval_seconds: float = 1.0,
+        memory_limit_bytes: Optional[int] = None,
+    ):
+        """
+        :param target_percent: the proportion of available memory (0-100) above which the process is under pressure
+        :param sample_interval_seconds: the minimum interval between RSS samples
+        :param memory_limit_bytes: the memory available to the process; detected from cgroup/host limits if None
+        """
+        if not 0 < target_percent <= 100:
+            raise ValueError(f"target_percent must be in (0, 100] (got {target_percent})")
+
+        self.target_percent = target_percent
+        self.sample_interval_seconds = sample_interval_seconds
+        self._memory_limit_bytes = memory_limit_bytes
+
+        import psutil  # type: ignore  # imported on use, as it is slow to import and unneeded by most sweepers
+
+        self._process = psutil.Process()
+        self._last_sample_time = -math.inf
+        self._last_usage_percent = 0.0
+
+    @property
+    def memory_limit_bytes(self) -> int:
+        if self._memory_limit_bytes is None:
+            self._memory_limit_bytes = get_memory_limit_bytes()
+            log.info(f"Detected memory limit of {self._memory_limit_bytes / 2**20:.0f}MiB")
+        return self._memory_limit_bytes
+
+    def _sample_rss_bytes(self) -> int:
+        return self._process.memory_info().rss
+
+    def usage_percent(self) -> float:
+        """Return the most recent sample of RSS as a percentage of available memory, resampling if it has expired"""
+        now = time.monotonic()
+        if now - self._last_sample_time >= self.sample_interval_seconds:
+            self._last_sample_time = now
+            self._last_usage_percent = 100 * self._sample_rss_bytes() / self.memory_limit_bytes
+        return self._last_usage_percent
+
+    def is_under_pressure(self) -> bool:
+        return self.usage_percent() >= self.target_percent
+
+    def scale(self, value: int, minimum: int = 1) -> int:
+        """
+        Scale a size (e.g. a page size) according to memory pressure.  Below the target, value is returned unchanged.
+        Above it, value shrinks linearly towards minimum as usage approaches 100%.
+        """
+        usage_percent = self.usage_percent()
+        if usage_percent < self.target_percent:
+            return value
+
+        remaining_proportion = max(0.0, (100 - usage_percent) / max(100 - self.target_percent, 1e-9))
+        return max(minimum, int(value * remaining_proportion))
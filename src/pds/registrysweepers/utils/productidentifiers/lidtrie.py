@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from typing import Dict
+from typing import Generic
+from typing import Iterator
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+from pds.registrysweepers.utils.productidentifiers.pdslid import PdsLid
+from pds.registrysweepers.utils.productidentifiers.pdslidvid import PdsLidVid
+
+V = TypeVar("V")
+
+
+class _LidTrieNode(Generic[V]):
+    __slots__ = ("lid", "parent", "children", "versions")
+
+    def __init__(self, lid: Optional[PdsLid], parent: Optional[_LidTrieNode[V]]):
+        self.lid = lid
+        self.parent = parent
+        self.children: Dict[str, _LidTrieNode[V]] = {}
+        self.versions: Dict[PdsLidVid, V] = {}
+
+
+class LidTrie(Generic[V]):
+    """
+    Prefix-trie over the colon-separated fields of LIDs, associating a value with each LIDVID inserted.
+
+    Lookups by LID walk one node per LID field, so resolving all versions of a LID, all member LIDs of a bundle, or the
+    parent of a LID costs O(depth) and allocates no strings.  Each node holds the interned PdsLid for its path, which
+    is built once when the node is created.  The trie may be populated incrementally, e.g. while consuming a stream of
+    hits.
+    """
+
+    def __init__(self):
+        self._root: _LidTrieNode[V] = _LidTrieNode(None, None)
+        self._lidvids_count = 0
+
+    def _find_node(self, lid: PdsLid) -> Optional[_LidTrieNode[V]]:
+        node = self._root
+        for field in lid.fields:
+            node = node.children.get(field)  # type: ignore[assignment]
+            if node is None:
+                return None
+        return node
+
+    def _ensure_node(self, lid: PdsLid) -> _LidTrieNode[V]:
+        node = self._root
+        fields = lid.fields
+        for depth, field in enumerate(fields, start=1):
+            child = node.children.get(field)
+            if child is None:
+                child_lid = lid if depth == len(fields) else PdsLid.from_string(":".join(fields[:depth]))
+                child = _LidTrieNode(child_lid, node)
+                node.children[field] = child
+            node = child
+        return node
+
+    def add(self, lidvid: PdsLidVid, value: V) -> None:
+        """Associate value with lidvid, replacing any value previously associated with it"""
+        versions = self._ensure_node(lidvid.lid).versions
+        if lidvid not in versions:
+            self._lidvids_count += 1
+        versions[lidvid] = value
+
+    def get(self, lidvid: PdsLidVid) -> Optional[V]:
+        node = self._find_node(lidvid.lid)
+        return None if node is None else node.versions.get(lidvid)
+
+    def __contains__(self, lidvid: object) -> bool:
+        if not isinstance(lidvid, PdsLidVid):
+            return False
+        node = self._find_node(lidvid.lid)
+        return node is not None and lidvid in node.versions
+
+    def __len__(self) -> int:
+        """Return the number of LIDVIDs in the trie"""
+        return self._lidvids_count
+
+    def versions_of(self, lid: PdsLid) -> Mapping[PdsLidVid, V]:
+        """Return the values of all versions of the given LID, keyed by LIDVID"""
+        node = self._find_node(lid)
+        return {} if node is None else node.versions
+
+    def children_of(self, lid: PdsLid) -> Iterator[PdsLid]:
+        """Yield the LIDs one field deeper than the given LID (e.g. the collections of a bundle) present in the trie"""
+        node = self._find_node(lid)
+        if node is not None:
+            for child in node.children.values():
+                yield child.lid  # type: ignore[misc]
+
+    def descendants_of(self, lid: PdsLid) -> Iterator[Tuple[PdsLidVid, V]]:
+        """Yield (lidvid, value) for every version of every LID beneath (but not including) the given LID"""
+        node = self._find_node(lid)
+        if node is not None:
+            yield from self._iter_versions_beneath(node)
+
+    def parent_of(self, lid: PdsLid) -> Optional[PdsLid]:
+        """Return the LID one field shallower than the given LID, if the given LID is present in the trie"""
+        node = self._find_node(lid)
+        if node is None or node.parent is None:
+            return None
+        return node.parent.lid
+
+    def items(self) -> Iterator[Tuple[PdsLidVid, V]]:
+        return self._iter_versions_beneath(self._root)
+
+    @staticmethod
+    def _iter_versions_beneath(node: _LidTrieNode[V]) -> Iterator[Tuple[PdsLidVid, V]]:
+        stack = list(node.children.values())
+        while stack:
+            node = stack.pop()
+            yield from node.versions.items()
+            stack.extend(node.children.values())
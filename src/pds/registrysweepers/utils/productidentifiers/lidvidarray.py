@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import mmap
+import struct
+import zlib
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from pds.registrysweepers.utils.productidentifiers.pdsproductidentifier import PdsProductIdentifier
+
+# magic, byte-order sentinel, entry count, data buffer length
+_HEADER = struct.Struct("=8sQQQ")
+_MAGIC = b"LIDVIDA1"
+_BYTE_ORDER_SENTINEL = 0x0102030405060708
+
+IdentifierLike = Union[str, PdsProductIdentifier]
+
+
+def _hash_key(key: bytes) -> int:
+    # stable across processes (unlike hash()) and far cheaper than a cryptographic digest.  Collisions only cost an
+    # extra key comparison, as entries are always ordered/compared by (hash, key)
+    return (zlib.crc32(key) << 32) | zlib.adler32(key)
+
+
+class LidVidArray:
+    """
+    Compact, immutable set of product identifier strings, supporting set algebra and memory-mapping from disk.
+
+    Identifiers are stored as a sorted array of 64-bit hashes alongside an offsets/bytes buffer of their utf-8
+    encodings, costing ~16 bytes per identifier on top of the identifier itself, rather than the ~100 bytes of overhead
+    per element of a python set of str.  Entries are ordered by (hash, identifier), so set operations are linear merges,
+    membership tests are binary searches, and hash collisions never conflate distinct identifiers.
+
+    Iteration order is hash order, not lexical order.
+    """
+
+    __slots__ = ("_hashes", "_offsets", "_data", "_mmap")
+
+    # arrays when built in memory, or memoryviews of the memory-map when loaded from disk
+    _hashes: Sequence[int]
+    _offsets: Sequence[int]
+    _data: Union[bytes, memoryview]
+
+    def __init__(self, ids: Iterable[IdentifierLike] = ()):
+        # lexical sort followed by a stable in-place sort on hash yields (hash, key) order without materializing tuples,
+        # or any reordered copy of the keys
+        keys = sorted({str(id).encode() for id in ids})
+        keys.sort(key=_hash_key)
+        self._hashes, self._offsets, self._data = _build_buffers(array("Q", map(_hash_key, keys)), keys)
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def _from_buffers(
+        cls, hashes: Sequence[int], offsets: Sequence[int], data: Union[bytes, memoryview]
+    ) -> LidVidArray:
+        instance = cls.__new__(cls)
+        instance._hashes = hashes
+        instance._offsets = offsets
+        instance._data = data
+        instance._mmap = None
+        return instance
+
+    @staticmethod
+    def _coerce(other: Union[LidVidArray, Iterable[IdentifierLike]]) -> LidVidArray:
+        return other if isinstance(other, LidVidArray) else LidVidArray(other)
+
+    def _key_at(self, idx: int) -> bytes:
+        return bytes(self._data[self._offsets[idx] : self._offsets[idx + 1]])
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __iter__(self) -> Iterator[str]:
+        for idx in range(len(self)):
+            yield self._key_at(idx).decode()
+
+    def __contains__(self, id: object) -> bool:
+        if not isinstance(id, (str, PdsProductIdentifier)):
+            return False
+
+        key = str(id).encode()
+        hashed_key = _hash_key(key)
+        idx = bisect_left(self._hashes, hashed_key)
+        while idx < len(self) and self._hashes[idx] == hashed_key:
+            if self._key_at(idx) == key:
+                return True
+            idx += 1
+
+        return False
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LidVidArray):
+            return False
+        return (
+            len(self) == len(other)
+            and all(a == b for a, b in zip(self._hashes, other._hashes))
+            and bytes(self._data) == bytes(other._data)
+        )
+
+    def __repr__(self) -> str:
+        return f"LidVidArray(<{len(self)} identifiers>)"
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the underlying buffers, in bytes"""
+        return 8 * (len(self._hashes) + len(self._offsets)) + len(self._data)
+
+    def isin(self, ids: Iterable[IdentifierLike]) -> List[bool]:
+        """Return, for each of the given ids in order, whether it is present in this array"""
+        return [id in self for id in ids]
+
+    def union(self, other: Union[LidVidArray, Iterable[IdentifierLike]]) -> LidVidArray:
+        return self._merge(self._coerce(other), keep_left=True, keep_both=True, keep_right=True)
+
+    def intersection(self, other: Union[LidVidArray, Iterable[IdentifierLike]]) -> LidVidArray:
+        return self._merge(self._coerce(other), keep_left=False, keep_both=True, keep_right=False)
+
+    def difference(self, other: Union[LidVidArray, Iterable[IdentifierLike]]) -> LidVidArray:
+        return self._merge(self._coerce(other), keep_left=True, keep_both=False, keep_right=False)
+
+    def _merge(self, other: LidVidArray, keep_left: bool, keep_both: bool, keep_right: bool) -> LidVidArray:
+        left_hashes, right_hashes = self._hashes, other._hashes
+        left_count, right_count = len(self), len(other)
+        hashes = array("Q")
+        keys: List[bytes] = []
+
+        left_idx = right_idx = 0
+        while left_idx < left_count and right_idx < right_count:
+            left_hash, right_hash = left_hashes[left_idx], right_hashes[right_idx]
+            if left_hash == right_hash:
+                left_key, right_key = self._key_at(left_idx), other._key_at(right_idx)
+                if left_key == right_key:
+                    if keep_both:
+                        hashes.append(left_hash)
+                        keys.append(left_key)
+                    left_idx += 1
+                    right_idx += 1
+                    continue
+                left_is_lesser = left_key < right_key
+            else:
+                left_is_lesser = left_hash < right_hash
+
+            if left_is_lesser:
+                if keep_left:
+                    hashes.append(left_hash)
+                    keys.append(self._key_at(left_idx))
+                left_idx += 1
+            else:
+                if keep_right:
+                    hashes.append(right_hash)
+                    keys.append(other._key_at(right_idx))
+                right_idx += 1
+
+        if keep_left:
+            hashes.extend(left_hashes[left_idx:])
+            keys.extend(self._key_at(idx) for idx in range(left_idx, left_count))
+
+        if keep_right:
+            hashes.extend(right_hashes[right_idx:])
+            keys.extend(other._key_at(idx) for idx in range(right_idx, right_count))
+
+        return LidVidArray._from_buffers(*_build_buffers(hashes, keys))
+
+    def save(self, path: str) -> None:
+        """Write this array to disk in a form which may be memory-mapped by LidVidArray.load()"""
+        with open(path, "wb") as outfile:
+            outfile.write(_HEADER.pack(_MAGIC, _BYTE_ORDER_SENTINEL, len(self), len(self._data)))
+            outfile.write(self._hashes.tobytes())  # type: ignore[attr-defined]
+            outfile.write(self._offsets.tobytes())  # type: ignore[attr-defined]
+            outfile.write(bytes(self._data))
+
+    @classmethod
+    def load(cls, path: str) -> LidVidArray:
+        """
+        Memory-map an array previously written with save().  Buffers are paged in by the OS on access rather than read
+        up-front, so the returned array should be close()d (or used as a context manager) once no longer needed.
+        """
+        with open(path, "rb") as infile:
+            mm = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, sentinel, count, data_length = _HEADER.unpack_from(mm)
+        if magic != _MAGIC or sentinel != _BYTE_ORDER_SENTINEL:
+            mm.close()
+            raise ValueError(f'File "{path}" is not a LidVidArray written on a platform with the same byte order')
+
+        hashes_start = _HEADER.size
+        offsets_start = hashes_start + 8 * count
+        data_start = offsets_start + 8 * (count + 1)
+
+        buffer = memoryview(mm)
+        instance = cls._from_buffers(
+            buffer[hashes_start:offsets_start].cast("Q"),
+            buffer[offsets_start:data_start].cast("Q"),
+            buffer[data_start : data_start + data_length],
+        )
+        buffer.release()
+        instance._mmap = mm
+        return instance
+
+    def close(self) -> None:
+        """Release the underlying memory-map, if any.  The array must not be used after closing."""
+        if self._mmap is None:
+            return
+
+        for view in (self._hashes, self._offsets, self._data):
+            view.release()  # type: ignore[attr-defined]
+        self._mmap.close()
+        self._mmap = None
+
+    def __enter__(self) -> LidVidArray:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def _build_buffers(hashes: array, keys: List[bytes]) -> Tuple[array, array, bytes]:
+    """Given hashes and their keys, already in (hash, key) order, return the hashes, offsets and data buffers"""
+    offsets = array("Q", [0])
+    offsets.extend(accumulate(map(len, keys)))
+    return hashes, offsets, b"".join(keys)
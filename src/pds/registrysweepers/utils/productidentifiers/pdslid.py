@@ -1,13 +1,26 @@
 from __future__ import annotations
 
-from typing import List
+from typing import ClassVar
+from typing import Tuple
+from weakref import WeakValueDictionary
 
 from pds.registrysweepers.utils.productidentifiers.pdsproductidentifier import PdsProductIdentifier
 
 
 class PdsLid(PdsProductIdentifier):
+    """
+    Immutable LID.  Instances obtained via from_string() are interned, so equal LIDs share a single instance for as long
+    as any reference to it exists.  The hash and field split are computed once, at instantiation.
+    """
+
+    __slots__ = ("_value", "_fields", "_hash", "__weakref__")
+
+    _interned: ClassVar[WeakValueDictionary[str, PdsLid]] = WeakValueDictionary()
+
     def __init__(self, value: str):
         self._value = value
+        self._fields: Tuple[str, ...] = tuple(value.split(":"))
+        self._hash = hash(value)
 
     @property
     def value(self) -> str:
@@ -18,26 +31,38 @@ class PdsLid(PdsProductIdentifier):
         return self
 
     def __str__(self):
-        return self.value
+        return self._value
 
     @staticmethod
     def from_string(lid: str) -> PdsLid:
-        return PdsLid(lid)
+        try:
+            return PdsLid._interned[lid]
+        except KeyError:
+            instance = PdsLid(lid)
+            PdsLid._interned[lid] = instance
+            return instance
+
+    def __reduce__(self):
+        # re-intern on unpickling, rather than creating a duplicate instance
+        return PdsLid.from_string, (self._value,)
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, PdsLid):
             return False
-        return self.value == other.value
+        return self._value == other._value
 
     def __hash__(self):
-        return hash(self._value)
+        return self._hash
 
     def __repr__(self):
         return f'PdsLid("{self.value}")'
 
     @property
-    def _fields(self) -> List[str]:
-        return self.value.split(":")
+    def fields(self) -> Tuple[str, ...]:
+        """Return the colon-separated name fields of this LID"""
+        return self._fields
 
     @property
     def _fields_count(self):
@@ -55,7 +80,7 @@ class PdsLid(PdsProductIdentifier):
 
     def _get_field(self, index: int) -> str:
         try:
-            return self.value.split(":")[index]
+            return self._fields[index]
         except IndexError:
             return ""
 
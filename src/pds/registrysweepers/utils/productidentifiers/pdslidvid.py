@@ -1,43 +1,119 @@
 from __future__ import annotations
 
 import functools
+import re
+from typing import ClassVar
+from typing import Iterable
+from typing import List
+from typing import Tuple
+from weakref import WeakValueDictionary
 
 from pds.registrysweepers.utils.productidentifiers.pdslid import PdsLid
 from pds.registrysweepers.utils.productidentifiers.pdsproductidentifier import PdsProductIdentifier
 from pds.registrysweepers.utils.productidentifiers.pdsvid import PdsVid
 
 
+# LID of one or more non-empty colon-separated fields, then a VID of the form <major>.<minor>
+_LIDVID_PATTERN = re.compile(r"([^:]+(?::[^:]+)*)::(\d+)\.(\d+)")
+
+
 @functools.total_ordering
 class PdsLidVid(PdsProductIdentifier):
+    """
+    Immutable LIDVID.  Instances obtained via from_string() are interned, so equal LIDVIDs share a single instance for
+    as long as any reference to it exists.  The canonical string and hash are computed once, at instantiation.
+    """
+
+    __slots__ = ("_lid", "_vid", "_str", "_hash", "__weakref__")
+
+    _interned: ClassVar[WeakValueDictionary[str, PdsLidVid]] = WeakValueDictionary()
+
     def __init__(self, lid: PdsLid, vid: PdsVid):
         self._lid = lid
-        self.vid = vid
+        self._vid = vid
+        self._str = lid.value + PdsProductIdentifier.LIDVID_SEPARATOR + str(vid)
+        self._hash = hash(self._str)
 
     @property
     def lid(self) -> PdsLid:
         return self._lid
 
+    @property
+    def vid(self) -> PdsVid:
+        return self._vid
+
     @staticmethod
     def from_string(lidvid_str: str) -> PdsLidVid:
-        lid_chunk, vid_chunk = lidvid_str.split(PdsProductIdentifier.LIDVID_SEPARATOR)
-        lid = PdsLid(lid_chunk)
-        vid = PdsVid.from_string(vid_chunk)
-        return PdsLidVid(lid, vid)
+        # only strings validated below are interned, so a hit needs no validation
+        try:
+            return PdsLidVid._interned[lidvid_str]
+        except KeyError:
+            pass
+
+        # validated as by from_strings(), so that both accept exactly the same strings
+        m = _LIDVID_PATTERN.fullmatch(lidvid_str)
+        if m is None:
+            raise ValueError(f'Could not parse LIDVID from string "{lidvid_str}"')
+
+        lid_chunk, major_version, minor_version = m.groups()
+        instance = PdsLidVid(PdsLid.from_string(lid_chunk), PdsVid(int(major_version), int(minor_version)))
+        # keyed by the instance's own (canonical) string, so that the table holds no second copy of each LIDVID string
+        return PdsLidVid._interned.setdefault(instance._str, instance)
+
+    @staticmethod
+    def from_strings(lidvid_strs: Iterable[str]) -> Tuple[List[PdsLidVid], List[Tuple[int, str]]]:
+        """
+        Parse and validate a batch of LIDVID strings (for example, an entire refs document product_lidvid array).
+
+        Returns a tuple (lidvids, invalid), where lidvids contains the interned PdsLidVid for each valid element in input
+        order, and invalid contains an (index, value) tuple for each element which could not be parsed.
+        """
+        interned = PdsLidVid._interned
+        match = _LIDVID_PATTERN.fullmatch
+        lidvids: List[PdsLidVid] = []
+        invalid: List[Tuple[int, str]] = []
+
+        for idx, lidvid_str in enumerate(lidvid_strs):
+            if not isinstance(lidvid_str, str):
+                invalid.append((idx, lidvid_str))
+                continue
+
+            # validated before the intern table is consulted, so that validity does not depend on what is interned
+            m = match(lidvid_str)
+            if m is None:
+                invalid.append((idx, lidvid_str))
+                continue
+
+            instance = interned.get(lidvid_str)
+            if instance is None:
+                lid_chunk, major_version, minor_version = m.groups()
+                instance = PdsLidVid(PdsLid.from_string(lid_chunk), PdsVid(int(major_version), int(minor_version)))
+                instance = interned.setdefault(instance._str, instance)
+
+            lidvids.append(instance)
+
+        return lidvids, invalid
+
+    def __reduce__(self):
+        # re-intern on unpickling, rather than creating a duplicate instance
+        return PdsLidVid.from_string, (self._str,)
 
     def __str__(self):
-        return str(self.lid) + PdsProductIdentifier.LIDVID_SEPARATOR + str(self.vid)
+        return self._str
 
     def __hash__(self):
-        return hash(str(self))
+        return self._hash
 
     def __repr__(self):
-        return f"PdsLidVid({str(self)})"
+        return f"PdsLidVid({self._str})"
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, PdsLidVid):
             return False
 
-        return self.lid == other.lid and self.vid == other.vid
+        return self._str == other._str
 
     def __lt__(self, other: PdsLidVid):
         if self.lid != other.lid:
@@ -9,6 +9,9 @@ from abc import ABC, abstractmethod
 
 
 class PdsProductIdentifier(ABC):
+    # subclasses are instantiated in very large numbers, so instance dicts are avoided in favour of slots
+    __slots__ = ()
+
     LIDVID_SEPARATOR = "::"
 
     @property
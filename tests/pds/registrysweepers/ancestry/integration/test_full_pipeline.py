@@ -165,3 +165,50 @@ class TestFullPipeline:
         for update in bulk_updates:
             assert update.inline_script_content is not None
             assert len(update.inline_script_content) > 0
+
+
+class TestIncrementalPipeline:
+    """Test ancestry.run() in incremental (harvest high-water mark) mode"""
+
+    def test_incremental_run_filters_by_watermark_less_overlap(self, mock_opensearch_client):
+        """Bundle and collection queries should be limited to products harvested since the overlapped watermark"""
+        mock_opensearch_client.register_search_response(
+            index_pattern=".*registry.*",
+            query_matcher=lambda q: "aggs" in q,
+            response_data={
+                'hits': {'hits': [], 'total': {'value': 1, 'relation': 'eq'}},
+                'aggregations': {'watermark': {'value': 1735787045000.0}},  # 2025-01-02T03:04:05Z
+            }
+        )
+        mock_opensearch_client.register_search_response(
+            index_pattern=".*",
+            query_matcher=lambda q: True,
+            response_data=create_search_response([])
+        )
+
+        main.run(client=mock_opensearch_client, bulk_updates_sink=[], incremental=True)
+
+        product_queries = [
+            c['body'] for c in mock_opensearch_client.search_calls
+            if "aggs" not in c['body'] and "product_class" in json.dumps(c['body'])
+        ]
+        assert len(product_queries) > 0
+        for query in product_queries:
+            # default overlap is 60 minutes
+            assert "2025-01-02T02:04:05+00:00" in json.dumps(query)
+
+    def test_incremental_run_without_watermark_performs_full_run(self, mock_opensearch_client):
+        """If nothing has been processed by the current version, no harvest timestamp filter is applied"""
+        mock_opensearch_client.register_search_response(
+            index_pattern=".*",
+            query_matcher=lambda q: True,
+            response_data=create_search_response([])
+        )
+
+        main.run(client=mock_opensearch_client, bulk_updates_sink=[], incremental=True)
+
+        assert not any(
+            "ops:Harvest_Info.ops:harvest_date_time" in json.dumps(c['body'])
+            for c in mock_opensearch_client.search_calls
+            if "aggs" not in c['body']
+        )
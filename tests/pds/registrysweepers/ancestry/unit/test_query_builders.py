@@ -1,7 +1,12 @@
 """Unit tests for query builder functions in queries.py"""
+from datetime import datetime
+from datetime import timezone
+
 import pytest
+from pds.registrysweepers.ancestry.queries import HARVEST_TIMESTAMP_METADATA_KEY
 from pds.registrysweepers.ancestry.queries import product_class_query_factory
 from pds.registrysweepers.ancestry.queries import ProductClass
+from pds.registrysweepers.ancestry.queries import query_for_ancestry_watermark
 from pds.registrysweepers.ancestry.queries import query_for_pending_bundles
 from pds.registrysweepers.ancestry.queries import query_for_pending_collections
 from pds.registrysweepers.ancestry.versioning import SWEEPERS_ANCESTRY_VERSION
@@ -187,3 +192,79 @@ class TestQueryForPendingCollections:
         # Verify index name contains 'registry'
         call = mock_opensearch_client.search_calls[0]
         assert 'registry' in call['index']
+
+
+class TestIncrementalQueries:
+    """Test harvest-timestamp filtering and high-water mark resolution for incremental runs"""
+
+    harvested_since = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    def _register_empty_response(self, mock_opensearch_client):
+        from ..mock_opensearch import create_empty_response
+
+        mock_opensearch_client.register_search_response(
+            index_pattern=".*registry.*",
+            query_matcher=lambda q: True,
+            response_data=create_empty_response()
+        )
+
+    def test_bundle_query_unfiltered_by_default(self, mock_opensearch_client):
+        """Verify full runs do not filter bundles by harvest timestamp"""
+        self._register_empty_response(mock_opensearch_client)
+
+        list(query_for_pending_bundles(mock_opensearch_client))
+
+        query = mock_opensearch_client.search_calls[0]['body']
+        assert HARVEST_TIMESTAMP_METADATA_KEY not in str(query)
+
+    def test_bundle_query_filters_by_harvest_timestamp(self, mock_opensearch_client):
+        """Verify incremental runs only request bundles harvested since the given time"""
+        self._register_empty_response(mock_opensearch_client)
+
+        list(query_for_pending_bundles(mock_opensearch_client, harvested_since=self.harvested_since))
+
+        filters = mock_opensearch_client.search_calls[0]['body']["query"]["bool"]["filter"]
+        assert {"term": {"product_class": "Product_Bundle"}} in filters
+        assert {"range": {HARVEST_TIMESTAMP_METADATA_KEY: {"gte": "2025-01-02T03:04:05+00:00"}}} in filters
+
+    def test_collection_query_filters_by_harvest_timestamp(self, mock_opensearch_client):
+        """Verify incremental runs retain the version exclusion alongside the harvest timestamp filter"""
+        self._register_empty_response(mock_opensearch_client)
+
+        list(query_for_pending_collections(mock_opensearch_client, harvested_since=self.harvested_since))
+
+        bool_query = mock_opensearch_client.search_calls[0]['body']["query"]["bool"]
+        assert {"range": {HARVEST_TIMESTAMP_METADATA_KEY: {"gte": "2025-01-02T03:04:05+00:00"}}} in bool_query["filter"]
+        assert SWEEPERS_ANCESTRY_VERSION_METADATA_KEY in str(bool_query["must_not"])
+
+    def test_watermark_resolved_from_max_aggregation(self, mock_opensearch_client):
+        """Verify the high-water mark is the max harvest timestamp of up-to-date aggregate products"""
+        mock_opensearch_client.register_search_response(
+            index_pattern=".*registry.*",
+            query_matcher=lambda q: "aggs" in q,
+            response_data={
+                'hits': {'hits': [], 'total': {'value': 3, 'relation': 'eq'}},
+                'aggregations': {'watermark': {'value': 1735787045000.0}},
+            }
+        )
+
+        watermark = query_for_ancestry_watermark(mock_opensearch_client)
+
+        assert watermark == self.harvested_since
+        query = mock_opensearch_client.search_calls[0]['body']
+        assert query["aggs"]["watermark"]["max"]["field"] == HARVEST_TIMESTAMP_METADATA_KEY
+        version_filter = {"range": {SWEEPERS_ANCESTRY_VERSION_METADATA_KEY: {"gte": SWEEPERS_ANCESTRY_VERSION}}}
+        assert version_filter in query["query"]["bool"]["filter"]
+
+    def test_watermark_is_none_without_processed_products(self, mock_opensearch_client):
+        """Verify a missing aggregation value yields no high-water mark, forcing a full run"""
+        mock_opensearch_client.register_search_response(
+            index_pattern=".*registry.*",
+            query_matcher=lambda q: "aggs" in q,
+            response_data={
+                'hits': {'hits': [], 'total': {'value': 0, 'relation': 'eq'}},
+                'aggregations': {'watermark': {'value': None}},
+            }
+        )
+
+        assert query_for_ancestry_watermark(mock_opensearch_client) is None
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import threading
+import unittest
+from typing import Any
+from typing import Dict
+from typing import List
+from unittest.mock import MagicMock
+
+from pds.registrysweepers.legacy_registry_sync.online_resources import get_online_resources_version
+from pds.registrysweepers.legacy_registry_sync.online_resources import iter_online_resources
+from pds.registrysweepers.legacy_registry_sync.online_resources import load_online_resources
+
+
+class FakeResourceSession:
+    """Emulates start/rows paging of Solr resource documents, sorted by identifier or by descending _version_"""
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Dict[str, Any], timeout: int) -> MagicMock:
+        with self._lock:
+            self.requests.append(params)
+
+        if params.get("sort") == "_version_ desc":
+            docs = sorted(self.docs, key=lambda doc: doc["_version_"], reverse=True)
+        else:
+            docs = sorted(self.docs, key=lambda doc: doc["identifier"])
+        start = params.get("start", 0)
+        response = MagicMock()
+        response.json.return_value = {
+            "response": {"numFound": len(docs), "docs": docs[start : start + params["rows"]]}
+        }
+        return response
+
+
+class OnlineResourcesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.docs = [
+            {
+                "identifier": f"resource_{i:03d}",
+                "lid": f"urn:nasa:pds:context_pds3:resource:resource.{i}",
+                "resource_url": [f"https://pds.nasa.gov/resource/{i}"],
+                "_version_": 1000 + i,
+            }
+            for i in range(45)
+        ]
+        self.docs.append({"identifier": "resource_without_url", "lid": "urn:nasa:pds:resource.nourl", "_version_": 1})
+        self.expected = {doc["lid"]: doc["resource_url"][0] for doc in self.docs if "resource_url" in doc}
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_concurrent_pages(self):
+        session = FakeResourceSession(self.docs)
+        resources = list(
+            iter_online_resources("http://solr/search", session, max_workers=3, page_size=10)  # type: ignore
+        )
+
+        self.assertEqual(list(self.expected.items()), resources)
+        self.assertEqual(0, session.requests[0]["rows"])
+        self.assertEqual([0, 10, 20, 30, 40], sorted(request["start"] for request in session.requests[1:]))
+
+    def test_version(self):
+        session = FakeResourceSession(self.docs)
+        self.assertEqual("46-1044", get_online_resources_version("http://solr/search", session))  # type: ignore
+
+        self.docs.pop()
+        self.assertEqual("45-1044", get_online_resources_version("http://solr/search", session))  # type: ignore
+
+        session.get = MagicMock(side_effect=ValueError("undefined field _version_"))  # type: ignore
+        self.assertIsNone(get_online_resources_version("http://solr/search", session))  # type: ignore
+
+    def test_cache_invalidated_by_version(self):
+        cache_dir = os.path.join(self.tmpdir.name, "cache")
+        session = FakeResourceSession(self.docs)
+
+        def load() -> Dict[str, str]:
+            session.requests.clear()
+            resources = load_online_resources(
+                "http://solr/search", "unused.sst", cache_dir=cache_dir, session=session  # type: ignore
+            )
+            try:
+                return dict(resources.items())
+            finally:
+                resources.close()
+
+        self.assertEqual(self.expected, load())
+        self.assertGreater(len(session.requests), 1)
+
+        # unchanged resources are served from the cache after a single version request
+        self.assertEqual(self.expected, load())
+        self.assertEqual(1, len(session.requests))
+
+        self.docs[0]["resource_url"] = ["https://pds.nasa.gov/resource/moved"]
+        self.docs[0]["_version_"] = 2000
+        self.assertEqual("https://pds.nasa.gov/resource/moved", load()[self.docs[0]["lid"]])
+        self.assertGreater(len(session.requests), 1)
+
+    def test_uncached(self):
+        db_path = os.path.join(self.tmpdir.name, "online_resources.sst")
+        session = FakeResourceSession(self.docs)
+        resources = load_online_resources("http://solr/search", db_path, session=session)  # type: ignore
+        self.assertEqual(self.expected, dict(resources.items()))
+        resources.close()
+        self.assertTrue(os.path.exists(db_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import threading
+import unittest
+from typing import Any
+from typing import Dict
+from typing import List
+from unittest.mock import MagicMock
+
+from pds.registrysweepers.legacy_registry_sync.solr_cursor_reader import SolrCursorReader
+
+
+class FakeSolrSession:
+    """Emulates the subset of Solr search handler behaviour used by SolrCursorReader, over an in-memory collection"""
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _matches(self, doc: Dict[str, Any], fq: str) -> bool:
+        if fq == "-product_class:[* TO *]":
+            return "product_class" not in doc
+        value = fq.removeprefix("{!term f=product_class}")
+        return value in doc.get("product_class", [])
+
+    def get(self, url: str, params: Dict[str, Any], timeout: int) -> MagicMock:
+        with self._lock:
+            self.requests.append(params)
+
+        docs = [doc for doc in self.docs if "fq" not in params or self._matches(doc, params["fq"])]
+        body: Dict[str, Any] = {"response": {"numFound": len(docs), "docs": []}}
+        if params.get("facet") == "true":
+            counts: Dict[Any, int] = {}
+            for doc in docs:
+                value = doc["product_class"][0] if "product_class" in doc else None
+                counts[value] = counts.get(value, 0) + 1
+            body["facet_counts"] = {"facet_fields": {"product_class": [x for kv in counts.items() for x in kv]}}
+        else:
+            docs = sorted(docs, key=lambda doc: doc["identifier"])
+            start = 0 if params["cursorMark"] == "*" else int(params["cursorMark"])
+            page = docs[start : start + params["rows"]]
+            body["response"]["docs"] = page
+            body["nextCursorMark"] = str(start + len(page)) if page else params["cursorMark"]
+
+        response = MagicMock()
+        response.json.return_value = body
+        return response
+
+
+class SolrCursorReaderTestCase(unittest.TestCase):
+    def setUp(self):
+        product_classes = ["Product_Context", "Product_Collection", "Product_Bundle"]
+        self.docs = [
+            {"identifier": f"urn:nasa:pds:product_{i:03d}", "product_class": [product_classes[i % 3]]}
+            for i in range(95)
+        ]
+        self.docs += [{"identifier": f"urn:nasa:pds:unclassified_{i}"} for i in range(5)]
+
+    def test_reads_all_partitions(self):
+        session = FakeSolrSession(self.docs)
+        reader = SolrCursorReader("http://solr/search", rows=7, max_workers=2, session=session)  # type: ignore
+
+        self.assertEqual(4, len(reader.get_partition_filters()))
+        read_docs = list(reader)
+        self.assertCountEqual(self.docs, read_docs)
+        page_requests = [request for request in session.requests if "cursorMark" in request]
+        self.assertTrue(all(request["sort"] == "identifier asc" for request in page_requests))
+
+    def test_unpartitioned(self):
+        session = FakeSolrSession(self.docs)
+        reader = SolrCursorReader("http://solr/search", rows=10, partition_field=None, session=session)  # type: ignore
+        self.assertCountEqual(self.docs, list(reader))
+        self.assertEqual(11, len(session.requests))
+
+    def test_early_stop(self):
+        session = FakeSolrSession(self.docs)
+        reader = SolrCursorReader("http://solr/search", rows=1, max_workers=2, session=session)  # type: ignore
+        itr = iter(reader)
+        self.assertEqual(3, len([next(itr) for _ in range(3)]))
+        itr.close()  # must not hang on the workers
+
+    def test_failure_is_raised(self):
+        session = FakeSolrSession(self.docs)
+        session.get = MagicMock(side_effect=ValueError("bad response"))  # type: ignore
+        reader = SolrCursorReader("http://solr/search", partition_filters=[None], session=session)  # type: ignore
+        self.assertRaises(ValueError, list, reader)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
 import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+from urllib.parse import urlparse
 
+from pds.registrysweepers.legacy_registry_sync.solr_doc_export_to_opensearch import get_url_netloc
 from pds.registrysweepers.legacy_registry_sync.solr_doc_export_to_opensearch import SolrOsWrapperIter
 from pds.registrysweepers.legacy_registry_sync.solr_doc_export_to_opensearch import UNKNOWN_NODE
 
@@ -119,5 +123,77 @@ class TestGetNodeHeuristics(unittest.TestCase):
         self.assertEqual(UNKNOWN_NODE, self._wrapper()._get_node(doc))
 
 
+
+class TestBatchedTransformation(unittest.TestCase):
+    """Tests for the batched (and optionally multiprocess) transformation of documents."""
+
+    def setUp(self):
+        self.docs = [
+            {
+                "lid": f"urn:nasa:pds:bundle:collection:product_{i}",
+                "lidvid": f"urn:nasa:pds:bundle:collection:product_{i}::1.0",
+                "resource_ref": ["urn:nasa:pds:resource:geo::1.0"],
+                "modification_date": ["2001-01-01T00:00:00Z", f"2020-01-{i % 28 + 1:02d}T00:00:00.000Z"],
+                "start_date_time": ["not a date"],
+                "publication_year": [""],
+                "title": [f"Product {i}"],
+            }
+            for i in range(25)
+        ]
+        self.docs.insert(3, {"lid": "urn:nasa:pds:bundle:collection:no_lidvid"})
+        self.found_ids = {self.docs[0]["lidvid"]: "PDS_SBN"}
+
+    def _wrapper(self, online_resources, transform_workers=0):
+        return SolrOsWrapperIter(
+            self.docs,
+            TEST_INDEX,
+            found_ids=self.found_ids,
+            online_resources=online_resources,
+            batch_size=4,
+            transform_workers=transform_workers,
+        )
+
+    def test_batch_of_only_skipped_docs(self):
+        # a batch consisting entirely of documents without a lidvid must not end the iteration
+        docs = [{"lid": f"urn:nasa:pds:bundle:collection:no_lidvid_{i}"} for i in range(3)] + self.docs[:1]
+        wrapper = SolrOsWrapperIter(docs, TEST_INDEX, found_ids=self.found_ids, online_resources={}, batch_size=2)
+
+        self.assertEqual([self.docs[0]["lidvid"]], [doc["_id"] for doc in wrapper])
+
+    def test_transforms_in_order(self):
+        online_resources = MagicMock()
+        online_resources.get.return_value = "https://pds-geosciences.wustl.edu/resource"
+        os_docs = list(self._wrapper(online_resources))
+
+        self.assertEqual([doc["lidvid"] for doc in self.docs if "lidvid" in doc], [doc["_id"] for doc in os_docs])
+        self.assertEqual("PDS_SBN", os_docs[0]["_source"]["node"])
+        self.assertEqual("true", os_docs[0]["_source"]["found_in_registry"])
+        self.assertTrue(all(doc["_source"]["node"] == "PDS_GEO" for doc in os_docs[1:]))
+        self.assertEqual([datetime(2020, 1, 2)], os_docs[1]["_source"]["modification_date"])
+        self.assertEqual([datetime(1950, 1, 1)], os_docs[1]["_source"]["start_date_time"])
+        self.assertNotIn("publication_year", os_docs[1]["_source"])
+
+        # the online resource is looked up once, despite being referenced by every document
+        online_resources.get.assert_called_once_with("urn:nasa:pds:resource:geo")
+
+    def test_process_pool(self):
+        online_resources = {"urn:nasa:pds:resource:geo": "https://pds-geosciences.wustl.edu/resource"}
+        expected = list(self._wrapper(online_resources))
+
+        wrapper = self._wrapper(online_resources, transform_workers=2)
+        self.assertEqual(expected, list(wrapper))
+        self.assertEqual({"pds-geosciences.wustl.edu"}, wrapper._seen_domains)
+
+    def test_get_url_netloc(self):
+        for url in [
+            "https://pds-ppi.igpp.ucla.edu/data/something",
+            "https://wgc.jpl.nasa.gov:8443",
+            "http://user@host.example.com?query=1",
+            "https://host.example.com#fragment",
+            "pds.nasa.gov/relative",
+        ]:
+            self.assertEqual(urlparse(url).netloc, get_url_netloc(url), url)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import unittest
+
+from pds.registrysweepers.legacy_registry_sync import benchmark
+from pds.registrysweepers.legacy_registry_sync.legacy_registry_sync import dry_run
+from pds.registrysweepers.legacy_registry_sync.legacy_registry_sync import get_solr_session
+from pds.registrysweepers.legacy_registry_sync.online_resources import iter_online_resources
+from pds.registrysweepers.legacy_registry_sync.solr_cursor_reader import SolrCursorReader
+from pds.registrysweepers.legacy_registry_sync.solr_stand_in import create_solr_stand_in_session
+from pds.registrysweepers.legacy_registry_sync.solr_stand_in import SyntheticSolrIndex
+from pds.registrysweepers.legacy_registry_sync.sync_state import get_solr_max_version
+from pds.registrysweepers.legacy_registry_sync.sync_state import get_versions_since_query
+
+SOLR_URL = "http://solr-stand-in/search"
+
+
+class SyntheticSolrIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = SyntheticSolrIndex.generate(doc_count=1000, resource_count=20)
+        self.session = create_solr_stand_in_session(self.index)
+
+    def test_cursor_reader(self):
+        reader = SolrCursorReader(SOLR_URL, "*", rows=50, max_workers=3, session=self.session)
+        identifiers = [doc["identifier"] for doc in reader]
+
+        self.assertEqual(1020, len(identifiers))
+        self.assertCountEqual([doc["identifier"] for doc in self.index.docs], identifiers)
+
+    def test_modified_since_query(self):
+        query = "modification_date:[2015-01-01T00:00:00Z TO *]"
+        reader = SolrCursorReader(SOLR_URL, query, rows=50, session=self.session)
+        docs = list(reader)
+
+        self.assertLess(0, len(docs))
+        self.assertLess(len(docs), 1020)
+        self.assertTrue(all(max(doc["modification_date"]) >= "2015-01-01T00:00:00Z" for doc in docs))
+
+    def test_versions_since_query(self):
+        reader = SolrCursorReader(SOLR_URL, get_versions_since_query(1000), rows=50, session=self.session)
+
+        self.assertEqual(list(range(1001, 1021)), sorted(doc["_version_"] for doc in reader))
+        self.assertEqual(1020, get_solr_max_version(SOLR_URL, session=self.session))
+
+    def test_online_resources(self):
+        resources = dict(iter_online_resources(SOLR_URL, self.session, page_size=7))
+
+        self.assertEqual(20, len(resources))
+        self.assertTrue(all(lid.startswith("urn:nasa:pds:context_pds3:resource:") for lid in resources))
+
+    def test_unrecorded_request(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            recording_path = os.path.join(tmp_dir, "solr.jsonl")
+            with open(recording_path, "w") as recording_file:
+                params = {"q": "*", "rows": "0", "wt": "json"}
+                recording_file.write(json.dumps({"params": params, "response": self.index(params)}) + "\n")
+
+            session = get_solr_session(replay_path=recording_path)
+            self.assertEqual(1020, session.get(SOLR_URL, params={"q": "*", "rows": 0}).json()["response"]["numFound"])
+            self.assertEqual(404, session.get(SOLR_URL, params={"q": "*", "rows": 10}).status_code)
+
+
+class OfflineLegacySyncTestCase(unittest.TestCase):
+    def test_dry_run(self):
+        session = create_solr_stand_in_session(SyntheticSolrIndex.generate(doc_count=500, resource_count=10))
+        stats = dry_run(show_sample_docs=False, solr_session=session)
+
+        self.assertEqual(510, stats["total_docs"])
+        self.assertEqual([], stats["errors"])
+        self.assertNotIn("UNK", stats["node_distribution"])
+
+    def test_benchmark(self):
+        report = benchmark.run(doc_count=500, resource_count=10, solr_workers=2, rows=100, max_chunk_bytes=20000)
+
+        self.assertEqual(["online resources", "read", "transform", "sync"], list(report["phases"]))
+        self.assertEqual(10, report["phases"]["online resources"]["docs"])
+        self.assertTrue(all(report["phases"][phase]["docs"] == 510 for phase in ["read", "transform", "sync"]))
+
+        rows = benchmark.compare_reports(report, report)
+        self.assertTrue(all(row["ratio"] == 1 for row in rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
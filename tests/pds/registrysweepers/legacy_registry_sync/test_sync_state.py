@@ -0,0 +1,44 @@
+import unittest
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from opensearchpy import NotFoundError
+from pds.registrysweepers.legacy_registry_sync.sync_state import get_sync_watermark
+from pds.registrysweepers.legacy_registry_sync.sync_state import get_versions_since_query
+from pds.registrysweepers.legacy_registry_sync.sync_state import put_sync_watermark
+from pds.registrysweepers.legacy_registry_sync.sync_state import resolve_incremental_min_version
+
+
+class SyncStateTestCase(unittest.TestCase):
+    def test_watermark_round_trip(self):
+        stored = {}
+        client = MagicMock()
+        client.index.side_effect = lambda index, id, body, refresh: stored.update({(index, id): body})
+        client.get.side_effect = lambda index, id: {"_source": stored[(index, id)]}
+
+        watermark = 1792345678901234567
+        put_sync_watermark(client, "en-legacy-registry", watermark)
+        self.assertEqual(watermark, get_sync_watermark(client, "en-legacy-registry"))
+        self.assertEqual("en-legacy-registry-sync-state", client.index.call_args.kwargs["index"])
+
+    def test_missing_watermark(self):
+        client = MagicMock()
+        client.get.side_effect = NotFoundError(404, "index_not_found_exception")
+        self.assertIsNone(get_sync_watermark(client, "en-legacy-registry"))
+
+    def test_modification_date_watermark_is_ignored(self):
+        client = MagicMock()
+        client.get.return_value = {"_source": {"modification_date_watermark": "2024-03-01T12:30:15Z"}}
+        self.assertIsNone(get_sync_watermark(client, "en-legacy-registry"))
+
+    def test_min_version(self):
+        self.assertIsNone(resolve_incremental_min_version(None, timedelta(hours=1)))
+        self.assertEqual(5 << 20, resolve_incremental_min_version(5 << 20, timedelta(0)))
+
+        min_version = resolve_incremental_min_version(3600000 << 20, timedelta(hours=1))
+        self.assertEqual(0, min_version)
+        self.assertEqual("_version_:{0 TO *]", get_versions_since_query(min_version))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,14 @@
 import logging
 import sys
+import threading
 
+import pytest
 from pds.registrysweepers import driver
+from pds.registrysweepers.utils import LogContextFilter
+from pds.registrysweepers.utils.db.multitenancy import get_multitenancy_node_id
 
 
-def _run_driver_with_args(monkeypatch, args):
+def _run_driver_with_args(monkeypatch, args, make_sweeper=None):
     sweeper_calls = []
 
     def _make_sweeper(name):
@@ -13,6 +17,8 @@ def _run_driver_with_args(monkeypatch, args):
 
         return _run
 
+    _make_sweeper = make_sweeper(sweeper_calls) if make_sweeper is not None else _make_sweeper
+
     monkeypatch.setattr(driver, "configure_logging", lambda *args, **kwargs: None)
     monkeypatch.setattr(driver, "parse_log_level", lambda *_: logging.INFO)
     monkeypatch.setattr(driver, "get_opensearch_client_from_environment", lambda **kwargs: object())
@@ -53,3 +59,142 @@ def test_run_only_legacy_sync(monkeypatch):
     sweeper_calls = _run_driver_with_args(monkeypatch, ["--only", "legacy-sync"])
 
     assert sweeper_calls == ["legacy-sync"]
+
+
+def test_sweeper_prerequisites():
+    prerequisites = driver.get_sweeper_prerequisites(["provenance", "ancestry", "reindexer", "legacy-sync"])
+
+    assert prerequisites == {
+        "provenance": [],
+        "ancestry": [],
+        "reindexer": ["provenance", "ancestry"],
+        "legacy-sync": [],
+    }
+
+
+def test_run_concurrently_respects_prerequisites(monkeypatch):
+    # provenance and ancestry may only both pass the barrier if they run concurrently
+    barrier = threading.Barrier(2, timeout=5)
+    clients = []
+
+    def make_sweeper(sweeper_calls):
+        def _make_sweeper(name):
+            def _run(*, client, log_level):
+                clients.append(client)
+                if name in {"provenance", "ancestry"}:
+                    barrier.wait()
+                sweeper_calls.append(name)
+
+            return _run
+
+        return _make_sweeper
+
+    sweeper_calls = _run_driver_with_args(monkeypatch, ["--max-concurrency", "4"], make_sweeper)
+
+    assert sorted(sweeper_calls[:2]) == ["ancestry", "provenance"]
+    assert sweeper_calls[2] == "reindexer"
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_run_stops_starting_sweepers_after_failure(monkeypatch):
+    started = []
+
+    def make_sweeper(sweeper_calls):
+        def _make_sweeper(name):
+            def _run(*, client, log_level):
+                started.append(name)
+                if name == "provenance":
+                    raise RuntimeError("provenance failed")
+
+            return _run
+
+        return _make_sweeper
+
+    with pytest.raises(RuntimeError):
+        _run_driver_with_args(monkeypatch, [], make_sweeper)
+
+    assert started == ["provenance"]
+
+
+def _make_tenant_sweeper_factory(failing_tenant=None):
+    def make_sweeper(sweeper_calls):
+        def _make_sweeper(name):
+            def _run(*, client, log_level):
+                tenant = get_multitenancy_node_id()
+                if tenant == failing_tenant and name == "provenance":
+                    raise RuntimeError(f"provenance failed for {tenant}")
+                sweeper_calls.append((tenant, name))
+
+            return _run
+
+        return _make_sweeper
+
+    return make_sweeper
+
+
+def test_run_tenants_concurrently(monkeypatch):
+    args = ["--tenants", "geo", "img", "--max-concurrency", "2"]
+    sweeper_calls = _run_driver_with_args(monkeypatch, args, _make_tenant_sweeper_factory())
+
+    expected_calls = [(tenant, name) for tenant in ["geo", "img"] for name in ["provenance", "ancestry", "reindexer"]]
+    assert sorted(sweeper_calls) == sorted(expected_calls)
+
+
+def test_run_tenants_isolates_failures(monkeypatch):
+    sweeper_calls = []
+
+    def make_sweeper(calls):
+        return _make_tenant_sweeper_factory(failing_tenant="geo")(sweeper_calls)
+
+    with pytest.raises(RuntimeError, match="geo"):
+        _run_driver_with_args(monkeypatch, ["--tenants", "geo", "img"], make_sweeper)
+
+    assert [call for call in sweeper_calls if call[0] == "img"] == [
+        ("img", "provenance"),
+        ("img", "ancestry"),
+        ("img", "reindexer"),
+    ]
+    assert [call for call in sweeper_calls if call[0] == "geo"] == []
+
+
+def test_run_tenants_rejects_tenant_agnostic_sweepers(monkeypatch):
+    with pytest.raises(SystemExit):
+        _run_driver_with_args(monkeypatch, ["--tenants", "geo", "--only", "legacy-sync"])
+
+
+def test_log_records_are_stamped_with_tenant_and_sweeper():
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    handler.addFilter(LogContextFilter())
+    logger = logging.getLogger("test_driver.log_context")
+    logger.addHandler(handler)
+    try:
+        logger.warning("outside")
+        driver.run_tenants(
+            ["geo", "img"],
+            lambda: driver.run_sweepers(["provenance", "ancestry"], lambda name: logger.warning(name)),
+            max_concurrency=2,
+        )
+    finally:
+        logger.removeHandler(handler)
+
+    assert ("-", "-") == (records[0].tenant, records[0].sweeper)
+    assert sorted((record.tenant, record.sweeper) for record in records[1:]) == [
+        ("geo", "ancestry"),
+        ("geo", "provenance"),
+        ("img", "ancestry"),
+        ("img", "provenance"),
+    ]
+
+
+def test_parse_tenants():
+    assert driver.parse_tenants(None) == []
+    assert driver.parse_tenants(" geo, img  sbn,") == ["geo", "img", "sbn"]
+
+
+def test_sweepers_are_resolved_on_selection():
+    from pds.registrysweepers.reindexer import main as reindexer
+
+    assert isinstance(driver.SWEEPER_REGISTRY["reindexer"], str)
+    assert driver.get_sweeper("reindexer") is reindexer.run
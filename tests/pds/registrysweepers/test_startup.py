@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+from typing import Dict
+
+# Importing the driver must stay fast, as scheduled runs launch many short-lived tasks.  The budget is generous relative
+# to the typical cost (~0.3s, dominated by opensearchpy), so that it is only exceeded by regressions such as eagerly
+# importing a heavy dependency, and not by slow test hosts.
+DRIVER_IMPORT_BUDGET_SECONDS = 1.0
+
+# modules which must only be imported once needed, i.e. once a sweeper is selected or an AOSS client is requested
+DEFERRED_MODULES = [
+    "boto3",
+    "botocore",
+    "requests_aws4auth",
+    "tqdm",
+    "psutil",
+    "pds.registrysweepers.provenance",
+    "pds.registrysweepers.ancestry.main",
+    "pds.registrysweepers.reindexer.main",
+    "pds.registrysweepers.legacy_registry_sync",
+]
+
+
+def _measure_import_times_us(module: str) -> Dict[str, int]:
+    """Import module in a fresh interpreter, returning the cumulative import time of every module imported"""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    cumulative_times_us = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, imported_module = line.removeprefix("import time:").split("|")
+        cumulative_times_us[imported_module.strip()] = int(cumulative_us)
+    return cumulative_times_us
+
+
+def test_driver_import_defers_heavy_modules():
+    imported_modules = _measure_import_times_us("pds.registrysweepers.driver").keys()
+
+    eagerly_imported = [module for module in DEFERRED_MODULES if module in imported_modules]
+    assert eagerly_imported == []
+
+
+def test_driver_import_within_budget():
+    # the best of several runs is taken, to exclude the cost of cold filesystem caches
+    import_times_seconds = [
+        _measure_import_times_us("pds.registrysweepers.driver")["pds.registrysweepers.driver"] / 1e6 for _ in range(3)
+    ]
+
+    assert min(import_times_seconds) < DRIVER_IMPORT_BUDGET_SECONDS
@@ -0,0 +1,71 @@
+import unittest
+
+from pds.registrysweepers.utils.productidentifiers.lidtrie import LidTrie
+from pds.registrysweepers.utils.productidentifiers.pdslid import PdsLid
+from pds.registrysweepers.utils.productidentifiers.pdslidvid import PdsLidVid
+
+
+class LidTrieTestCase(unittest.TestCase):
+    def setUp(self):
+        self.trie: LidTrie[str] = LidTrie()
+        for lidvid_str in [
+            "urn:nasa:pds:bundle::1.0",
+            "urn:nasa:pds:bundle::2.0",
+            "urn:nasa:pds:bundle:collection_a::1.0",
+            "urn:nasa:pds:bundle:collection_a::1.1",
+            "urn:nasa:pds:bundle:collection_b::1.0",
+            "urn:nasa:pds:bundle:collection_b:product::1.0",
+            "urn:nasa:pds:other_bundle::1.0",
+        ]:
+            self.trie.add(PdsLidVid.from_string(lidvid_str), lidvid_str)
+
+    def test_add_and_get(self):
+        self.assertEqual(7, len(self.trie))
+        lidvid = PdsLidVid.from_string("urn:nasa:pds:bundle:collection_a::1.0")
+        self.assertIn(lidvid, self.trie)
+        self.assertEqual("urn:nasa:pds:bundle:collection_a::1.0", self.trie.get(lidvid))
+
+        self.trie.add(lidvid, "replaced")
+        self.assertEqual(7, len(self.trie))
+        self.assertEqual("replaced", self.trie.get(lidvid))
+
+        absent = PdsLidVid.from_string("urn:nasa:pds:bundle:collection_c::1.0")
+        self.assertNotIn(absent, self.trie)
+        self.assertIsNone(self.trie.get(absent))
+
+    def test_versions_of(self):
+        versions = self.trie.versions_of(PdsLid.from_string("urn:nasa:pds:bundle:collection_a"))
+        self.assertEqual(
+            {"urn:nasa:pds:bundle:collection_a::1.0", "urn:nasa:pds:bundle:collection_a::1.1"}, set(versions.values())
+        )
+        self.assertEqual({}, self.trie.versions_of(PdsLid.from_string("urn:nasa:pds:bundle:collection_c")))
+        self.assertEqual({}, self.trie.versions_of(PdsLid.from_string("urn:nasa:pds")))
+
+    def test_hierarchy(self):
+        bundle_lid = PdsLid.from_string("urn:nasa:pds:bundle")
+        self.assertEqual(
+            {
+                PdsLid.from_string("urn:nasa:pds:bundle:collection_a"),
+                PdsLid.from_string("urn:nasa:pds:bundle:collection_b"),
+            },
+            set(self.trie.children_of(bundle_lid)),
+        )
+        self.assertEqual(
+            {
+                "urn:nasa:pds:bundle:collection_a::1.0",
+                "urn:nasa:pds:bundle:collection_a::1.1",
+                "urn:nasa:pds:bundle:collection_b::1.0",
+                "urn:nasa:pds:bundle:collection_b:product::1.0",
+            },
+            {value for _, value in self.trie.descendants_of(bundle_lid)},
+        )
+        self.assertEqual(7, len(list(self.trie.items())))
+
+        product_lid = PdsLid.from_string("urn:nasa:pds:bundle:collection_b:product")
+        self.assertIs(PdsLid.from_string("urn:nasa:pds:bundle:collection_b"), self.trie.parent_of(product_lid))
+        self.assertIs(bundle_lid, self.trie.parent_of(self.trie.parent_of(product_lid)))
+        self.assertIsNone(self.trie.parent_of(PdsLid.from_string("urn:nasa:pds:bundle:collection_c")))
+
+
+if __name__ == "__main__":
+    unittest.main()
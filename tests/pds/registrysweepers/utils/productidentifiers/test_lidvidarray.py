@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from pds.registrysweepers.utils.productidentifiers.lidvidarray import LidVidArray
+from pds.registrysweepers.utils.productidentifiers.pdslidvid import PdsLidVid
+
+
+class LidVidArrayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.left_ids = {f"urn:nasa:pds:bundle:collection:product_{i}::1.0" for i in range(0, 200)}
+        self.right_ids = {f"urn:nasa:pds:bundle:collection:product_{i}::1.0" for i in range(100, 300)}
+        self.left = LidVidArray(self.left_ids)
+        self.right = LidVidArray(self.right_ids)
+
+    def test_construction(self):
+        lidvids = LidVidArray(["a::1.0", "b::1.0", "a::1.0", PdsLidVid.from_string("c::1.0")])
+        self.assertEqual(3, len(lidvids))
+        self.assertEqual({"a::1.0", "b::1.0", "c::1.0"}, set(lidvids))
+        self.assertEqual(0, len(LidVidArray()))
+
+    def test_membership(self):
+        self.assertIn("urn:nasa:pds:bundle:collection:product_5::1.0", self.left)
+        self.assertIn(PdsLidVid.from_string("urn:nasa:pds:bundle:collection:product_5::1.0"), self.left)
+        self.assertNotIn("urn:nasa:pds:bundle:collection:product_250::1.0", self.left)
+        self.assertNotIn(5, self.left)
+        self.assertEqual([True, False], self.left.isin(["urn:nasa:pds:bundle:collection:product_5::1.0", "x::1.0"]))
+
+    def test_set_operations(self):
+        self.assertEqual(self.left_ids | self.right_ids, set(self.left.union(self.right)))
+        self.assertEqual(self.left_ids & self.right_ids, set(self.left.intersection(self.right)))
+        self.assertEqual(self.left_ids - self.right_ids, set(self.left.difference(self.right)))
+        self.assertEqual(self.right_ids - self.left_ids, set(self.right.difference(self.left_ids)))
+        self.assertEqual(LidVidArray(self.left_ids | self.right_ids), self.left.union(self.right))
+        self.assertEqual(self.left, self.left.difference(LidVidArray()))
+        self.assertEqual(0, len(LidVidArray().intersection(self.left)))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "ids.lidvidarray")
+            self.left.save(path)
+
+            with LidVidArray.load(path) as loaded:
+                self.assertEqual(self.left, loaded)
+                self.assertIn("urn:nasa:pds:bundle:collection:product_5::1.0", loaded)
+                self.assertEqual(self.left_ids - self.right_ids, set(loaded.difference(self.right)))
+
+            with open(path, "r+b") as f:
+                f.write(b"NOTMAGIC")
+            self.assertRaises(ValueError, lambda: LidVidArray.load(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
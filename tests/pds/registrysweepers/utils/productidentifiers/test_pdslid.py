@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from pds.registrysweepers.utils.productidentifiers.pdslid import PdsLid
@@ -15,6 +16,13 @@ class PdsLidTest(unittest.TestCase):
         self.assertNotEqual(base_lid, unequal_lid)
         self.assertNotEqual(base_lid.__hash__(), unequal_lid.__hash__())
 
+    def test_from_string_interns_instances(self):
+        lid = PdsLid.from_string("urn:nasa:pds:epoxi")
+        self.assertIs(lid, PdsLid.from_string("urn:nasa:pds:epoxi"))
+        self.assertIs(lid, pickle.loads(pickle.dumps(lid)))
+        self.assertEqual(hash("urn:nasa:pds:epoxi"), hash(lid))
+        self.assertFalse(hasattr(lid, "__dict__"))
+
     def test_bundle_status_correctly_identified(self):
         bundle_lid = PdsLid("urn:nasa:pds:bundle")
         self.assertTrue(bundle_lid.is_bundle())
@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from pds.registrysweepers.utils.productidentifiers.pdslidvid import PdsLidVid
@@ -24,6 +25,45 @@ class PdsLidVidTestCase(unittest.TestCase):
         self.assertNotEqual(base, different_vid)
         self.assertNotEqual(base.__hash__(), different_vid.__hash__())
 
+    def test_from_string_interns_instances(self):
+        lidvid = PdsLidVid.from_string("urn:nasa:pds:epoxi:data::1.0")
+        self.assertIs(lidvid, PdsLidVid.from_string("urn:nasa:pds:epoxi:data::1.0"))
+        self.assertIs(lidvid.lid, PdsLidVid.from_string("urn:nasa:pds:epoxi:data::2.0").lid)
+        self.assertIs(lidvid, pickle.loads(pickle.dumps(lidvid)))
+        self.assertEqual(hash("urn:nasa:pds:epoxi:data::1.0"), hash(lidvid))
+        self.assertFalse(hasattr(lidvid, "__dict__"))
+
+        # the intern table's key is the instance's own string, rather than a second copy of it
+        [key] = [key for key in PdsLidVid._interned.keys() if key == "urn:nasa:pds:epoxi:data::1.0"]
+        self.assertIs(str(lidvid), key)
+
+    def test_from_strings(self):
+        lidvid_strs = [
+            "urn:nasa:pds:epoxi:data::1.0",
+            "some:lid:without:vid",
+            "urn:nasa:pds:epoxi:data:product::1.12",
+            "some:lid:with:bad:vid::1.2.3",
+            "urn:nasa:pds:epoxi:data::1.0",
+        ]
+        lidvids, invalid = PdsLidVid.from_strings(lidvid_strs)
+
+        self.assertEqual([PdsLidVid.from_string(s) for s in lidvid_strs if s.count(".") == 1], lidvids)
+        self.assertIs(PdsLidVid.from_string("urn:nasa:pds:epoxi:data::1.0"), lidvids[0])
+        self.assertIs(lidvids[0], lidvids[2])
+        self.assertEqual(12, lidvids[1].vid.minor_version)
+        self.assertEqual([(1, "some:lid:without:vid"), (3, "some:lid:with:bad:vid::1.2.3")], invalid)
+
+        for invalid_str in ["some:lid:with:no:vid::", "::1.0", "some::lid::1.0", "some:lid::1.x", None]:
+            self.assertEqual(([], [(0, invalid_str)]), PdsLidVid.from_strings([invalid_str]))
+
+    def test_from_string_and_from_strings_agree(self):
+        for lidvid_str in ["urn:nasa:pds:epoxi::1.0", "a::0.0", "::1.0", ":a::1.0", "a:::1.0", "a:: 1.0", "a::1.0 "]:
+            lidvids, invalid = PdsLidVid.from_strings([lidvid_str])
+            if invalid:
+                self.assertRaises(ValueError, PdsLidVid.from_string, lidvid_str)
+            else:
+                self.assertIs(PdsLidVid.from_string(lidvid_str), lidvids[0])
+
     def test_comparison(self):
         first = PdsLidVid.from_string("something::1.0")
         second = PdsLidVid.from_string("something::2.0")
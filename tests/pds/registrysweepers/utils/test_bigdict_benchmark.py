@@ -0,0 +1,32 @@
+import json
+import unittest
+
+from pds.registrysweepers.utils.bigdict.benchmark import BACKENDS
+from pds.registrysweepers.utils.bigdict.benchmark import compare_reports
+from pds.registrysweepers.utils.bigdict.benchmark import run
+
+
+class BigDictBenchmarkTestCase(unittest.TestCase):
+    def test_report(self):
+        backend_names = [name for name, backend in BACKENDS.items() if backend.available]
+        report = run(backend_names, counts=[200], sample_size=50, conflict_proportion=0.1, isolate=False)
+
+        # report must be machine-readable
+        report = json.loads(json.dumps(report))
+        self.assertEqual(len(backend_names), len(report["results"]))
+        for result in report["results"]:
+            self.assertEqual(200, result["count"])
+            self.assertIn("get (hits)", result["phases"])
+            self.assertIn("iterate items", result["phases"])
+            self.assertGreater(result["peak_rss_bytes"], 0)
+
+        spilldict_result = next(result for result in report["results"] if result["backend"] == "SpillDict")
+        self.assertGreater(spilldict_result["extra"]["spill_stats"]["spills"], 0)
+
+        rows = compare_reports(report, report)
+        self.assertTrue(rows)
+        self.assertTrue(all(row["ratio"] == 1.0 for row in rows if row["ratio"] is not None))
+
+
+if __name__ == "__main__":
+    unittest.main()
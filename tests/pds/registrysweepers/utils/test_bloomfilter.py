@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from pds.registrysweepers.utils.bigdict.bloomfilter import BloomFilter
+from pds.registrysweepers.utils.bigdict.spilldict import SpillDict
+from pds.registrysweepers.utils.bigdict.sqlite3dict import SqliteDict
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_membership(self):
+        bloom_filter = BloomFilter(capacity=1000, false_positive_rate=0.01)
+        bloom_filter.update(f"present_{i}" for i in range(1000))
+
+        for i in range(1000):
+            self.assertIn(f"present_{i}", bloom_filter)
+
+        false_positives = sum(1 for i in range(10000) if f"absent_{i}" in bloom_filter)
+        self.assertLess(false_positives, 300)
+
+    def test_invalid_configuration(self):
+        self.assertRaises(ValueError, lambda: BloomFilter(capacity=0))
+        self.assertRaises(ValueError, lambda: BloomFilter(capacity=10, false_positive_rate=1.0))
+
+
+class TestBloomFilteredStores(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "bloom_test.sqlite")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sqlitedict(self):
+        sqlite_dict = SqliteDict(self.db_path, bloom_filter=BloomFilter(100))
+        sqlite_dict.put("a", 1)
+        sqlite_dict.put_many([("b", 2), ("c", 3)])
+        self.assertTrue(sqlite_dict.has("a"))
+        self.assertFalse(sqlite_dict.has("z"))
+        self.assertIsNone(sqlite_dict.get("z"))
+        self.assertIsNone(sqlite_dict.pop("z"))
+        self.assertEqual({("b", 2)}, set(sqlite_dict.get_many(["b", "z"])))
+
+        conflicts = sqlite_dict.put_many_returning_conflicts([("c", 30), ("d", 4), ("e", 5)])
+        self.assertEqual(["c"], conflicts)
+        self.assertEqual(3, sqlite_dict.get("c"))
+        self.assertEqual(5, sqlite_dict.get("e"))
+        self.assertEqual(5, len(sqlite_dict))
+        self.assertEqual([], sqlite_dict.put_many_returning_conflicts([("f", 6)]))
+
+        # filter is populated from existing rows when the database is reopened
+        reopened = SqliteDict(self.db_path, bloom_filter=BloomFilter(100))
+        self.assertEqual(1, reopened.get("a"))
+        self.assertTrue(reopened.has("f"))
+
+    def test_spilldict(self):
+        sd = SpillDict(spill_threshold=2, merge=lambda x, y: x + y, db_path=self.db_path, expected_key_count=100)
+        for key, value in [("a", 1), ("b", 2), ("c", 3), ("a", 10), ("d", 4), ("e", 5)]:
+            sd.put(key, value)
+
+        self.assertEqual(11, sd.get("a"))
+        self.assertFalse(sd.has("missing"))
+        self.assertEqual(5, len(sd))
+        self.assertEqual({"a": 11, "b": 2, "c": 3, "d": 4, "e": 5}, dict(sd.items()))
+        sd.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
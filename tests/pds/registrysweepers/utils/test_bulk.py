@@ -0,0 +1,97 @@
+import json
+import threading
+import unittest
+from datetime import datetime
+from typing import Any
+from typing import Dict
+from typing import List
+from unittest.mock import MagicMock
+
+from opensearchpy import TransportError
+from opensearchpy.serializer import JSONSerializer
+from pds.registrysweepers.utils.db.bulk import get_bulk_write_semaphore
+from pds.registrysweepers.utils.db.bulk import write_bulk_concurrently
+
+
+class FakeBulkClient:
+    """Records bulk requests, failing those items whose _id is listed in failing_ids with the associated status"""
+
+    def __init__(self, failing_ids: Dict[str, List[int]]):
+        self.transport = MagicMock(serializer=JSONSerializer())
+        self.failing_ids = failing_ids
+        self.request_sizes: List[int] = []
+        self.written_ids: List[str] = []
+        self.max_concurrent_requests = 0
+        self._concurrent_requests = 0
+        self._lock = threading.Lock()
+
+    def bulk(self, body: str, request_timeout: int) -> Dict[str, Any]:
+        with self._lock:
+            self._concurrent_requests += 1
+            self.max_concurrent_requests = max(self.max_concurrent_requests, self._concurrent_requests)
+            self.request_sizes.append(len(body.encode("utf-8")))
+
+        items = []
+        lines = body.splitlines()
+        for metadata_line in lines[::2]:
+            op_type, metadata = next(iter(json.loads(metadata_line).items()))
+            statuses = self.failing_ids.get(metadata["_id"], [])
+            status = statuses.pop(0) if statuses else 201
+            if status == 201:
+                with self._lock:
+                    self.written_ids.append(metadata["_id"])
+                items.append({op_type: {"_id": metadata["_id"], "status": status}})
+            else:
+                items.append({op_type: {"_id": metadata["_id"], "status": status, "error": {"type": "some_error"}}})
+
+        with self._lock:
+            self._concurrent_requests -= 1
+        return {"errors": any("error" in next(iter(item.values())) for item in items), "items": items}
+
+
+class WriteBulkConcurrentlyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.actions = [
+            {"_index": "test-index", "_id": f"doc_{i}", "_source": {"value": "x" * 100, "date": datetime(2020, 1, 1)}}
+            for i in range(200)
+        ]
+
+    def test_writes_all_chunked_by_bytes(self):
+        client = FakeBulkClient({})
+        results = list(
+            write_bulk_concurrently(client, self.actions, thread_count=3, max_chunk_bytes=2000)  # type: ignore
+        )
+
+        self.assertEqual(200, len(results))
+        self.assertTrue(all(ok for ok, _ in results))
+        self.assertCountEqual([action["_id"] for action in self.actions], client.written_ids)
+        self.assertGreater(len(client.request_sizes), 10)
+        self.assertTrue(all(size <= 2000 for size in client.request_sizes))
+        self.assertLessEqual(client.max_concurrent_requests, get_bulk_write_semaphore()._initial_value)  # type: ignore
+
+    def test_failures_are_streamed(self):
+        # doc_3 is throttled once then succeeds, doc_5 fails permanently
+        client = FakeBulkClient({"doc_3": [429], "doc_5": [400]})
+        results = list(
+            write_bulk_concurrently(
+                client, self.actions, max_chunk_bytes=2000, initial_backoff_seconds=0  # type: ignore
+            )
+        )
+
+        self.assertEqual(200, len(results))
+        failures = [item["index"]["_id"] for ok, item in results if not ok]
+        self.assertEqual(["doc_5"], failures)
+        self.assertIn("doc_3", client.written_ids)
+
+    def test_request_failure(self):
+        client = FakeBulkClient({})
+        client.bulk = MagicMock(side_effect=TransportError(400, "bad_request"))  # type: ignore
+        results = list(write_bulk_concurrently(client, self.actions[:10], initial_backoff_seconds=0))  # type: ignore
+
+        self.assertEqual(10, len(results))
+        self.assertFalse(any(ok for ok, _ in results))
+        self.assertEqual(1, client.bulk.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import json
+import unittest
+
+from pds.registrysweepers.utils.db import update_as_statements
+from pds.registrysweepers.utils.db import UPDATE_RETRY_ON_CONFLICT
+from pds.registrysweepers.utils.db.update import Update
+
+
+class UpdateAsStatementsTestCase(unittest.TestCase):
+    def test_retry_on_conflict(self):
+        metadata = json.loads(update_as_statements(Update(id="doc_0", content={"a": 1}))[0])
+        self.assertEqual({"_id": "doc_0", "retry_on_conflict": UPDATE_RETRY_ON_CONFLICT}, metadata["update"])
+
+        versioned_update = Update(id="doc_0", content={"a": 1}, primary_term=1, seq_no=2)
+        metadata = json.loads(update_as_statements(versioned_update)[0])
+        self.assertNotIn("retry_on_conflict", metadata["update"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import random
+import tempfile
+import unittest
+
+from pds.registrysweepers.utils.externalsort import external_join
+from pds.registrysweepers.utils.externalsort import external_sort
+from pds.registrysweepers.utils.externalsort import JoinSide
+from pds.registrysweepers.utils.externalsort import merge_join_sorted
+
+
+class ExternalSortTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.ids = [f"urn:nasa:pds:bundle:collection:product_{rng.randrange(500)}::1.0" for _ in range(1000)]
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_in_memory(self):
+        self.assertEqual(sorted(set(self.ids)), list(external_sort(self.ids, max_items_in_memory=10000)))
+        self.assertEqual(sorted(self.ids), list(external_sort(self.ids, max_items_in_memory=10000, unique=False)))
+
+    def test_spilled_runs(self):
+        sorted_ids = external_sort(self.ids, max_items_in_memory=30, tmp_dir=self.tmpdir.name, max_merge_fan_in=4)
+        self.assertEqual(sorted(set(self.ids)), list(sorted_ids))
+
+        sorted_ids = external_sort(self.ids, max_items_in_memory=30, unique=False, max_merge_fan_in=4)
+        self.assertEqual(sorted(self.ids), list(sorted_ids))
+
+        # run files are removed once iteration completes
+        self.assertEqual([], os.listdir(self.tmpdir.name))
+
+    def test_exact_multiple_of_page_size(self):
+        ids = [str(i) for i in range(100)]
+        self.assertEqual(sorted(ids), list(external_sort(reversed(ids), max_items_in_memory=50)))
+
+    def test_rejects_newlines(self):
+        self.assertRaises(ValueError, list, external_sort(["a", "b\nc", "d"], max_items_in_memory=2))
+
+    def test_preserves_carriage_returns(self):
+        ids = ["b", "a\rz", "c", "é\r"]
+        self.assertEqual(sorted(ids), list(external_sort(ids, max_items_in_memory=1)))
+
+    def test_merge_join_sorted(self):
+        joined = list(merge_join_sorted(["a", "b", "d"], ["b", "c", "d", "e"]))
+        self.assertEqual(
+            [
+                (JoinSide.LEFT_ONLY, "a"),
+                (JoinSide.BOTH, "b"),
+                (JoinSide.RIGHT_ONLY, "c"),
+                (JoinSide.BOTH, "d"),
+                (JoinSide.RIGHT_ONLY, "e"),
+            ],
+            joined,
+        )
+        self.assertRaises(ValueError, list, merge_join_sorted(["b", "a"], []))
+
+    def test_external_join(self):
+        left = self.ids[:700]
+        right = self.ids[300:]
+        joined = list(external_join(left, right, max_items_in_memory=50))
+
+        self.assertEqual(sorted(set(self.ids)), [id for _, id in joined])
+        self.assertEqual(set(left) - set(right), {id for side, id in joined if side == JoinSide.LEFT_ONLY})
+        self.assertEqual(set(right) - set(left), {id for side, id in joined if side == JoinSide.RIGHT_ONLY})
+        self.assertEqual(set(left) & set(right), {id for side, id in joined if side == JoinSide.BOTH})
+
+
+if __name__ == "__main__":
+    unittest.main()
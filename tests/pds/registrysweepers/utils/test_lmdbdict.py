@@ -0,0 +1,78 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+from pds.registrysweepers.utils.bigdict.autodict import AutoDict
+from pds.registrysweepers.utils.bigdict.lmdbdict import LmdbDict
+from pds.registrysweepers.utils.bigdict.spilldict import SpillDict
+
+
+@unittest.skipUnless(importlib.util.find_spec("lmdb"), "optional dependency lmdb is not installed")
+class TestLmdbDict(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "lmdbdict_test.lmdb")
+        self.lmdb_dict = LmdbDict(self.db_path)
+
+    def tearDown(self):
+        self.lmdb_dict.close()
+        self.tmpdir.cleanup()
+
+    def test_put_get_pop_has(self):
+        self.lmdb_dict.put("a", {"x", "y"})
+        self.lmdb_dict["b"] = 2
+        self.assertEqual({"x", "y"}, self.lmdb_dict.get("a"))
+        self.assertEqual(2, self.lmdb_dict["b"])
+        self.assertIsNone(self.lmdb_dict.get("c"))
+        self.assertTrue(self.lmdb_dict.has("a"))
+        self.assertFalse("c" in self.lmdb_dict)
+        self.assertEqual(2, len(self.lmdb_dict))
+
+        self.assertEqual(2, self.lmdb_dict.pop("b"))
+        self.assertIsNone(self.lmdb_dict.pop("b"))
+        self.assertEqual(1, len(self.lmdb_dict))
+
+    def test_put_many_and_iteration(self):
+        kvs = {f"k{i}": i for i in range(10)}
+        self.lmdb_dict.put_many(kvs.items(), batch_size=3)
+        self.assertEqual(10, len(self.lmdb_dict))
+        self.assertEqual(set(kvs.keys()), set(self.lmdb_dict))
+        self.assertEqual(set(kvs.values()), set(self.lmdb_dict.values()))
+        self.assertEqual(kvs, dict(self.lmdb_dict.items()))
+        self.assertEqual({("k1", 1), ("k2", 2)}, set(self.lmdb_dict.get_many(["k1", "k2", "missing"])))
+
+    def test_put_many_returning_conflicts(self):
+        self.assertEqual([], self.lmdb_dict.put_many_returning_conflicts([(f"k{i}", i) for i in range(5)]))
+
+        conflicts = self.lmdb_dict.put_many_returning_conflicts([(f"k{i}", i * 10) for i in range(3, 8)])
+        self.assertCountEqual(["k3", "k4"], conflicts)
+        self.assertEqual(8, len(self.lmdb_dict))
+        self.assertEqual(3, self.lmdb_dict.get("k3"))
+        self.assertEqual(50, self.lmdb_dict.get("k5"))
+
+    def test_autodict_and_spilldict_backend_selection(self):
+        auto_db_path = os.path.join(self.tmpdir.name, "auto.lmdb")
+        auto = AutoDict(item_count_threshold=1, db_path=auto_db_path, disk_backend=LmdbDict)
+        auto["x"] = 10
+        auto["y"] = 20
+        self.assertEqual("LmdbDict", auto.backend)
+        self.assertEqual({"x": 10, "y": 20}, dict(auto.items()))
+        auto.close()
+
+        sd = SpillDict(
+            spill_threshold=2,
+            merge=lambda x, y: x + y,
+            db_path=os.path.join(self.tmpdir.name, "spill.lmdb"),
+            disk_backend=LmdbDict,
+        )
+        for key, value in [("a", 1), ("b", 2), ("c", 3), ("a", 10), ("d", 4), ("e", 5)]:
+            sd.put(key, value)
+        self.assertIsInstance(sd._spill, LmdbDict)
+        self.assertEqual(11, sd.get("a"))
+        self.assertEqual(5, len(sd))
+        sd.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
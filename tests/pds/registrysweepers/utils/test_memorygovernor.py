@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pds.registrysweepers.utils.bigdict.autodict import AutoDict
+from pds.registrysweepers.utils.bigdict.dictdict import DictDict
+from pds.registrysweepers.utils.bigdict.spilldict import SpillDict
+from pds.registrysweepers.utils.memorygovernor import MemoryGovernor
+
+MEMORY_LIMIT_BYTES = 1000
+
+
+class MemoryGovernorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rss_bytes = 0
+        patcher = patch.object(MemoryGovernor, "_sample_rss_bytes", side_effect=lambda: self.rss_bytes)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.db_path = os.path.join(tempfile.gettempdir(), f"memorygovernor_test_{os.getpid()}.sqlite")
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def _governor(self, sample_interval_seconds: float = 0.0) -> MemoryGovernor:
+        return MemoryGovernor(
+            target_percent=80, sample_interval_seconds=sample_interval_seconds, memory_limit_bytes=MEMORY_LIMIT_BYTES
+        )
+
+    def test_rejects_invalid_target(self):
+        self.assertRaises(ValueError, MemoryGovernor, 0)
+        self.assertRaises(ValueError, MemoryGovernor, 101)
+
+    def test_pressure(self):
+        governor = self._governor()
+        self.rss_bytes = 500
+        self.assertEqual(50, governor.usage_percent())
+        self.assertFalse(governor.is_under_pressure())
+
+        self.rss_bytes = 800
+        self.assertTrue(governor.is_under_pressure())
+
+    def test_sampling_is_rate_limited(self):
+        governor = self._governor(sample_interval_seconds=3600)
+        self.rss_bytes = 500
+        self.assertFalse(governor.is_under_pressure())
+
+        # the previous sample is reused until the interval expires
+        self.rss_bytes = 900
+        self.assertFalse(governor.is_under_pressure())
+
+    def test_scale(self):
+        governor = self._governor()
+        self.rss_bytes = 500
+        self.assertEqual(500, governor.scale(500))
+
+        self.rss_bytes = 900
+        self.assertEqual(250, governor.scale(500))
+
+        self.rss_bytes = 1000
+        self.assertEqual(1, governor.scale(500))
+        self.assertEqual(10, governor.scale(500, minimum=10))
+
+    def test_autodict_upgrades_under_pressure(self):
+        ad = AutoDict(item_count_threshold=None, db_path=self.db_path, memory_governor=self._governor())
+        ad.put("a", 1)
+        self.assertIsInstance(ad._dict, DictDict)
+
+        self.rss_bytes = 900
+        ad.put("b", 2)
+        self.assertNotIsInstance(ad._dict, DictDict)
+        self.assertEqual(1, ad.get("a"))
+        self.assertEqual(2, ad.get("b"))
+        ad.close()
+
+    def test_autodict_requires_a_threshold(self):
+        self.assertRaises(ValueError, AutoDict, item_count_threshold=None)
+
+    def test_spilldict_spills_under_pressure(self):
+        sd = SpillDict(
+            spill_threshold=None,
+            merge=lambda x, y: x + y,
+            spill_proportion=0.5,
+            db_path=self.db_path,
+            memory_governor=self._governor(),
+            pressure_spill_min_items=1,
+        )
+        for i in range(4):
+            sd.put(f"k{i}", i)
+        self.assertEqual(0, sd.stats.spills)
+
+        self.rss_bytes = 900
+        sd.put("k4", 4)
+        self.assertEqual(1, sd.stats.spills)
+        self.assertEqual(3, sd.stats.spilled_items)
+        self.assertEqual(5, len(sd))
+        self.assertEqual({f"k{i}": i for i in range(5)}, dict(sd.items()))
+        sd.close()
+
+    def test_spilldict_does_not_thrash_under_sustained_pressure(self):
+        sd = SpillDict(
+            spill_threshold=None,
+            merge=lambda x, y: x + y,
+            spill_proportion=0.5,
+            db_path=self.db_path,
+            memory_governor=self._governor(),
+            pressure_spill_min_items=4,
+        )
+        # below pressure_spill_min_items, pressure does not trigger a spill
+        self.rss_bytes = 900
+        for i in range(3):
+            sd.put(f"k{i}", i)
+        self.assertEqual(0, sd.stats.spills)
+
+        sd.put("k3", 3)
+        self.assertEqual(1, sd.stats.spills)
+        self.assertEqual(2, len(sd._cache))
+
+        # pressure persists, but no further spill occurs until the cache regrows to the length of the last spill
+        sd.put("k4", 4)
+        self.assertEqual(1, sd.stats.spills)
+        self.assertEqual(3, len(sd._cache))
+
+        sd.put("k5", 5)
+        self.assertEqual(2, sd.stats.spills)
+        self.assertEqual(2, len(sd._cache))
+
+        self.assertEqual(6, len(sd))
+        self.assertEqual({f"k{i}": i for i in range(6)}, dict(sd.items()))
+        sd.close()
+
+    def test_spilldict_requires_a_threshold(self):
+        self.assertRaises(ValueError, SpillDict, spill_threshold=None, merge=lambda x, y: x + y)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from pds.registrysweepers.utils.db.multitenancy import get_multitenancy_node_id
+from pds.registrysweepers.utils.db.multitenancy import MULTITENANCY_NODE_ID
+from pds.registrysweepers.utils.db.multitenancy import resolve_multitenant_index_name
+from pds.registrysweepers.utils.db.multitenancy import tenant_scope
+
+
+class TenantScopeTestCase(unittest.TestCase):
+    @patch.dict(os.environ, {MULTITENANCY_NODE_ID: "en"})
+    def test_scope_overrides_environment(self):
+        self.assertEqual("en", get_multitenancy_node_id())
+        with tenant_scope("geo"):
+            self.assertEqual("geo", get_multitenancy_node_id())
+            with tenant_scope("img"):
+                self.assertEqual("img", get_multitenancy_node_id())
+            self.assertEqual("geo", get_multitenancy_node_id())
+        self.assertEqual("en", get_multitenancy_node_id())
+
+    def test_scopes_are_isolated_between_threads(self):
+        def resolve_in_scope(node_id: str) -> str:
+            with tenant_scope(node_id):
+                return get_multitenancy_node_id()
+
+        tenants = [f"node{i}" for i in range(16)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(tenants, list(executor.map(resolve_in_scope, tenants)))
+
+    @patch.dict(os.environ, {MULTITENANCY_NODE_ID: ""})
+    def test_resolves_index_of_tenant_in_scope(self):
+        client = MagicMock()
+        client.indices.exists.return_value = True
+        client.indices.exists_alias.return_value = False
+
+        with tenant_scope("geo"):
+            self.assertEqual("geo-registry-structured-refs", resolve_multitenant_index_name(client, "registry-refs"))
+        self.assertEqual("registry", resolve_multitenant_index_name(client, "registry"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from typing import Any
+from typing import Dict
+from typing import List
+
+from opensearchpy import TransportError
+from pds.registrysweepers.utils.db import query_registry_db_for_ids
+
+
+class FakeIdsClient:
+    """Pages a collection of documents by search_after on their position, optionally supporting point-in-time"""
+
+    def __init__(self, docs: List[Dict[str, Any]], supports_pit: bool):
+        self.docs = docs
+        self.supports_pit = supports_pit
+        self.bodies: List[Dict[str, Any]] = []
+        self.deleted_pits: List[str] = []
+
+    def create_pit(self, index: str, keep_alive: str) -> Dict[str, Any]:
+        if not self.supports_pit:
+            raise TransportError(404, "unsupported_operation")
+        return {"pit_id": "pit-0"}
+
+    def delete_pit(self, body: Dict[str, Any]) -> None:
+        self.deleted_pits.extend(body["pit_id"])
+
+    def search(self, body: Dict[str, Any], request_timeout: int, index: str = None) -> Dict[str, Any]:
+        self.bodies.append({**body})
+        start = body.get("search_after", [-1])[0] + 1
+        hits = [
+            {"_id": doc["lidvid"], "fields": {"node": [doc["node"]]}, "sort": [start + i]}
+            for i, doc in enumerate(self.docs[start : start + body["size"]])
+        ]
+        response: Dict[str, Any] = {"hits": {"hits": hits}}
+        if "pit" in body:
+            response["pit_id"] = f"pit-{len(self.bodies)}"
+        return response
+
+
+class QueryRegistryDbForIdsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.docs = [{"lidvid": f"urn:nasa:pds:bundle::{i}.0", "node": "PDS_GEO"} for i in range(25)]
+
+    def test_point_in_time(self):
+        client = FakeIdsClient(self.docs, supports_pit=True)
+        hits = list(
+            query_registry_db_for_ids(client, "registry", {"query": {}}, ["node"], page_size=10)  # type: ignore
+        )
+
+        self.assertEqual([doc["lidvid"] for doc in self.docs], [hit["_id"] for hit in hits])
+        self.assertTrue(all(body["_source"] is False for body in client.bodies))
+        self.assertEqual([{"_shard_doc": "asc"}], client.bodies[0]["sort"])
+        self.assertEqual(["pit-0", "pit-1", "pit-2"], [body["pit"]["id"] for body in client.bodies])
+        self.assertEqual(["pit-3"], client.deleted_pits)
+
+    def test_fallback_without_point_in_time(self):
+        client = FakeIdsClient(self.docs, supports_pit=False)
+        hits = list(query_registry_db_for_ids(client, "registry", {"query": {}}, ["node"], page_size=5))  # type: ignore
+
+        self.assertEqual(25, len(hits))
+        self.assertEqual([{"lidvid": "asc"}], client.bodies[0]["sort"])
+        self.assertNotIn("pit", client.bodies[0])
+        self.assertEqual([], client.deleted_pits)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pds.registrysweepers.utils.bigdict.shardedsqlitedict import ShardedSqliteDict
+
+
+class TestShardedSqliteDict(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "shardedsqlitedict_test.sqlite")
+        self.sharded_dict = ShardedSqliteDict(self.db_path, shard_count=3)
+
+    def tearDown(self):
+        self.sharded_dict.close()
+        self.tmpdir.cleanup()
+
+    def test_put_get_pop_has(self):
+        self.sharded_dict.put("a", {"x", "y"})
+        self.sharded_dict["b"] = 2
+        self.assertEqual({"x", "y"}, self.sharded_dict.get("a"))
+        self.assertEqual(2, self.sharded_dict["b"])
+        self.assertIsNone(self.sharded_dict.get("c"))
+        self.assertTrue(self.sharded_dict.has("a"))
+        self.assertFalse("c" in self.sharded_dict)
+        self.assertEqual(2, len(self.sharded_dict))
+
+        self.assertEqual(2, self.sharded_dict.pop("b"))
+        self.assertIsNone(self.sharded_dict.pop("b"))
+        self.assertEqual(1, len(self.sharded_dict))
+
+    def test_put_many_and_iteration(self):
+        kvs = {f"k{i}": i for i in range(100)}
+        self.sharded_dict.put_many(kvs.items(), batch_size=7)
+        self.assertEqual(100, len(self.sharded_dict))
+        self.assertEqual(set(kvs.keys()), set(self.sharded_dict))
+        self.assertEqual(sorted(kvs.values()), sorted(self.sharded_dict.values()))
+        self.assertEqual(kvs, dict(self.sharded_dict.items()))
+        self.assertEqual({("k1", 1), ("k2", 2)}, set(self.sharded_dict.get_many(["k1", "k2", "missing"])))
+
+        # keys are actually distributed among shards
+        for idx in range(3):
+            self.assertTrue(os.path.exists(f"{self.db_path}.{idx}"))
+        self.assertEqual(3, len({self.sharded_dict._shard_idx(key) for key in kvs}))
+
+    def test_put_many_returning_conflicts(self):
+        self.assertEqual([], self.sharded_dict.put_many_returning_conflicts([(f"k{i}", i) for i in range(5)]))
+
+        conflicts = self.sharded_dict.put_many_returning_conflicts([(f"k{i}", i * 10) for i in range(3, 8)])
+        self.assertCountEqual(["k3", "k4"], conflicts)
+        self.assertEqual(8, len(self.sharded_dict))
+        self.assertEqual(3, self.sharded_dict["k3"])
+        self.assertEqual(50, self.sharded_dict["k5"])
+
+    def test_concurrent_producers(self):
+        def produce(producer_idx: int) -> None:
+            for i in range(200):
+                self.sharded_dict.put(f"p{producer_idx}-k{i}", i)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(produce, range(4)))
+
+        self.assertEqual(800, len(self.sharded_dict))
+        self.assertEqual(199, self.sharded_dict["p3-k199"])
+
+    def test_failed_write_is_raised(self):
+        self.sharded_dict.put("unpicklable", lambda: None)
+        self.assertRaises(RuntimeError, self.sharded_dict.flush)
+
+    def test_reopen(self):
+        self.sharded_dict.put_many((f"k{i}", i) for i in range(20))
+        self.sharded_dict.close()
+
+        self.sharded_dict = ShardedSqliteDict(self.db_path, shard_count=3)
+        self.assertEqual(20, len(self.sharded_dict))
+        self.assertEqual(7, self.sharded_dict["k7"])
+
+
+if __name__ == "__main__":
+    unittest.main()
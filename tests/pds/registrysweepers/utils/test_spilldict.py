@@ -1,7 +1,10 @@
 import os
 import tempfile
 import unittest
+from unittest.mock import patch
 
+from pds.registrysweepers.utils.bigdict.eviction import ClockEvictionPolicy
+from pds.registrysweepers.utils.bigdict.eviction import LruEvictionPolicy
 from pds.registrysweepers.utils.bigdict.spilldict import SpillDict
 
 
@@ -104,14 +107,10 @@ class TestSpillDict(unittest.TestCase):
         self.assertNotIn("z", sd)
 
     def test_iters_and_len(self):
-        sd = SpillDict(spill_threshold=2, merge=self.merge_fn, db_path=self.db_path)
-        sd._spill.put("x", 1)
-        sd._spill.put("y", 2)
-        sd._spill.put("z", 3)
-
-        sd._cache.put("y", 20)
-        sd._cache.put("z", 30)
-        sd._cache.put("A", 40)
+        sd = SpillDict(spill_threshold=2, merge=self.merge_fn, spill_proportion=1.0, db_path=self.db_path)
+        # x and y spill, then y and z spill (with y merged into the spilled value), leaving A and z cached
+        for key, value in [("x", 1), ("y", 2), ("z", 3), ("y", 20), ("A", 40), ("z", 30)]:
+            sd.put(key, value)
 
         self.assertListEqual(["A", "x", "y", "z"], sorted(sd.keys()))
         self.assertListEqual([1, 22, 33, 40], sorted(sd.values()))
@@ -120,6 +119,88 @@ class TestSpillDict(unittest.TestCase):
 
         sd.close()
 
+    def test_len_tracks_overlap(self):
+        sd = SpillDict(spill_threshold=2, merge=self.merge_fn, spill_proportion=1.0, db_path=self.db_path)
+        for key, value in [("a", 1), ("b", 2), ("c", 3)]:
+            sd.put(key, value)
+        self.assertEqual(3, len(sd))
+
+        # re-put of a spilled key overlaps, rather than adding to length
+        sd.put("a", 10)
+        sd.put("a", 100)
+        self.assertEqual(3, len(sd))
+        self.assertEqual(len(list(sd)), len(sd))
+
+        sd.pop("a")
+        self.assertEqual(2, len(sd))
+        sd.pop("missing")
+        self.assertEqual(2, len(sd))
+
+        for key in ["d", "e", "b"]:
+            sd.put(key, 1)
+        self.assertEqual(4, len(sd))
+        self.assertEqual(len(list(sd)), len(sd))
+        self.assertEqual(len(list(sd.items())), len(sd))
+
+        sd.close()
+
+    def test_put_only_reads_spill_once_spilled(self):
+        sd = SpillDict(spill_threshold=2, merge=self.merge_fn, spill_proportion=1.0, db_path=self.db_path)
+        with patch.object(sd._spill, "has", wraps=sd._spill.has) as spill_has:
+            # a and b spill on the put of c, before which the spill cannot hold any key
+            for key, value in [("a", 1), ("b", 2), ("c", 3)]:
+                sd.put(key, value)
+            self.assertEqual(0, spill_has.call_count)
+
+            sd.put("a", 10)
+            sd.put("c", 30)
+            self.assertEqual(1, spill_has.call_count)
+
+        with patch.object(sd._spill, "keys_excluding", side_effect=AssertionError("len() read the spill")):
+            self.assertEqual(3, len(sd))
+
+        sd.close()
+
+
+    def test_eviction_policies(self):
+        # a is re-accessed before each spill, so recency-aware policies should retain it in cache
+        for policy, expect_a_cached in [(None, False), (LruEvictionPolicy(), True), (ClockEvictionPolicy(), True)]:
+            sd = SpillDict(
+                spill_threshold=2,
+                merge=self.merge_fn,
+                spill_proportion=0.5,
+                db_path=self.db_path,
+                eviction_policy=policy,
+            )
+            sd.put("a", 1)
+            sd.put("b", 2)
+            sd.get("a")
+            sd.put("c", 3)  # triggers spill of 1 item
+
+            self.assertEqual(expect_a_cached, "a" in sd._cache, f"policy {policy}")
+            self.assertEqual({"a": 1, "b": 2, "c": 3}, dict(sd.items()))
+            sd.close()
+            os.remove(self.db_path)
+
+    def test_cold_key_hints_and_stats(self):
+        sd = SpillDict(spill_threshold=2, merge=self.merge_fn, spill_proportion=0.5, db_path=self.db_path)
+        sd.put("a", 1)
+        sd.put("b", 2)
+        sd.mark_cold(["b", "not-present"])
+        sd.put("c", 3)  # triggers spill of 1 item, which should be the cold key rather than the oldest
+
+        self.assertEqual({"a", "c"}, set(sd._cache))
+        self.assertIn("b", sd._spill)
+
+        sd.mark_cold(["b"])
+        sd.put("b", 20)  # spills b again, which conflicts and is merged
+
+        self.assertEqual(22, sd.get("b"))
+        self.assertEqual(2, sd.stats.spills)
+        self.assertEqual(2, sd.stats.spilled_items)
+        self.assertEqual(1, sd.stats.spill_merges)
+        sd.close()
+
 
 if __name__ == "__main__":
     unittest.main()
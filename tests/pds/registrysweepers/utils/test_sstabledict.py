@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from pds.registrysweepers.utils.bigdict.sstabledict import SSTableDict
+from pds.registrysweepers.utils.bigdict.valuecodecs import MarshalCodec
+
+
+class TestSSTableDict(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "sstabledict_test.sst")
+        self.kvs = {f"urn:nasa:pds:bundle:collection:product_{i}::1.0": f"PDS_NODE_{i % 7}" for i in range(1000)}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lookups(self):
+        table = SSTableDict.build(self.db_path, self.kvs.items(), index_interval=16)
+        self.assertEqual(len(self.kvs), len(table))
+        for key, value in self.kvs.items():
+            self.assertEqual(value, table.get(key))
+            self.assertIn(key, table)
+
+        for absent_key in ["", "a", "urn:nasa:pds:bundle:collection:product_5", "zzz"]:
+            self.assertIsNone(table.get(absent_key))
+            self.assertNotIn(absent_key, table)
+        self.assertRaises(KeyError, table.__getitem__, "zzz")
+        table.close()
+
+    def test_iteration_is_sorted(self):
+        table = SSTableDict.build(self.db_path, self.kvs.items())
+        self.assertEqual(sorted(self.kvs), list(table))
+        self.assertEqual(self.kvs, dict(table.items()))
+        self.assertEqual([self.kvs[key] for key in sorted(self.kvs)], list(table.values()))
+        table.close()
+
+    def test_duplicate_keys_keep_last_value(self):
+        table = SSTableDict.build(self.db_path, [("a", 1), ("b", 2), ("a", 3)])
+        self.assertEqual(2, len(table))
+        self.assertEqual(3, table["a"])
+        table.close()
+
+    def test_external_sort(self):
+        pairs = list(self.kvs.items()) + [("a", 1), ("ab", 2), ("é", 3), ("a", 4)]
+        table = SSTableDict.build(self.db_path, reversed(pairs), max_items_in_memory=100)
+        self.assertEqual(sorted({key for key, _ in pairs}, key=str.encode), list(table))
+        self.assertEqual(1, table["a"])
+        self.assertEqual({**self.kvs, "a": 1, "ab": 2, "é": 3}, dict(table.items()))
+        self.assertEqual(["sstabledict_test.sst"], os.listdir(self.tmpdir.name))
+        table.close()
+
+        self.assertRaises(ValueError, SSTableDict.build, self.db_path, [("a\nb", 1)])
+
+        table = SSTableDict.build(self.db_path, [("b", 1), ("a\rz", 2), ("c", 3)], max_items_in_memory=1)
+        self.assertEqual([("a\rz", 2), ("b", 1), ("c", 3)], list(table.items()))
+        table.close()
+
+    def test_presorted(self):
+        table = SSTableDict.build(self.db_path, sorted(self.kvs.items()), presorted=True)
+        self.assertEqual(self.kvs, dict(table.items()))
+        table.close()
+
+        self.assertRaises(ValueError, SSTableDict.build, self.db_path, [("b", 1), ("a", 2)], presorted=True)
+        self.assertFalse(os.path.exists(f"{self.db_path}.tmp"))
+
+    def test_reload(self):
+        SSTableDict.build(self.db_path, self.kvs.items(), codec=MarshalCodec()).close()
+
+        table = SSTableDict(self.db_path, codec=MarshalCodec())
+        self.assertEqual(self.kvs, dict(table.items()))
+        table.close()
+
+    def test_empty(self):
+        table = SSTableDict.build(self.db_path, [])
+        self.assertEqual(0, len(table))
+        self.assertIsNone(table.get("a"))
+        self.assertEqual([], list(table))
+        table.close()
+
+    def test_immutable(self):
+        table = SSTableDict.build(self.db_path, [("a", 1)])
+        self.assertRaises(TypeError, table.put, "b", 2)
+        self.assertRaises(TypeError, table.pop, "a")
+        table.close()
+
+    def test_rejects_other_files(self):
+        with open(self.db_path, "wb") as outfile:
+            outfile.write(bytes(64))
+        self.assertRaises(ValueError, SSTableDict, self.db_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
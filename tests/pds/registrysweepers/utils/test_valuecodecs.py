@@ -0,0 +1,70 @@
+import importlib.util
+import os
+import pickle
+import tempfile
+import unittest
+
+from pds.registrysweepers.utils.bigdict.sqlite3dict import SqliteDict
+from pds.registrysweepers.utils.bigdict.valuecodecs import InterningCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import LidVidSetCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import MarshalCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import MsgpackCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import PickleCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import ZlibCodec
+from pds.registrysweepers.utils.bigdict.valuecodecs import ZstdCodec
+
+LIDVIDS = {f"urn:nasa:pds:bundle:collection:product_{i}::1.0" for i in range(50)}
+VALUES = [LIDVIDS, frozenset(LIDVIDS), set(), {"a": 1, "b": [1, 2]}, "some string", 12345]
+
+
+class TestValueCodecs(unittest.TestCase):
+    def assert_round_trips(self, codec):
+        for value in VALUES:
+            self.assertEqual(value, codec.decode(codec.encode(value)), f"{type(codec).__name__} with {value}")
+            self.assertEqual(value, codec.decode(memoryview(codec.encode(value))))
+
+    def test_builtin_codecs(self):
+        for codec in [
+            PickleCodec(),
+            MarshalCodec(),
+            LidVidSetCodec(),
+            LidVidSetCodec(fallback=MarshalCodec()),
+            ZlibCodec(),
+            ZlibCodec(LidVidSetCodec(), level=9),
+        ]:
+            self.assert_round_trips(codec)
+
+    @unittest.skipUnless(importlib.util.find_spec("msgpack"), "optional dependency msgpack is not installed")
+    def test_msgpack_codec(self):
+        self.assert_round_trips(MsgpackCodec())
+
+    @unittest.skipUnless(importlib.util.find_spec("zstandard"), "optional dependency zstandard is not installed")
+    def test_zstd_codec(self):
+        self.assert_round_trips(ZstdCodec(LidVidSetCodec()))
+
+    def test_lidvid_set_codec_is_compact(self):
+        encoded = LidVidSetCodec().encode(LIDVIDS)
+        self.assertIsInstance(LidVidSetCodec().decode(encoded), set)
+        self.assertLess(len(encoded), len(pickle.dumps(LIDVIDS, protocol=pickle.HIGHEST_PROTOCOL)) / 3)
+
+    def test_interning_codec(self):
+        codec = InterningCodec()
+        node_names = ["PDS_GEO", "PDS_IMG", None, "PDS_GEO", "frozen", ("a", 1)]
+        encoded = [codec.encode(node_name) for node_name in node_names]
+        self.assertEqual(node_names, [codec.decode(memoryview(blob)) for blob in encoded])
+        self.assertTrue(all(len(blob) == 1 for blob in encoded))
+        self.assertEqual(encoded[0], encoded[3])
+
+    def test_sqlitedict_with_codec(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sqlite_dict = SqliteDict(os.path.join(tmpdir, "codec.sqlite"), codec=ZlibCodec(LidVidSetCodec()))
+            sqlite_dict.put("a", LIDVIDS)
+            sqlite_dict.put_many([("b", {"x"}), ("c", 3)])
+            self.assertEqual(LIDVIDS, sqlite_dict.get("a"))
+            self.assertEqual({"a": LIDVIDS, "b": {"x"}, "c": 3}, dict(sqlite_dict.items()))
+            self.assertEqual(["a"], sqlite_dict.put_many_returning_conflicts([("a", {"y"}), ("d", {"z"})]))
+            self.assertEqual({"z"}, sqlite_dict.pop("d"))
+
+
+if __name__ == "__main__":
+    unittest.main()